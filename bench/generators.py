@@ -0,0 +1,134 @@
+import numpy as np
+import xml.etree.ElementTree as ET
+from rfsys.components import component_builder
+
+AMPLIFIER_GAIN = (10, 25)
+AMPLIFIER_NF = (0.8, 6)
+FILTER_LOSS = (0.5, 4)
+
+
+def make_component_dict(uid, comp_type, freqs, rng, tolerance=False):
+    """
+    Build a synthetic component dictionary in the xml_parser.load_components format
+
+    Args:
+        uid (str): Unique ID
+        comp_type (str): 'Amplifier' or 'Filter'
+        freqs (ndarray): parameter frequencies in MHz
+        rng (Generator): numpy random generator
+        tolerance (bool): add a dB tolerance to the gain
+
+    Returns:
+        comp_dict (dict): Component dictionary
+    """
+    params = dict()
+    if comp_type == 'Amplifier':
+        gain = rng.uniform(*AMPLIFIER_GAIN) + rng.normal(0, 0.3, len(freqs))
+        nf = rng.uniform(*AMPLIFIER_NF) + np.abs(rng.normal(0, 0.1, len(freqs)))
+        params['NF'] = {'name': 'NF', 'freqs': freqs, 'values': nf}
+    else:
+        gain = -rng.uniform(*FILTER_LOSS) - np.abs(rng.normal(0, 0.1, len(freqs)))
+
+    params['gain'] = {'name': 'gain', 'freqs': freqs, 'values': gain}
+    if tolerance:
+        params['gain'].update({'tol': 'dB', 'limits': [-0.5, 0.5], 'dist': 'normal'})
+
+    return {'uid': str(uid), 'name': '{}{}'.format(comp_type, uid), 'type': comp_type, 'params': params}
+
+
+def make_library(n_components, points, seed=0, tolerance=False, fmin=10, fmax=6000):
+    """
+    Build a synthetic component library, alternating amplifiers and filters
+
+    Args:
+        n_components (int): number of components
+        points (int): frequency points per parameter
+        seed (int): random seed
+        tolerance (bool): add a dB tolerance to every gain
+        fmin (float): lowest frequency in MHz
+        fmax (float): highest frequency in MHz
+
+    Returns:
+        (list): component dictionaries
+    """
+    rng = np.random.default_rng(seed)
+    freqs = np.linspace(fmin, fmax, points)
+    return [make_component_dict('C{}'.format(idx), 'Amplifier' if idx % 2 == 0 else 'Filter', freqs, rng, tolerance)
+            for idx in range(n_components)]
+
+
+def write_library_xml(comp_dicts, filepath):
+    """
+    Write component dictionaries to a component XML file
+
+    Args:
+        comp_dicts (list): component dictionaries
+        filepath (str): Full filepath for the XML file
+    """
+    root = ET.Element('components')
+    for comp_dict in comp_dicts:
+        comp = ET.SubElement(root, 'component', uid=comp_dict['uid'], name=comp_dict['name'],
+                             type=comp_dict['type'])
+        for param in comp_dict['params'].values():
+            attrib = {key: str(val) if key != 'limits' else ', '.join(str(x) for x in val)
+                      for key, val in param.items() if key not in ('freqs', 'values')}
+            element = ET.SubElement(comp, 'parameter', attrib)
+            ET.SubElement(element, 'freqs').text = ', '.join(repr(float(x)) for x in param['freqs'])
+            ET.SubElement(element, 'values').text = ', '.join(repr(float(x)) for x in param['values'])
+
+    ET.ElementTree(root).write(filepath)
+
+
+def make_chain(length, points, seed=0, tolerance=False):
+    """
+    Build a synthetic chain of component objects
+
+    Args:
+        length (int): number of stages
+        points (int): frequency points per parameter
+        seed (int): random seed
+        tolerance (bool): add a dB tolerance to every gain
+
+    Returns:
+        (list): Component objects in chain order
+    """
+    return [component_builder(x) for x in make_library(length, points, seed, tolerance)]
+
+
+def make_netlist(uids, depth, branches):
+    """
+    Build a synthetic netlist: a trunk of depth parts feeding a splitter with one branch of depth parts per
+    output port, each ending in its own sink
+
+    Args:
+        uids (list): component uids to place, used in turn
+        depth (int): parts in the trunk and in each branch
+        branches (int): number of splitter branches
+
+    Returns:
+        (str): netlist text
+    """
+    counter = iter(range(1, 1 + depth * (branches + 1) + 1))
+
+    def place():
+        idx = next(counter)
+        return 'U{}'.format(idx), uids[idx % len(uids)]
+
+    lines = list()
+    prev = 'SOURCE.1'
+    for x in range(depth):
+        refdes, uid = place()
+        lines.append('{};{}-{}.1'.format(prev, refdes, uid))
+        prev = '{}-{}.2'.format(refdes, uid)
+
+    split_ref, split_uid = place()
+    lines.append('{};{}-{}.1'.format(prev, split_ref, split_uid))
+    for branch in range(branches):
+        prev = '{}-{}.{}'.format(split_ref, split_uid, branch + 2)
+        for x in range(depth):
+            refdes, uid = place()
+            lines.append('{};{}-{}.1'.format(prev, refdes, uid))
+            prev = '{}-{}.2'.format(refdes, uid)
+        lines.append('{};SINK.{}'.format(prev, branch + 1))
+
+    return '\n'.join(lines) + '\n'
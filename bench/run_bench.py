@@ -0,0 +1,173 @@
+"""
+Benchmark suite for rfsys
+
+Usage:
+    python -m bench.run_bench run [--out results.json] [--quick]
+    python -m bench.run_bench compare baseline.json results.json [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+from rfsys.components import component_builder
+from rfsys.components.base_component import Tolerance
+from rfsys.core.xml_parser import load_components, ComponentLibrary
+from rfsys.core.sim_engine import CascadeEngine
+from rfsys.core.netlist_parser import load_netlist
+from rfsys.core.netlist_graph import NetlistGraph, NetlistEngine
+from .generators import make_library, write_library_xml, make_chain, make_netlist
+
+FULL = {'components': 1000, 'points': 201, 'chain_lengths': [4, 16, 64], 'sweep_sizes': [100, 10000, 100000],
+        'run_freqs': 100, 'lookups': 10000, 'samples': 100000, 'branches': 32, 'repeat': 3}
+QUICK = {'components': 50, 'points': 51, 'chain_lengths': [4, 16], 'sweep_sizes': [100, 1000],
+         'run_freqs': 10, 'lookups': 1000, 'samples': 1000, 'branches': 4, 'repeat': 1}
+
+
+def timed(func, repeat):
+    """
+    Time a function call
+
+    Args:
+        func (callable): function with no arguments
+        repeat (int): number of timed calls
+
+    Returns:
+        (float): best wall clock time in seconds
+    """
+    best = float('inf')
+    for x in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(config):
+    """
+    Run every benchmark
+
+    Args:
+        config (dict): benchmark sizes, see FULL
+
+    Returns:
+        results (dict): {benchmark name: {'seconds': best time, 'params': sizes}}
+    """
+    results = dict()
+    repeat = config['repeat']
+
+    def record(name, seconds, **params):
+        results[name] = {'seconds': seconds, 'params': params}
+        print("{:<40} {:>12.6f} s".format(name, seconds))
+
+    library = make_library(config['components'], config['points'], tolerance=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        xml = os.path.join(tmp, 'library.xml')
+        write_library_xml(library, xml)
+        size = dict(components=config['components'], points=config['points'])
+        record('xml.load_components', timed(lambda: load_components(xml), repeat), **size)
+        record('xml.library_index', timed(lambda: ComponentLibrary(xml), repeat), **size)
+        comp_dicts = load_components(xml)
+        record('component_builder', timed(lambda: [component_builder(x) for x in comp_dicts], repeat), **size)
+
+        netlist = os.path.join(tmp, 'netlist.txt')
+        with open(netlist, 'w') as fp:
+            fp.write(make_netlist([x['uid'] for x in library], 4, config['branches']))
+        graph = NetlistGraph(load_netlist(netlist))
+        engine = NetlistEngine(graph, [component_builder(x) for x in library])
+        freqs = np.linspace(10, 6000, config['sweep_sizes'][0])
+        record('netlist.run_sweep', timed(lambda: engine.run_sweep(freqs), repeat),
+               branches=config['branches'], sweep=len(freqs))
+
+    comp = component_builder(library[0])
+    lookups = np.random.default_rng(0).uniform(10, 6000, config['lookups'])
+    record('parameter.get_value', timed(lambda: [comp.get_value('gain', f) for f in lookups], repeat),
+           lookups=len(lookups))
+    record('parameter.get_values', timed(lambda: comp.get_values('gain', lookups), repeat), lookups=len(lookups))
+
+    for length in config['chain_lengths']:
+        chain = make_chain(length, config['points'])
+        run_freqs = np.linspace(10, 6000, config['run_freqs'])
+
+        def run_each():
+            sim = CascadeEngine(chain)
+            for f in run_freqs:
+                sim.run(f)
+        record('engine.run.stages{}'.format(length), timed(run_each, repeat), stages=length, freqs=len(run_freqs))
+
+        for sweep in config['sweep_sizes']:
+            freqs = np.linspace(10, 6000, sweep)
+            record('engine.run_sweep.stages{}.freqs{}'.format(length, sweep),
+                   timed(lambda: CascadeEngine(chain).run_sweep(freqs), repeat), stages=length, freqs=sweep)
+
+    tol = Tolerance('dB', [-1, 1], dist='normal')
+    samples = config['samples']
+    record('tolerance.get_value', timed(lambda: [tol.get_value(0) for x in range(samples)], repeat), samples=samples)
+    record('tolerance.sample', timed(lambda: tol.sample(samples, mean=0, rng=0), repeat), samples=samples)
+
+    return results
+
+
+def compare(baseline, current, threshold):
+    """
+    Compare two benchmark result sets
+
+    Args:
+        baseline (dict): baseline results
+        current (dict): current results
+        threshold (float): allowed slowdown as a fraction (0.2 = 20%)
+
+    Returns:
+        regressions (list): (name, baseline seconds, current seconds, ratio) for every benchmark slower than
+            the threshold
+    """
+    regressions = list()
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        base = baseline['results'][name]['seconds']
+        ratio = result['seconds'] / base if base > 0 else float('inf')
+        flag = 'REGRESSION' if ratio > 1 + threshold else ''
+        print("{:<40} {:>12.6f} {:>12.6f} {:>8.2f}x {}".format(name, base, result['seconds'], ratio, flag))
+        if flag:
+            regressions.append((name, base, result['seconds'], ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="rfsys benchmark suite")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help="run the benchmarks")
+    run.add_argument('--out', help="write results to a JSON file")
+    run.add_argument('--quick', action='store_true', help="use small sizes")
+    cmp = sub.add_parser('compare', help="compare results against a baseline")
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        config = QUICK if args.quick else FULL
+        output = {'meta': {'python': platform.python_version(), 'numpy': np.__version__,
+                           'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                           'config': config},
+                  'results': run_benchmarks(config)}
+        if args.out:
+            with open(args.out, 'w') as fp:
+                json.dump(output, fp, indent=2)
+        return 0
+
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)
+    with open(args.current) as fp:
+        current = json.load(fp)
+    regressions = compare(baseline, current, args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
-from .passive_components import Filter
-from .active_components import Amplifier
+from .passive_components import Filter, Mixer
+from .active_components import Amplifier, ActiveMixer
 
 VALID_PASSIVE = [
     'Filter',
@@ -42,6 +42,14 @@ def component_builder(comp_dict):
         for key, val in params_dict.items():
             compObj.add_parameter(**val)
 
+        # optional mixer LO plan
+        if 'lo_freq' in comp_dict or 'if_freq' in comp_dict:
+            lo_freq = comp_dict.get('lo_freq')
+            if_freq = comp_dict.get('if_freq')
+            compObj.set_lo(lo_freq=float(lo_freq) if lo_freq is not None else None,
+                           if_freq=float(if_freq) if if_freq is not None else None,
+                           side=comp_dict.get('side', 'low'))
+
         return compObj
     else:
         raise Exception("Invalid component type ({}). Valid components: {}".format(comp_type, VALID_COMPONENTS))
@@ -1,4 +1,4 @@
-from .base_component import Component
+from .base_component import Component, FrequencyConverter
 
 
 class ActiveComponent(Component):
@@ -15,4 +15,9 @@ class ActiveComponent(Component):
 
 class Amplifier(ActiveComponent):
     def __init__(self, uid, name):
-        super().__init__(uid, name)
\ No newline at end of file
+        super().__init__(uid, name)
+
+
+class ActiveMixer(FrequencyConverter, ActiveComponent):
+    def __init__(self, uid, name):
+        super().__init__(uid, name)
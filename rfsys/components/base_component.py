@@ -1,6 +1,10 @@
 import random
 import numpy as np
 from ..core.errors import validate_arg, verify_kwargs
+from ..core.stats import truncated_normal_ppf
+from ..core.interpolation import INTERP_MODES, interp_coefficients, evaluate
+from ..core.touchstone import touchstone_params
+from ..core import instrumentation
 
 
 class Component:
@@ -23,25 +27,107 @@ class Component:
 
         Args:
             name (str): name of parameter
-            freqs (list): list of frequency values in MHz
-            values (list): list of parameter values for each freq in the list
-            **kwargs: Arguments for Tolerance class
+            freqs (list or ndarray): frequency values in MHz
+            values (list or ndarray): parameter values for each freq in the list
+            **kwargs: Arguments for Tolerance class and the interp mode
         """
         if name in self._parameters.keys():
             raise ValueError("Parameter name ({}) already exists in Component ({})".format(name, self.name))
-        if not isinstance(freqs, list):
-            freqs = list(freqs)
 
-        if not isinstance(values, list):
-            values = list(values)
-
-        if len(freqs) != len(values):
+        if len(freqs) != np.shape(values)[-1]:
             raise ValueError("Length of parameter freqs ({}) does not equal length of values ({})"
                              .format(freqs, values))
 
         param = Parameter(name, freqs, values, **kwargs)
         self._parameters[name] = param
 
+    def add_touchstone(self, filepath):
+        """
+        Add the gain parameter (|S21| in dB) from a 2-port Touchstone file.  The NF parameter is added from the
+        file's noise data (minimum noise figure) if there is any and the component doesn't already have a NF
+
+        Args:
+            filepath (str): Full filepath for the Touchstone file
+        """
+        params = touchstone_params(filepath)
+        self.add_parameter(**params['gain'])
+        if 'NF' in params and 'NF' not in self._parameters.keys():
+            self.add_parameter(**params['NF'])
+
+    def replace_parameter(self, name, freqs, values, **kwargs):
+        """
+        Replace an existing parameter, or add it if it doesn't exist yet
+
+        Args:
+            name (str): name of parameter
+            freqs (list or ndarray): frequency values in MHz
+            values (list or ndarray): parameter values for each freq in the list
+            **kwargs: Arguments for Tolerance class and the interp mode
+        """
+        self._parameters.pop(name, None)
+        self.add_parameter(name, freqs, values, **kwargs)
+
+    @property
+    def definition(self):
+        """
+        The shared component definition.  A Component is its own definition; a ComponentInstance returns the
+        Component it points to
+        """
+        return self
+
+    def freeze(self):
+        """
+        Make the data arrays of every parameter read-only, so the component can be safely shared
+        """
+        for param in self._parameters.values():
+            param.freeze()
+
+    def translate(self, freqs):
+        """
+        Map input frequencies to output frequencies.  Only mixers translate, every other component passes the
+        frequencies through
+
+        Args:
+            freqs (ndarray): input frequencies in MHz
+
+        Returns:
+            (ndarray): output frequencies in MHz
+        """
+        return freqs
+
+    def get_offset(self, name):
+        """
+        Get the dB offset applied to a parameter.  Only a ComponentInstance carries offsets
+
+        Args:
+            name (str): parameter name
+
+        Returns:
+            (float): 0
+        """
+        return 0.0
+
+    def parameter_names(self):
+        """
+        Get the names of every parameter
+
+        Returns:
+            (list): parameter names
+        """
+        return list(self._parameters.keys())
+
+    def has_parameter(self, name):
+        """
+        Check whether the component has a parameter
+
+        Args:
+            name (str): parameter name
+
+        Returns:
+            (bool)
+        """
+        return name in self._parameters.keys()
+
     def get_parameter(self, name):
         """
         Method to retrieve a component parameter object
@@ -71,15 +157,97 @@ class Component:
         value = p.get_value(freq)
         return value
 
+    def get_values(self, param, freqs, temps=None):
+        """
+        Method to get a parameter value for every frequency in an array
+
+        Args:
+            param (str): parameter name
+            freqs (ndarray): Frequencies in MHz
+            temps (list or ndarray): Optional corner temperatures in degC
+
+        Returns:
+            values (ndarray): parameter values, same shape as freqs, or (temps,) + freqs shape with temps
+        """
+        p = self.get_parameter(param)
+        return p.get_values(freqs, temps)
+
+
+class FrequencyConverter:
+    SIDES = ['LOW', 'HIGH']
+    lo_freq = None
+    if_freq = None
+    side = 'LOW'
+
+    def set_lo(self, lo_freq=None, if_freq=None, side='low'):
+        """
+        Set the LO plan of a mixer.  Either the LO is fixed, or the IF is fixed and the LO tunes with the RF input:
+        LO = RF - IF for low side injection and LO = RF + IF for high side injection.  The output (IF) frequency is
+        |RF - LO|.  Mixer parameters are looked up at the RF (input) frequency.
+
+        Args:
+            lo_freq (float): fixed LO frequency in MHz
+            if_freq (float): fixed IF frequency in MHz
+            side (str): LO injection side for a fixed IF (low or high)
+        """
+        validate_arg(side.upper(), FrequencyConverter.SIDES)
+        if (lo_freq is None) == (if_freq is None):
+            raise ValueError("Mixer ({}) needs exactly one of lo_freq and if_freq".format(self.name))
+        self.lo_freq = lo_freq
+        self.if_freq = if_freq
+        self.side = side.upper()
+
+    def has_lo_plan(self):
+        """
+        Check whether set_lo has been called
+
+        Returns:
+            (bool)
+        """
+        return self.lo_freq is not None or self.if_freq is not None
+
+    def lo(self, freqs):
+        """
+        LO frequency for each RF input frequency
+
+        Args:
+            freqs (ndarray): RF frequencies in MHz
+
+        Returns:
+            (ndarray): LO frequencies in MHz, same shape as freqs
+        """
+        freqs = np.asarray(freqs, dtype=np.float64)
+        if not self.has_lo_plan():
+            raise ValueError("Mixer ({}) has no LO plan, see set_lo".format(self.name))
+        if self.lo_freq is not None:
+            return np.full(freqs.shape, float(self.lo_freq))
+        return freqs - self.if_freq if self.side == 'LOW' else freqs + self.if_freq
+
+    def translate(self, freqs):
+        """
+        Map RF input frequencies to IF output frequencies.  A mixer without an LO plan passes them through
+
+        Args:
+            freqs (ndarray): RF frequencies in MHz
+
+        Returns:
+            (ndarray): IF frequencies in MHz
+        """
+        if not self.has_lo_plan():
+            return freqs
+        return np.abs(np.asarray(freqs, dtype=np.float64) - self.lo(freqs))
+
 
 class Parameter:
+    NOMINAL_TEMP = 25.0     # degC, used when a temperature dependent parameter is looked up without a temperature
 
     def __init__(self, name, freqs, values, **kwargs):
         """
         Args:
             name (str): parameter name
-            freqs (list): list of frequency values in MHz
-            values (list): parameter value as function of frequency
+            freqs (list or ndarray): frequency values in MHz
+            values (list or ndarray): parameter value as function of frequency, or a (temps x freqs) grid when
+                temps is given
             **kwargs (dict): keyword args
 
         Keyword Args:
@@ -91,10 +259,23 @@ class Parameter:
             num_std_dev (int): number of standard deviations to use for
                 distribution. Only values within [lower, upper] limit range
                 will be returned
+            interp (str): interpolation mode, one of INTERP_MODES (default linear).  'log' is linear in
+                log-frequency, 'nearest' takes the closest point, 'pchip' is the monotone cubic and 'cubic' the
+                natural cubic spline
+            temps (list or ndarray): temperatures in degC of the rows of a (temps x freqs) values grid.  The
+                parameter is interpolated along frequency with its interp mode and linearly along temperature
+                (bilinear for linear interp).  freqs/values hold the NOMINAL_TEMP row
         """
         self.name = name
-        self.freqs = freqs
-        self.values = values
+        self.interp = kwargs.pop('interp', 'linear').lower()
+        validate_arg(self.interp, INTERP_MODES)
+        temps = kwargs.pop('temps', None)
+        self.temps = None
+        if temps is None:
+            self._set_data(freqs, values)
+        else:
+            self._set_grid(temps, freqs, values)
+        self.tolerance = None
 
         try:
             verify_kwargs(kwargs, Tolerance.KWARGS)  # verify sufficient kwargs
@@ -103,6 +284,115 @@ class Parameter:
             # if minimum kwargs are not present, don't create tolerance object
             pass
 
+    def _set_data(self, freqs, values):
+        """
+        Store freqs and values as contiguous float64 arrays sorted by frequency, and reset cached lookups
+
+        Args:
+            freqs (list or ndarray): frequency values in MHz
+            values (list or ndarray): parameter value as function of frequency
+        """
+        freqs = np.asarray(freqs, dtype=np.float64).ravel()
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if np.any(freqs[1:] < freqs[:-1]):
+            order = np.argsort(freqs, kind='stable')
+            freqs = freqs[order]
+            values = values[order]
+        # already sorted contiguous arrays (e.g. memory mapped library data) are used without copying
+        self.freqs = np.ascontiguousarray(freqs)
+        self.values = np.ascontiguousarray(values)
+        self._min_freq = self.freqs[0]
+        self._max_freq = self.freqs[-1]
+        self._set_coefficients()
+
+    def _set_grid(self, temps, freqs, values):
+        """
+        Store a (temps x freqs) values grid.  Each temperature row is kept as its own frequency Parameter so it
+        gets the same precomputed interpolation and bin caching
+
+        Args:
+            temps (list or ndarray): temperatures in degC
+            freqs (list or ndarray): frequency values in MHz
+            values (list or ndarray): parameter values with shape (temps, freqs)
+        """
+        temps = np.asarray(temps, dtype=np.float64).ravel()
+        grid = np.asarray(values, dtype=np.float64)
+        if grid.shape != (len(temps), len(freqs)):
+            raise ValueError("Parameter ({}) values have shape {}, expected (temps, freqs) = ({}, {})"
+                             .format(self.name, grid.shape, len(temps), len(freqs)))
+        if np.any(temps[1:] < temps[:-1]):
+            order = np.argsort(temps, kind='stable')
+            temps = temps[order]
+            grid = grid[order]
+        self.temps = temps
+        self.grid = grid
+        self._rows = [Parameter(self.name, freqs, row, interp=self.interp) for row in self.grid]
+        self._set_data(freqs, self._temp_weights([Parameter.NOMINAL_TEMP]) @ self.grid)
+
+    def _temp_weights(self, temps):
+        """
+        Linear interpolation weights along temperature.  Temperatures outside the grid are clamped to the end rows
+
+        Args:
+            temps (ndarray): temperatures in degC
+
+        Returns:
+            (ndarray): weights with shape (len(temps), len(self.temps)), two non zero entries per row
+        """
+        temps = np.clip(np.atleast_1d(np.asarray(temps, dtype=np.float64)), self.temps[0], self.temps[-1])
+        weights = np.zeros((len(temps), len(self.temps)))
+        rows = np.arange(len(temps))
+        if len(self.temps) == 1:
+            weights[:, 0] = 1.0
+            return weights
+
+        bins = np.clip(np.searchsorted(self.temps, temps, side='right') - 1, 0, len(self.temps) - 2)
+        left = self.temps[bins]
+        span = self.temps[bins + 1] - left
+        upper = np.divide(temps - left, span, out=np.zeros_like(temps), where=span > 0)
+        weights[rows, bins] = 1 - upper
+        weights[rows, bins + 1] += upper
+        return weights
+
+    def _set_coefficients(self):
+        """
+        Compute the interpolation knots and coefficients once, so lookups only evaluate them.  Must be called
+        whenever self.freqs or self.values change
+        """
+        if self.interp == 'log':
+            if self._min_freq <= 0:
+                raise ValueError("Parameter ({}) needs positive frequencies for log interpolation".format(self.name))
+            self._knots = np.log10(self.freqs)
+        else:
+            self._knots = self.freqs
+        self._coeffs = interp_coefficients(self.interp, self._knots, self.values)
+        self._reset_grid()
+
+    def _reset_grid(self):
+        """
+        Drop the cached interpolation bins.  Must be called whenever self.freqs changes
+        """
+        self._grid_cache = None
+
+    @property
+    def frozen(self):
+        """
+        True when the data arrays are read-only, e.g. a shared netlist definition or a memory mapped library.
+        A frozen parameter can't be edited; replace it instead
+        """
+        return not self.values.flags.writeable
+
+    def freeze(self):
+        """
+        Make the freqs and values arrays read-only
+        """
+        self.freqs.flags.writeable = False
+        self.values.flags.writeable = False
+        if self.temps is not None:
+            self.grid.flags.writeable = False
+            for row in self._rows:
+                row.freeze()
+
     def get_value(self, freq):
         """
         Get the value of a parameter for a particular frequency
@@ -112,21 +402,112 @@ class Parameter:
         Returns:
             value (float): parameter value
         """
+        instr = instrumentation.active()
+        if instr.enabled:
+            instr.count('parameter.get_value')
         if len(self.freqs) == 1:
             # just a single value for all freqs, so just return that value
             return self.values[0]
+        elif self.interp != 'linear':
+            bins, weights = self._find_bins(np.array([freq], dtype=np.float64))
+            return evaluate(self.interp, self.values, self._coeffs, bins, weights)[0]
         else:
-            if freq < min(self.freqs):
-                freq = min(self.freqs)
-            elif freq > max(self.freqs):
-                freq = max(self.freqs)
+            if freq < self._min_freq:
+                freq = self._min_freq
+            elif freq > self._max_freq:
+                freq = self._max_freq
             # interpolate value
             value = np.interp(freq, self.freqs, self.values)
             return value
 
+    def get_values(self, freqs, temps=None):
+        """
+        Get the value of a parameter for every frequency in an array.  Frequencies outside the parameter's range
+        are clamped to the end points.  The interpolation bins of the last grid are cached, so repeated lookups
+        on the same grid skip the search, and the interpolation coefficients are precomputed, so the lookup is a
+        single batched evaluation.
+
+        With temps, every temperature row of the grid is evaluated once and the corners are formed as weighted
+        sums of the rows.  A parameter without a temperature grid has the same value at every temperature.
+
+        Args:
+            freqs (ndarray): Frequencies in MHz
+            temps (list or ndarray): Optional corner temperatures in degC
+
+        Returns:
+            values (ndarray): parameter values, same shape as freqs, or (temps,) + freqs shape with temps
+        """
+        freqs = np.asarray(freqs, dtype=np.float64)
+        if temps is not None:
+            temps = np.atleast_1d(np.asarray(temps, dtype=np.float64))
+            if self.temps is None:
+                return np.repeat(self.get_values(freqs)[np.newaxis], len(temps), axis=0)
+            rows = np.array([row.get_values(freqs) for row in self._rows])
+            return np.tensordot(self._temp_weights(temps), rows, axes=1)
+
+        instr = instrumentation.active()
+        if instr.enabled:
+            instr.count('parameter.get_values')
+        if len(self.freqs) == 1:
+            return np.full(freqs.shape, self.values[0])
+
+        bins, weights = self._interp_bins(freqs)
+        return evaluate(self.interp, self.values, self._coeffs, bins, weights)
+
+    def _interp_bins(self, freqs):
+        """
+        Find the left interpolation bin and fractional weight for each frequency.  Results are cached against
+        the last grid.
+
+        Args:
+            freqs (ndarray): Frequencies in MHz
+
+        Returns:
+            (tuple): (bins, weights) arrays, same shape as freqs
+        """
+        # (grid, bins, weights) is read and replaced as one tuple, so threads sharing the parameter never see
+        # bins from another grid
+        cache = self._grid_cache
+        instr = instrumentation.active()
+        if cache is not None and cache[0].shape == freqs.shape and np.array_equal(cache[0], freqs):
+            if instr.enabled:
+                instr.count('parameter.cache_hits')
+            return cache[1], cache[2]
+
+        if instr.enabled:
+            instr.count('parameter.cache_misses')
+
+        bins, weights = self._find_bins(freqs)
+        self._grid_cache = (freqs.copy(), bins, weights)
+        return bins, weights
+
+    def _find_bins(self, freqs):
+        """
+        Find the left interpolation bin and normalized position within the bin (in knot coordinates) for each
+        frequency
+
+        Args:
+            freqs (ndarray): Frequencies in MHz
+
+        Returns:
+            (tuple): (bins, weights) arrays, same shape as freqs
+        """
+        clamped = np.clip(freqs, self._min_freq, self._max_freq)
+        bins = np.searchsorted(self.freqs, clamped, side='right') - 1
+        np.clip(bins, 0, len(self.freqs) - 2, out=bins)
+        if self.interp == 'log':
+            clamped = np.log10(clamped)
+        left = self._knots[bins]
+        span = self._knots[bins + 1] - left
+        weights = np.divide(clamped - left, span, out=np.zeros_like(clamped), where=span > 0)
+        return bins, weights
+
     def update_value(self, freq, value):
         """
-        Update a parameter or add a new one
+        Update a parameter or add a new one.  A new frequency is inserted into the sorted arrays, which copies
+        them, so building a parameter point by point is O(N^2); pass whole arrays to the constructor instead.
+        Parameters with a temperature grid can't be updated point by point, since the nominal values are derived
+        from the grid
 
         Args:
             freq (float): Parameter frequency in MHz
@@ -135,15 +516,25 @@ class Parameter:
         Returns:
             None
         """
-        if freq in self.freqs:
+        if self.frozen:
+            raise ValueError("Parameter ({}) is frozen and can't be updated. Replace the parameter instead"
+                             .format(self.name))
+        if self.temps is not None:
+            raise ValueError("Parameter ({}) has a temperature grid; replace the parameter to change its values"
+                             .format(self.name))
+        idx = int(np.searchsorted(self.freqs, freq))
+        if idx < len(self.freqs) and self.freqs[idx] == freq:
             # freq already exists so just update it
-            idx = self.freqs.index(freq) # find index of freq
-            self.values[idx] = value    # update value
+            self.values[idx] = value
+            if self._coeffs is not None:
+                self._set_coefficients()
         else:
             # this is a new frequency so insert the value at the correct spot
-            idx = len([x for x in self.freqs if x < freq])  # find the correct index to stick the new value
-            self.freqs.insert(idx, freq)
-            self.values.insert(idx, value)
+            self.freqs = np.insert(self.freqs, idx, freq)
+            self.values = np.insert(self.values, idx, value)
+            self._min_freq = self.freqs[0]
+            self._max_freq = self.freqs[-1]
+            self._set_coefficients()
 
 
 class Tolerance:
@@ -206,6 +597,31 @@ class Tolerance:
 
         return round(value, 2)
 
+    def sample(self, n, mean=None, rng=None):
+        """
+        Draw n values within the limits based on the defined distribution.  Values are produced by inverting the
+        (truncated) CDF, so there is no rejection loop and no rounding.  Every value consumes exactly one draw from
+        rng, which means drawing one block of n values gives the same result as drawing it in chunks.
+
+        Args:
+            n (int): number of values
+            mean (float): mean value to determine a statistical value from
+            rng (Generator or int): numpy random generator or a seed for a new one
+
+        Returns:
+            values (ndarray)
+        """
+        rng = np.random.default_rng(rng)
+        lower, upper = self.limits
+        u = rng.random(n)
+        if self.dist == 'UNIFORM':
+            return lower + u * (upper - lower)
+
+        if mean is None:
+            raise ValueError("A mean argument is required for parameters with normal tolerance distributions")
+        sigma = (upper - lower) / self.num_dev
+        return truncated_normal_ppf(u, mean, sigma, lower, upper)
+
     def _validate_value(self, value):
         """
         Determine if value is within the limits
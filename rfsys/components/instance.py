@@ -0,0 +1,177 @@
+import numpy as np
+from .base_component import Parameter
+from .passive_components import PassiveComponent
+
+
+class ComponentInstance:
+    __slots__ = ('refdes', 'definition', '_offsets', '_params')
+
+    def __init__(self, refdes, definition):
+        """
+        Lightweight placement of a shared component definition, e.g. one refdes in a netlist.  Every instance of a
+        uid points to the same Component and its parameter arrays; the definition is frozen so no instance can
+        change it.  Per-instance changes are stored as small deltas: a dB offset per parameter, or a replacement
+        Parameter.  An instance without overrides returns the definition's data directly.
+
+        Args:
+            refdes (str): reference designator
+            definition (Component): shared component definition
+        """
+        self.refdes = refdes
+        self.definition = definition.definition
+        self.definition.freeze()
+        self._offsets = None
+        self._params = None
+
+    @property
+    def uid(self):
+        return self.definition.uid
+
+    @property
+    def name(self):
+        return self.definition.name
+
+    def is_default(self):
+        """
+        Check whether the instance has no overrides
+
+        Returns:
+            (bool)
+        """
+        return not self._offsets and not self._params
+
+    def set_offset(self, name, offset):
+        """
+        Offset a parameter by a fixed amount in dB at every frequency.  For passive components a gain offset
+        also moves the derived NF
+
+        Args:
+            name (str): parameter name
+            offset (float): offset in dB
+        """
+        if self._offsets is None:
+            self._offsets = dict()
+        self._offsets[name] = offset
+        if name == 'gain' and isinstance(self.definition, PassiveComponent):
+            self._offsets['NF'] = -offset
+
+    def replace_parameter(self, name, freqs, values, **kwargs):
+        """
+        Replace a parameter for this instance only
+
+        Args:
+            name (str): name of parameter
+            freqs (list or ndarray): frequency values in MHz
+            values (list or ndarray): parameter values for each freq in the list
+            **kwargs: Arguments for Tolerance class
+        """
+        if self._params is None:
+            self._params = dict()
+        self._params[name] = Parameter(name, freqs, values, **kwargs)
+        if name == 'gain' and isinstance(self.definition, PassiveComponent):
+            self._params['NF'] = Parameter('NF', freqs, -np.asarray(values, dtype=np.float64),
+                                           interp=kwargs.get('interp', 'linear'), temps=kwargs.get('temps'))
+
+    def clear_overrides(self):
+        """
+        Remove every per-instance override
+        """
+        self._offsets = None
+        self._params = None
+
+    def translate(self, freqs):
+        """
+        Map input frequencies to output frequencies, see Component.translate
+
+        Args:
+            freqs (ndarray): input frequencies in MHz
+
+        Returns:
+            (ndarray): output frequencies in MHz
+        """
+        return self.definition.translate(freqs)
+
+    def get_offset(self, name):
+        """
+        Get the dB offset applied to a parameter
+
+        Args:
+            name (str): parameter name
+
+        Returns:
+            (float): offset in dB, 0 if there is none
+        """
+        if self._offsets is None:
+            return 0.0
+        return self._offsets.get(name, 0.0)
+
+    def parameter_names(self):
+        """
+        Get the names of every parameter, including per-instance replacements
+
+        Returns:
+            (list): parameter names
+        """
+        names = self.definition.parameter_names()
+        if self._params is not None:
+            names.extend(name for name in self._params if name not in names)
+        return names
+
+    def has_parameter(self, name):
+        """
+        Check whether the instance has a parameter
+
+        Args:
+            name (str): parameter name
+
+        Returns:
+            (bool)
+        """
+        return (self._params is not None and name in self._params) or self.definition.has_parameter(name)
+
+    def get_parameter(self, name):
+        """
+        Get the parameter object, ignoring offsets
+
+        Args:
+            name (str): parameter name
+
+        Returns:
+            obj: parameter object
+        """
+        if self._params is not None and name in self._params:
+            return self._params[name]
+        return self.definition.get_parameter(name)
+
+    def get_value(self, param, freq):
+        """
+        Get a parameter value for a particular frequency, including any offset
+
+        Args:
+            param (str): parameter name
+            freq (float): Frequency in MHz
+
+        Returns:
+            value (float)
+        """
+        value = self.get_parameter(param).get_value(freq)
+        if self._offsets is not None and param in self._offsets:
+            value = value + self._offsets[param]
+        return value
+
+    def get_values(self, param, freqs, temps=None):
+        """
+        Get a parameter value for every frequency in an array, including any offset
+
+        Args:
+            param (str): parameter name
+            freqs (ndarray): Frequencies in MHz
+            temps (list or ndarray): Optional corner temperatures in degC
+
+        Returns:
+            values (ndarray): parameter values, same shape as freqs, or (temps,) + freqs shape with temps
+        """
+        values = self.get_parameter(param).get_values(freqs, temps)
+        if self._offsets is not None and param in self._offsets:
+            values = values + self._offsets[param]
+        return values
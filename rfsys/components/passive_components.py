@@ -1,4 +1,5 @@
-from .base_component import Component
+import numpy as np
+from .base_component import Component, FrequencyConverter
 
 
 class PassiveComponent(Component):
@@ -27,10 +28,32 @@ class PassiveComponent(Component):
         if name == 'gain':
             # gain is being updated, so we'll automatically add a NF parameter at the same freq
             super().add_parameter(name, freqs, values, **kwargs)
-            nf_values = [x * -1 for x in values]
-            super().add_parameter('NF', freqs, nf_values)
+            nf_values = -np.asarray(values, dtype=np.float64)
+            super().add_parameter('NF', freqs, nf_values, interp=kwargs.get('interp', 'linear'),
+                                  temps=kwargs.get('temps'))
+        else:
+            super().add_parameter(name, freqs, values, **kwargs)
+
+    def replace_parameter(self, name, freqs, values, **kwargs):
+        """
+        Replace an existing parameter.  Replacing the gain also replaces the NF derived from it
+
+        Args:
+            name (str): name of parameter
+            freqs (list or ndarray): frequency values in MHz
+            values (list or ndarray): parameter values for each freq in the list
+            **kwargs: Arguments for Tolerance class
+        """
+        if name == 'gain':
+            self._parameters.pop('NF', None)
+        super().replace_parameter(name, freqs, values, **kwargs)
 
 
 class Filter(PassiveComponent):
     def __init__(self, uid, name):
-        super().__init__(uid, name)
\ No newline at end of file
+        super().__init__(uid, name)
+
+
+class Mixer(FrequencyConverter, PassiveComponent):
+    def __init__(self, uid, name):
+        super().__init__(uid, name)
@@ -0,0 +1,173 @@
+import numpy as np
+
+
+def db_to_linear(value):
+    """
+    Convert values in dB to their linear equivalent
+
+    Args:
+        value (float or ndarray): value(s) in dB
+
+    Returns:
+        (ndarray): value(s) in linear units
+    """
+    return np.power(10.0, np.asarray(value, dtype=np.float64) / 10.0)
+
+
+def linear_to_db(value):
+    """
+    Convert values in linear units to their dB equivalent
+
+    Args:
+        value (float or ndarray): value(s) in linear units
+
+    Returns:
+        (ndarray): value(s) in dB
+    """
+    return 10.0 * np.log10(value)
+
+
+def cascade_gain_nf(gain, nf, prev_gain=None, prev_nf=None):
+    """
+    Cascade per-stage gain and NF for every stage and frequency at once.
+
+    The stage axis is the second to last axis and the frequency axis is the last axis.  Any leading axes
+    (trials, corners, etc) are treated as independent batches.  No rounding is applied.  The cascade can be
+    continued from an upstream chain by passing its cascaded gain and NF at the last upstream stage.
+
+    Args:
+        gain (ndarray): stage gain in dB, shape (..., stages, freqs)
+        nf (ndarray): stage NF in dB, same shape as gain
+        prev_gain (ndarray): cascaded gain in dB ahead of the first stage, shape (..., freqs).  Defaults to 0 dB
+        prev_nf (ndarray): cascaded NF in dB ahead of the first stage, shape (..., freqs).  Defaults to 0 dB
+
+    Returns:
+        (tuple): (cascaded gain in dB, cascaded NF in dB), both the same shape as the inputs
+    """
+    gain = np.asarray(gain, dtype=np.float64)
+    nf = np.asarray(nf, dtype=np.float64)
+
+    casc_gain = np.cumsum(gain, axis=-2)
+    if prev_gain is not None:
+        casc_gain += np.expand_dims(prev_gain, -2)
+
+    # gain ahead of each stage.  Without an upstream chain the first stage sees unity gain
+    prev_gain_linear = np.ones_like(casc_gain)
+    if prev_gain is not None:
+        prev_gain_linear[..., 0, :] = db_to_linear(prev_gain)
+    prev_gain_linear[..., 1:, :] = db_to_linear(casc_gain[..., :-1, :])
+
+    # Friis: F = F1 + (F2 - 1)/G1 + (F3 - 1)/(G1*G2) + ...
+    terms = (db_to_linear(nf) - 1) / prev_gain_linear
+    casc_nf_linear = np.cumsum(terms, axis=-2)
+    casc_nf_linear += 1 if prev_nf is None else np.expand_dims(db_to_linear(prev_nf), -2)
+    casc_nf = linear_to_db(casc_nf_linear)
+
+    return casc_gain, casc_nf
+
+
+CASCADE_METRICS = ['gain', 'NF', 'NT', 'OIP3', 'IIP3', 'OP1dB', 'IP1dB', 'SNR']
+T0 = 290.0          # reference noise temperature in K
+KT0_DBM_HZ = 10 * np.log10(1.380649e-23 * T0 * 1000)     # thermal noise density at T0, about -174 dBm/Hz
+
+
+def cascade_metrics(gain, nf, oip3=None, op1db=None, pin=None, bandwidth=None, prev=None):
+    """
+    Fused cascade of every metric in CASCADE_METRICS.  Each stage array is converted to linear units once and all
+    metrics are accumulated from the same linear cascaded gain.
+
+    Intercept and compression points are combined as input referred powers:
+    1/IIP3 = sum(G_1..G_i / OIP3_i), and the same for P1dB.  A missing OIP3/P1dB (None or inf) means the stage
+    doesn't contribute.  SNR is only computed when pin and bandwidth are given, otherwise it is NaN.
+
+    Args:
+        gain (ndarray): stage gain in dB, shape (..., stages, freqs)
+        nf (ndarray): stage NF in dB, same shape as gain
+        oip3 (ndarray): stage output IP3 in dBm, same shape as gain
+        op1db (ndarray): stage output P1dB in dBm, same shape as gain
+        pin (float or ndarray): input signal power in dBm, broadcastable against gain
+        bandwidth (float): noise bandwidth in Hz
+        prev (dict): cascaded 'gain', 'NF', 'IIP3' and 'IP1dB' of an upstream chain at its last stage, each with
+            shape (..., freqs)
+
+    Returns:
+        results (dict): cascaded metric arrays keyed by name, each the same shape as gain
+    """
+    gain = np.asarray(gain, dtype=np.float64)
+    results = dict()
+
+    casc_gain = np.cumsum(gain, axis=-2)
+    if prev is not None:
+        casc_gain += np.expand_dims(prev['gain'], -2)
+    casc_gain_linear = db_to_linear(casc_gain)
+    results['gain'] = casc_gain
+
+    # gain ahead of each stage, reused from the cascaded gain
+    prev_gain_linear = np.ones_like(casc_gain)
+    if prev is not None:
+        prev_gain_linear[..., 0, :] = db_to_linear(prev['gain'])
+    prev_gain_linear[..., 1:, :] = casc_gain_linear[..., :-1, :]
+
+    casc_f = np.cumsum((db_to_linear(nf) - 1) / prev_gain_linear, axis=-2)
+    casc_f += 1 if prev is None else np.expand_dims(db_to_linear(prev['NF']), -2)
+    results['NF'] = linear_to_db(casc_f)
+    results['NT'] = T0 * (casc_f - 1)
+
+    for stage, out_name, in_name in ((oip3, 'OIP3', 'IIP3'), (op1db, 'OP1dB', 'IP1dB')):
+        inverse = np.zeros_like(casc_gain)
+        if stage is not None:
+            inverse += np.cumsum(casc_gain_linear / db_to_linear(stage), axis=-2)
+        if prev is not None:
+            inverse += np.expand_dims(1 / db_to_linear(prev[in_name]), -2)
+        with np.errstate(divide='ignore'):
+            results[in_name] = -linear_to_db(inverse)
+        results[out_name] = results[in_name] + casc_gain
+
+    if pin is None or bandwidth is None:
+        results['SNR'] = np.full_like(casc_gain, np.nan)
+    else:
+        noise_floor = KT0_DBM_HZ + 10 * np.log10(bandwidth)
+        results['SNR'] = pin - noise_floor - results['NF']
+
+    return results
+
+
+SENSITIVITY_METRICS = ['dNF_dgain', 'dNF_dNF']
+
+
+def cascade_nf_sensitivity(gain, nf):
+    """
+    Analytic sensitivity of the total cascaded NF to the gain and NF of every stage, in dB per dB.
+
+    With the stage noise factors F_i, the gain ahead of each stage Gp_i and the Friis terms T_i = (F_i - 1)/Gp_i,
+    the total noise factor is F = 1 + sum(T_i) and:
+
+        dNF/dNF_i = F_i / (Gp_i * F)
+        dNF/dgain_i = -sum(T_k for k > i) / F
+
+    The forward pass is the Friis cumulative sum and the reverse pass is a reversed cumulative sum of the terms,
+    so every stage and frequency is covered by two array passes instead of re-running the cascade per stage.
+    The total cascaded gain is simply the sum of the stage gains, so its sensitivity to every stage gain is 1.
+
+    Args:
+        gain (ndarray): stage gain in dB, shape (..., stages, freqs)
+        nf (ndarray): stage NF in dB, same shape as gain
+
+    Returns:
+        results (dict): {'dNF_dgain': ndarray, 'dNF_dNF': ndarray}, each the same shape as gain
+    """
+    gain = np.asarray(gain, dtype=np.float64)
+    factor = db_to_linear(nf)
+
+    prev_gain_linear = np.ones_like(gain)
+    prev_gain_linear[..., 1:, :] = db_to_linear(np.cumsum(gain, axis=-2)[..., :-1, :])
+    terms = (factor - 1) / prev_gain_linear
+    total = 1 + terms.sum(axis=-2, keepdims=True)
+
+    # terms of the stages after each stage: reversed cumulative sum, shifted by one
+    after = np.flip(np.cumsum(np.flip(terms, axis=-2), axis=-2), axis=-2)
+    after[..., :-1, :] = after[..., 1:, :]
+    after[..., -1, :] = 0
+
+    return {'dNF_dgain': -after / total,
+            'dNF_dNF': factor / (prev_gain_linear * total)}
@@ -0,0 +1,217 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ..components.base_component import FrequencyConverter
+from .cascade import db_to_linear, linear_to_db
+
+
+class DesignExplorer:
+
+    def __init__(self, slots, freqs, nf_max=None, gain_min=None, gain_max=None):
+        """
+        Branch and bound search over every combination of candidate parts per slot.  Chains are ranked by their
+        worst case (max over freqs) cascaded NF, with ties broken by the higher worst case (min over freqs) gain.
+
+        The search walks a prefix tree of the combinations, so the cascaded gain/NF of a prefix is computed once
+        and shared by every chain that starts with it.  All candidates of the next slot are cascaded at once.
+        A branch is pruned when its partial NF already fails nf_max or is worse than the current top results
+        (cascaded NF can only grow along the chain), or when the best/worst remaining gain can't meet the gain
+        specs.
+
+        Every candidate is resampled at the chain input frequencies, so only the last slot may hold mixers with an
+        LO plan.
+
+        Args:
+            slots (list): list of candidate Component lists, one per slot in chain order
+            freqs (ndarray): Simulation frequencies in MHz
+            nf_max (float): maximum cascaded NF in dB
+            gain_min (float): minimum cascaded gain in dB
+            gain_max (float): maximum cascaded gain in dB
+        """
+        self.slots = slots
+        self.freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        self.specs = (nf_max, gain_min, gain_max)
+        self.stats = None
+
+        for level, slot in enumerate(slots[:-1]):
+            for comp in slot:
+                if isinstance(comp.definition, FrequencyConverter) and comp.definition.has_lo_plan():
+                    raise ValueError("Candidate ({}) in slot ({}) translates frequencies. Mixers with an LO plan are "
+                                     "only supported in the last slot".format(comp.uid, level))
+
+        # resample every candidate once: (candidates, freqs) arrays per slot
+        gains = [np.array([comp.get_values('gain', self.freqs) for comp in slot]) for slot in slots]
+        factors = [db_to_linear([comp.get_values('NF', self.freqs) for comp in slot]) for slot in slots]
+
+        # best and worst gain still available after each slot
+        rem_max = [np.zeros(len(self.freqs))]
+        rem_min = [np.zeros(len(self.freqs))]
+        for gain in reversed(gains[1:]):
+            rem_max.insert(0, rem_max[0] + gain.max(axis=0))
+            rem_min.insert(0, rem_min[0] + gain.min(axis=0))
+
+        self.tables = (gains, factors, rem_max, rem_min)
+
+    def combinations(self):
+        """
+        Total number of combinations in the design space
+
+        Returns:
+            (int)
+        """
+        total = 1
+        for slot in self.slots:
+            total *= len(slot)
+        return total
+
+    def run(self, top=10, workers=None, split_depth=1):
+        """
+        Run the search
+
+        The prefix tree is expanded to split_depth in this process and the remaining subtrees are searched by a
+        process pool.  Each worker prunes against its own top results and the results are merged at the end.
+
+        Args:
+            top (int): number of chains to return
+            workers (int): Number of worker processes.  Defaults to the CPU count, 1 runs in this process
+            split_depth (int): depth at which subtrees are handed to the workers
+
+        Returns:
+            results (list): dicts with 'choice' (candidate index per slot), 'components', 'NF' (worst case, dB) and
+                'gain' (worst case, dB), best first
+        """
+        root = [((), np.zeros(len(self.freqs)), np.ones(len(self.freqs)))]
+        workers = os.cpu_count() if workers is None else workers
+        split_depth = min(split_depth, len(self.slots) - 1)
+
+        if workers <= 1 or split_depth < 1:
+            best, stats = _search(self.tables, self.specs, 0, root, top)
+        else:
+            prefixes, stats = _expand(self.tables, self.specs, 0, root, split_depth)
+            tasks = [prefixes[x::workers] for x in range(workers) if prefixes[x::workers]]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_search, self.tables, self.specs, split_depth, task, top) for task in tasks]
+                outputs = [x.result() for x in futures]
+            best = list()
+            for task_best, task_stats in outputs:
+                best.extend(task_best)
+                stats = [x + y for x, y in zip(stats, task_stats)]
+
+        self.stats = {'evaluated': stats[0], 'pruned': stats[1]}
+        results = list()
+        for neg_nf, gain, choice in sorted(best, key=lambda x: (-x[0], -x[1]))[:top]:
+            results.append({'choice': choice,
+                            'components': [slot[idx] for slot, idx in zip(self.slots, choice)],
+                            'NF': -neg_nf,
+                            'gain': gain})
+        return results
+
+
+def _extend(tables, specs, level, g, f, nf_bound=None):
+    """
+    Cascade every candidate of a slot onto a prefix and flag the candidates that survive pruning
+
+    Args:
+        tables (tuple): (gains, noise factors, remaining max gain, remaining min gain) per slot
+        specs (tuple): (nf_max, gain_min, gain_max)
+        level (int): slot index
+        g (ndarray): cascaded gain of the prefix in dB, shape (freqs,)
+        f (ndarray): cascaded noise factor of the prefix (linear), shape (freqs,)
+        nf_bound (float): prune candidates with a worse NF than this
+
+    Returns:
+        (tuple): (cascaded gain, cascaded noise factor, worst case NF in dB, keep flags)
+    """
+    gains, factors, rem_max, rem_min = tables
+    nf_max, gain_min, gain_max = specs
+
+    cand_g = g + gains[level]
+    cand_f = f + (factors[level] - 1) / db_to_linear(g)
+    worst_nf = linear_to_db(cand_f.max(axis=1))
+
+    keep = np.ones(len(cand_g), dtype=bool)
+    if nf_max is not None:
+        keep &= worst_nf <= nf_max
+    if nf_bound is not None:
+        keep &= worst_nf <= nf_bound
+    if gain_min is not None:
+        keep &= (cand_g + rem_max[level]).min(axis=1) >= gain_min
+    if gain_max is not None:
+        keep &= (cand_g + rem_min[level]).max(axis=1) <= gain_max
+
+    return cand_g, cand_f, worst_nf, keep
+
+
+def _expand(tables, specs, level, prefixes, depth):
+    """
+    Expand prefixes breadth first down to a slot depth, pruning on the specs
+
+    Args:
+        tables (tuple): lookup tables, see _extend
+        specs (tuple): (nf_max, gain_min, gain_max)
+        level (int): slot index of the prefixes
+        prefixes (list): (choice, cascaded gain, cascaded noise factor) tuples
+        depth (int): slot depth to expand to
+
+    Returns:
+        (tuple): (list of expanded prefixes, [evaluated, pruned] counts)
+    """
+    stats = [0, 0]
+    while level < depth:
+        expanded = list()
+        for choice, g, f in prefixes:
+            cand_g, cand_f, worst_nf, keep = _extend(tables, specs, level, g, f)
+            stats[0] += len(keep)
+            stats[1] += int((~keep).sum())
+            for idx in np.flatnonzero(keep):
+                expanded.append((choice + (int(idx),), cand_g[idx], cand_f[idx]))
+        prefixes = expanded
+        level += 1
+
+    return prefixes, stats
+
+
+def _search(tables, specs, level, prefixes, top):
+    """
+    Depth first branch and bound search below a set of prefixes.  This is a module level function so it can be
+    sent to worker processes
+
+    Args:
+        tables (tuple): lookup tables, see _extend
+        specs (tuple): (nf_max, gain_min, gain_max)
+        level (int): slot index of the prefixes
+        prefixes (list): (choice, cascaded gain, cascaded noise factor) tuples
+        top (int): number of chains to keep
+
+    Returns:
+        (tuple): (list of (-NF, gain, choice) tuples, [evaluated, pruned] counts)
+    """
+    last = len(tables[0]) - 1
+    best = list()   # heap, the worst kept chain is at best[0]
+    stats = [0, 0]
+
+    def descend(level, choice, g, f):
+        nf_bound = -best[0][0] if len(best) >= top else None
+        cand_g, cand_f, worst_nf, keep = _extend(tables, specs, level, g, f, nf_bound)
+        stats[0] += len(keep)
+        stats[1] += int((~keep).sum())
+
+        candidates = np.flatnonzero(keep)
+        if level == last:
+            min_gain = cand_g[candidates].min(axis=1)
+            for idx, gain in zip(candidates, min_gain):
+                item = (-worst_nf[idx], gain, choice + (int(idx),))
+                if len(best) < top:
+                    heapq.heappush(best, item)
+                else:
+                    heapq.heappushpop(best, item)
+        else:
+            # visit the most promising candidates first to tighten the bound early
+            for idx in candidates[np.argsort(worst_nf[candidates], kind='stable')]:
+                descend(level + 1, choice + (int(idx),), cand_g[idx], cand_f[idx])
+
+    for choice, g, f in prefixes:
+        descend(level, choice, g, f)
+
+    return best, stats
@@ -0,0 +1,198 @@
+import ast
+import os
+import struct
+import numpy as np
+from .errors import validate_arg
+
+FORMATS = ['csv', 'npy']
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+NPY_HEADER_LEN = 246    # header dict length, so magic + length + header is 256 bytes
+SHAPE_DIGITS = 20       # room reserved in the header for the final row count
+
+
+def result_columns(result):
+    """
+    Export column names for a SimulationResult
+
+    Args:
+        result (SimulationResult): simulation result
+
+    Returns:
+        (list): ['stage', 'freq'] followed by the result metrics
+    """
+    return ['stage', 'freq'] + list(result.metrics)
+
+
+def result_rows(result, stage):
+    """
+    Flatten one stage of a SimulationResult into export rows
+
+    Args:
+        result (SimulationResult): simulation result
+        stage (int): stage index
+
+    Returns:
+        (ndarray): rows with shape (freqs, 2 + metrics), see result_columns
+    """
+    rows = np.empty((len(result.freqs), 2 + len(result.metrics)))
+    rows[:, 0] = stage
+    rows[:, 1] = result.freqs
+    rows[:, 2:] = result.data[stage]
+    return rows
+
+
+class ResultWriter:
+
+    def __init__(self, filepath, columns, fmt=None, append=False):
+        """
+        Streaming writer for tabular results.  Rows are written chunk by chunk as they are produced, so memory use
+        is bounded by the largest chunk rather than the whole result.
+
+        Two formats are supported:
+            'csv': one header line with the column names followed by one line per row
+            'npy': a standard .npy file holding a 1-D structured array with one float64 field per column.  The
+                header reserves room for the row count, so the file can be appended to and is rewritten in place
+                with the final count on close.  Use open_export to memory map it.
+
+        Args:
+            filepath (str): output filepath
+            columns (list): column names
+            fmt (str): 'csv' or 'npy'.  Defaults to the filepath extension
+            append (bool): append to an existing file with the same columns
+        """
+        fmt = fmt if fmt is not None else os.path.splitext(filepath)[1].lstrip('.').lower()
+        validate_arg(fmt, FORMATS)
+
+        self.filepath = filepath
+        self.columns = list(columns)
+        self.fmt = fmt
+        self.rows = 0
+        self.dtype = np.dtype([(name, '<f8') for name in self.columns])
+
+        append = append and os.path.exists(filepath)
+        if fmt == 'csv':
+            self._fp = open(filepath, 'a' if append else 'w')
+            if append:
+                with open(filepath) as fp:
+                    header = fp.readline().strip()
+                    self.rows = sum(1 for line in fp)
+                if header.split(',') != self.columns:
+                    raise ValueError("File ({}) has columns {}, not {}".format(filepath, header.split(','),
+                                                                              self.columns))
+            else:
+                self._fp.write(','.join(self.columns) + '\n')
+        else:
+            if append:
+                dtype, self.rows, offset = read_npy_header(filepath)
+                if dtype != self.dtype:
+                    raise ValueError("File ({}) has columns {}, not {}".format(filepath, list(dtype.names),
+                                                                              self.columns))
+                self._fp = open(filepath, 'r+b')
+                self._fp.seek(offset + self.rows * self.dtype.itemsize)
+                self._fp.truncate()
+            else:
+                self._fp = open(filepath, 'wb')
+                self._write_npy_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _write_npy_header(self):
+        header = "{{'descr': {}, 'fortran_order': False, 'shape': ({},), }}".format(
+            self.dtype.descr, str(self.rows).ljust(SHAPE_DIGITS))
+        if len(header) >= NPY_HEADER_LEN:
+            raise ValueError("Too many columns for the .npy header ({})".format(len(self.columns)))
+        header = header.ljust(NPY_HEADER_LEN - 1) + '\n'
+        self._fp.seek(0)
+        self._fp.write(NPY_MAGIC + struct.pack('<H', NPY_HEADER_LEN) + header.encode('latin1'))
+
+    def write(self, rows):
+        """
+        Write a chunk of rows
+
+        Args:
+            rows (ndarray or dict): array with shape (rows, columns), or a dict of equal length column arrays
+        """
+        if isinstance(rows, dict):
+            rows = np.column_stack([np.asarray(rows[name], dtype=np.float64).ravel() for name in self.columns])
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+        if rows.shape[1] != len(self.columns):
+            raise ValueError("Rows have {} columns, expected {}".format(rows.shape[1], len(self.columns)))
+
+        if self.fmt == 'csv':
+            np.savetxt(self._fp, rows, fmt='%.12g', delimiter=',')
+        else:
+            self._fp.write(np.ascontiguousarray(rows).tobytes())
+        self.rows += len(rows)
+
+    def write_result(self, result):
+        """
+        Write a SimulationResult one stage at a time
+
+        Args:
+            result (SimulationResult): simulation result.  Its metrics must match the writer columns
+        """
+        for stage in range(len(result)):
+            self.write(result_rows(result, stage))
+
+    def close(self):
+        """
+        Finish the file.  For 'npy' this writes the final row count into the header
+        """
+        if self._fp is None:
+            return
+        if self.fmt == 'npy':
+            self._write_npy_header()
+        self._fp.close()
+        self._fp = None
+
+
+def read_npy_header(filepath):
+    """
+    Read the header of a .npy file written by ResultWriter
+
+    Args:
+        filepath (str): .npy filepath
+
+    Returns:
+        (tuple): (dtype, rows, data offset in bytes)
+    """
+    with open(filepath, 'rb') as fp:
+        magic = fp.read(len(NPY_MAGIC))
+        if magic != NPY_MAGIC:
+            raise ValueError("File ({}) is not a version 1.0 .npy file".format(filepath))
+        header_len = struct.unpack('<H', fp.read(2))[0]
+        header = ast.literal_eval(fp.read(header_len).decode('latin1'))
+
+    return np.dtype(header['descr']), header['shape'][0], len(NPY_MAGIC) + 2 + header_len
+
+
+def open_export(filepath):
+    """
+    Memory map a .npy file written by ResultWriter.  Columns are read by name, e.g. data['NF'], and only the
+    pages that are touched are read from disk
+
+    Args:
+        filepath (str): .npy filepath
+
+    Returns:
+        (memmap): read-only structured array with one field per column
+    """
+    return np.load(filepath, mmap_mode='r')
+
+
+def load_csv(filepath):
+    """
+    Read a .csv file written by ResultWriter
+
+    Args:
+        filepath (str): .csv filepath
+
+    Returns:
+        (ndarray): structured array with one field per column
+    """
+    return np.genfromtxt(filepath, delimiter=',', names=True, dtype=np.float64, ndmin=1)
@@ -0,0 +1,140 @@
+import numpy as np
+from ..components.base_component import FrequencyConverter
+from .sim_engine import CascadeEngine
+
+
+def mixer_products(max_order):
+    """
+    Enumerate the mixing products m*LO + s*n*RF with m, n >= 0, 1 <= m + n <= max_order and s = +1/-1.  Products
+    that only differ by the sign of a zero term are listed once, and the desired product (1, 1, -1) is left out
+
+    Args:
+        max_order (int): highest m + n
+
+    Returns:
+        (tuple): (m, n, sign) int arrays, one entry per product
+    """
+    products = list()
+    for m in range(max_order + 1):
+        for n in range(max_order + 1 - m):
+            if m + n == 0:
+                continue
+            for sign in ((1,) if m == 0 or n == 0 else (-1, 1)):
+                if (m, n, sign) != (1, 1, -1):
+                    products.append((m, n, sign))
+    m, n, sign = np.array(products).T
+    return m, n, sign
+
+
+class SpurResult:
+
+    def __init__(self, freqs, if_freqs, m, n, sign, spur_freqs, rejection, level, in_band):
+        """
+        Results of a spur search.  Product arrays have shape (products, freqs)
+
+        Args:
+            freqs (ndarray): Simulation (chain input) frequencies in MHz
+            if_freqs (ndarray): desired IF frequency for each RF frequency in MHz
+            m (ndarray): LO harmonic of each product
+            n (ndarray): RF harmonic of each product
+            sign (ndarray): +1 for m*LO + n*RF, -1 for |m*LO - n*RF|
+            spur_freqs (ndarray): spur frequency in MHz
+            rejection (ndarray): attenuation of the spur relative to the IF by the stages after the mixer, in dB
+            level (ndarray): spur level at the IF output relative to the desired signal, in dBc
+            in_band (ndarray): True where the spur falls inside the IF bandwidth
+        """
+        self.freqs = freqs
+        self.if_freqs = if_freqs
+        self.m = m
+        self.n = n
+        self.sign = sign
+        self.spur_freqs = spur_freqs
+        self.rejection = rejection
+        self.level = level
+        self.in_band = in_band
+
+    def worst(self, in_band_only=True):
+        """
+        Highest spur at each frequency
+
+        Args:
+            in_band_only (bool): only consider spurs inside the IF bandwidth
+
+        Returns:
+            (tuple): (level in dBc, product index) arrays with shape (freqs,).  The level is -inf and the index -1
+                where there is no spur
+        """
+        level = np.where(self.in_band, self.level, -np.inf) if in_band_only else self.level
+        idx = np.argmax(level, axis=0)
+        worst = np.take_along_axis(level, idx[np.newaxis], 0)[0]
+        return worst, np.where(np.isfinite(worst), idx, -1)
+
+    def label(self, idx):
+        """
+        Readable name of a product, e.g. '2LO-1RF'
+
+        Args:
+            idx (int): product index
+
+        Returns:
+            (str)
+        """
+        return "{}LO{}{}RF".format(self.m[idx], '+' if self.sign[idx] > 0 else '-', self.n[idx])
+
+
+def spur_search(comp_list, mixer_idx, freqs, max_order=5, if_bandwidth=None, spur_table=None):
+    """
+    Search every mixing product of a mixer in a chain over a whole sweep.  All products and frequencies are
+    evaluated as one broadcast (products x freqs) array computation.
+
+    Each spur is attenuated by the stages after the mixer (up to the next mixer): the rejection is their total gain
+    at the IF minus their total gain at the spur frequency, with every stage resampled once over all spur
+    frequencies.  The spur level is the mixer's intrinsic product level from spur_table (0 dBc when not given)
+    minus the rejection.  Parameters are clamped at the ends of their data, so the gain data of the filters after
+    the mixer should cover the spur frequencies of interest.
+
+    Args:
+        comp_list (list): Component objects in chain order
+        mixer_idx (int): index of the mixer stage
+        freqs (ndarray): Simulation (chain input) frequencies in MHz
+        max_order (int): highest m + n
+        if_bandwidth (float): IF bandwidth in MHz.  Spurs within half of it from the IF are in band.  Defaults to
+            every spur being in band
+        spur_table (dict): intrinsic product levels in dBc keyed by (m, n)
+
+    Returns:
+        (SpurResult)
+    """
+    mixer = comp_list[mixer_idx]
+    if not isinstance(mixer.definition, FrequencyConverter) or not mixer.definition.has_lo_plan():
+        raise ValueError("Stage ({}) is not a mixer with an LO plan".format(mixer_idx))
+
+    freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+    rf = CascadeEngine(comp_list).stage_freqs(freqs, mixer_idx)
+    lo = mixer.definition.lo(rf)
+    if_freqs = mixer.translate(rf)
+
+    m, n, sign = mixer_products(max_order)
+    spur_freqs = np.abs(m[:, np.newaxis] * lo + (sign * n)[:, np.newaxis] * rf)
+
+    # stages that see the IF, up to and including the next mixer's input
+    post = list()
+    for comp in comp_list[mixer_idx + 1:]:
+        post.append(comp)
+        if isinstance(comp.definition, FrequencyConverter) and comp.definition.has_lo_plan():
+            break
+    rejection = np.zeros(spur_freqs.shape)
+    for comp in post:
+        rejection += comp.get_values('gain', if_freqs) - comp.get_values('gain', spur_freqs)
+
+    intrinsic = np.zeros(len(m))
+    if spur_table is not None:
+        intrinsic = np.array([spur_table.get((int(x), int(y)), 0.0) for x, y in zip(m, n)])
+    level = intrinsic[:, np.newaxis] - rejection
+
+    if if_bandwidth is None:
+        in_band = np.ones(spur_freqs.shape, dtype=bool)
+    else:
+        in_band = np.abs(spur_freqs - if_freqs) <= if_bandwidth / 2.0
+
+    return SpurResult(freqs, if_freqs, m, n, sign, spur_freqs, rejection, level, in_band)
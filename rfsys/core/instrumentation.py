@@ -0,0 +1,189 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+EVENTS = ['run_start', 'stage', 'metric', 'run_end']
+
+
+class Instrumentation:
+    enabled = True
+
+    def __init__(self):
+        """
+        Collects counters, per phase wall clock timers and event callbacks.  Library code reports to the active
+        instrumentation (see activate), which is a no-op NullInstrumentation unless one has been activated.
+
+        Counter and timer names are dotted strings, e.g. 'parameter.interp_calls' or 'engine.cascade'
+        """
+        self.counters = dict()
+        self.timers = dict()    # name -> [total seconds, calls]
+        self.hooks = {event: list() for event in EVENTS}
+
+    def count(self, name, n=1):
+        """
+        Increment a counter
+
+        Args:
+            name (str): counter name
+            n (int): increment
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def timer(self, name):
+        """
+        Context manager that adds the wall clock time of its block to a timer
+
+        Args:
+            name (str): timer name
+
+        Returns:
+            context manager
+        """
+        return _Timer(self, name)
+
+    def add_time(self, name, seconds):
+        """
+        Add time to a timer
+
+        Args:
+            name (str): timer name
+            seconds (float): elapsed time
+        """
+        entry = self.timers.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def add_hook(self, event, callback):
+        """
+        Register a callback for an event.  The callback is called with keyword arguments describing the event
+
+        Args:
+            event (str): one of EVENTS
+            callback (callable): callback function
+        """
+        if event not in self.hooks:
+            raise ValueError("Invalid event ({}). Valid events: {}".format(event, EVENTS))
+        self.hooks[event].append(callback)
+
+    def emit(self, event, **info):
+        """
+        Call every callback registered for an event
+
+        Args:
+            event (str): event name
+            **info: event details passed to the callbacks
+        """
+        for callback in self.hooks[event]:
+            callback(**info)
+
+    def has_hooks(self, event):
+        """
+        Check whether any callbacks are registered for an event, so callers can skip building event details
+
+        Args:
+            event (str): event name
+
+        Returns:
+            (bool)
+        """
+        return len(self.hooks[event]) > 0
+
+    @contextmanager
+    def activate(self):
+        """
+        Make this the active instrumentation for the duration of a with block
+        """
+        global _active
+        previous = _active
+        _active = self
+        try:
+            yield self
+        finally:
+            _active = previous
+
+    def reset(self):
+        """
+        Clear all counters and timers.  Hooks are kept
+        """
+        self.counters = dict()
+        self.timers = dict()
+
+    def report(self):
+        """
+        Structured report of everything collected
+
+        Returns:
+            (dict): {'counters': {name: count}, 'timers': {name: {'seconds': total, 'calls': n}}}
+        """
+        return {'counters': dict(self.counters),
+                'timers': {name: {'seconds': total, 'calls': calls} for name, (total, calls) in self.timers.items()}}
+
+    def to_json(self, filepath):
+        """
+        Write the report to a JSON file
+
+        Args:
+            filepath (str): output filepath
+        """
+        with open(filepath, 'w') as fp:
+            json.dump(self.report(), fp, indent=2)
+
+
+class NullInstrumentation(Instrumentation):
+    enabled = False
+
+    def __init__(self):
+        """
+        Instrumentation that records nothing.  Hot paths check the enabled flag before reporting, so this costs
+        a single attribute lookup per check
+        """
+        super().__init__()
+        self._null_timer = nullcontext()
+
+    def count(self, name, n=1):
+        pass
+
+    def timer(self, name):
+        return self._null_timer
+
+    def add_time(self, name, seconds):
+        pass
+
+    def add_hook(self, event, callback):
+        raise ValueError("Hooks can't be added to NullInstrumentation")
+
+    def emit(self, event, **info):
+        pass
+
+    def has_hooks(self, event):
+        return False
+
+
+class _Timer:
+    __slots__ = ('instrumentation', 'name', 'start')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+_active = NullInstrumentation()
+
+
+def active():
+    """
+    Get the active instrumentation
+
+    Returns:
+        (Instrumentation)
+    """
+    return _active
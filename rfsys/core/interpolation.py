@@ -0,0 +1,171 @@
+import numpy as np
+
+INTERP_MODES = ['linear', 'log', 'nearest', 'pchip', 'cubic']
+
+
+def _secants(x, y):
+    """
+    Segment widths and slopes.  Zero width segments (repeated points) get a zero slope
+
+    Args:
+        x (ndarray): sorted knot positions
+        y (ndarray): knot values
+
+    Returns:
+        (tuple): (widths, slopes), each with shape (knots - 1,)
+    """
+    h = np.diff(x)
+    delta = np.divide(np.diff(y), h, out=np.zeros_like(h), where=h > 0)
+    return h, delta
+
+
+def pchip_slopes(x, y):
+    """
+    Knot derivatives of the monotone piecewise cubic Hermite interpolant (Fritsch-Carlson, with the same end
+    conditions as scipy's PchipInterpolator).  The interpolant never overshoots the data
+
+    Args:
+        x (ndarray): sorted knot positions
+        y (ndarray): knot values
+
+    Returns:
+        (ndarray): derivative at each knot
+    """
+    h, delta = _secants(x, y)
+    d = np.zeros_like(y)
+    if len(x) == 2:
+        d[:] = delta[0]
+        return d
+
+    # interior knots: weighted harmonic mean of the neighbouring slopes, zero at a local extremum
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    same_sign = (np.sign(delta[:-1]) * np.sign(delta[1:])) > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        harmonic = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+    d[1:-1] = np.where(same_sign, harmonic, 0.0)
+
+    d[0] = _pchip_end(h[0], h[1], delta[0], delta[1])
+    d[-1] = _pchip_end(h[-1], h[-2], delta[-1], delta[-2])
+    return d
+
+
+def _pchip_end(h0, h1, delta0, delta1):
+    """
+    Shape preserving three point estimate of an end derivative
+    """
+    if h0 + h1 == 0:
+        return 0.0
+    d = ((2 * h0 + h1) * delta0 - h0 * delta1) / (h0 + h1)
+    if np.sign(d) != np.sign(delta0):
+        return 0.0
+    if np.sign(delta0) != np.sign(delta1) and abs(d) > abs(3 * delta0):
+        return 3 * delta0
+    return d
+
+
+def spline_slopes(x, y):
+    """
+    Knot derivatives of the natural cubic spline (zero second derivative at both ends).  The tridiagonal system is
+    solved with the Thomas algorithm, so the cost is linear in the number of knots
+
+    Args:
+        x (ndarray): sorted knot positions
+        y (ndarray): knot values
+
+    Returns:
+        (ndarray): derivative at each knot
+    """
+    h, delta = _secants(x, y)
+    n = len(x)
+    if n == 2:
+        return np.full(2, delta[0])
+
+    # h[i] d[i-1] + 2 (h[i-1] + h[i]) d[i] + h[i-1] d[i+1] = 3 (h[i] delta[i-1] + h[i-1] delta[i])
+    lower = np.zeros(n)
+    diag = np.empty(n)
+    upper = np.zeros(n)
+    rhs = np.empty(n)
+    diag[0], upper[0], rhs[0] = 2.0, 1.0, 3 * delta[0]
+    diag[-1], lower[-1], rhs[-1] = 2.0, 1.0, 3 * delta[-1]
+    lower[1:-1] = h[1:]
+    diag[1:-1] = 2 * (h[:-1] + h[1:])
+    upper[1:-1] = h[:-1]
+    rhs[1:-1] = 3 * (h[1:] * delta[:-1] + h[:-1] * delta[1:])
+
+    for i in range(1, n):
+        if diag[i - 1] == 0:
+            continue
+        m = lower[i] / diag[i - 1]
+        diag[i] -= m * upper[i - 1]
+        rhs[i] -= m * rhs[i - 1]
+    d = np.zeros(n)
+    for i in range(n - 1, -1, -1):
+        tail = upper[i] * d[i + 1] if i < n - 1 else 0.0
+        d[i] = (rhs[i] - tail) / diag[i] if diag[i] != 0 else 0.0
+    return d
+
+
+def hermite_coefficients(x, y, slopes):
+    """
+    Cubic coefficients of each segment in the segment's normalized coordinate t in [0, 1]:
+    value = c0 + c1 t + c2 t^2 + c3 t^3
+
+    Args:
+        x (ndarray): sorted knot positions
+        y (ndarray): knot values
+        slopes (ndarray): derivative at each knot
+
+    Returns:
+        (ndarray): coefficients with shape (4, knots - 1)
+    """
+    h = np.diff(x)
+    m0 = slopes[:-1] * h
+    m1 = slopes[1:] * h
+    dy = np.diff(y)
+    return np.array([y[:-1], m0, 3 * dy - 2 * m0 - m1, m0 + m1 - 2 * dy])
+
+
+def interp_coefficients(mode, x, y):
+    """
+    Precompute the segment coefficients for an interpolation mode
+
+    Args:
+        mode (str): one of INTERP_MODES
+        x (ndarray): sorted knot positions (log10 of the frequency for 'log')
+        y (ndarray): knot values
+
+    Returns:
+        (ndarray or None): (4, knots - 1) cubic coefficients for 'pchip' and 'cubic', None for the modes that
+            only need the knot values
+    """
+    if len(x) < 2:
+        return None
+    if mode == 'pchip':
+        return hermite_coefficients(x, y, pchip_slopes(x, y))
+    if mode == 'cubic':
+        return hermite_coefficients(x, y, spline_slopes(x, y))
+    return None
+
+
+def evaluate(mode, y, coeffs, bins, weights):
+    """
+    Evaluate an interpolant from segment indices and normalized positions
+
+    Args:
+        mode (str): one of INTERP_MODES
+        y (ndarray): knot values
+        coeffs (ndarray): coefficients from interp_coefficients
+        bins (ndarray): segment index of each point
+        weights (ndarray): normalized position t in [0, 1] of each point within its segment
+
+    Returns:
+        (ndarray): interpolated values
+    """
+    if coeffs is not None:
+        c = coeffs[:, bins]
+        return c[0] + weights * (c[1] + weights * (c[2] + weights * c[3]))
+    if mode == 'nearest':
+        return y[bins + (weights >= 0.5)]
+    lower = y[bins]
+    return lower + weights * (y[bins + 1] - lower)
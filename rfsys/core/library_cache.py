@@ -0,0 +1,298 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import numpy as np
+from ..components import component_builder
+from .xml_parser import load_components
+from .instrumentation import active
+
+MAGIC = b'RFSYSLIB'
+VERSION = 1
+HEADER = struct.Struct('<8sIQ')     # magic, version, index length in bytes
+CACHE_EXT = '.rfcache'
+
+
+def source_stamp(filepath, with_hash=True):
+    """
+    Identify the current state of a source XML file
+
+    Args:
+        filepath (str): Full filepath for the XML file
+        with_hash (bool): Include the sha256 of the file contents
+
+    Returns:
+        stamp (dict): {'size', 'mtime_ns'[, 'sha256']}
+    """
+    stat = os.stat(filepath)
+    stamp = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        sha = hashlib.sha256()
+        with open(filepath, 'rb') as fp:
+            for block in iter(lambda: fp.read(1 << 20), b''):
+                sha.update(block)
+        stamp['sha256'] = sha.hexdigest()
+
+    return stamp
+
+
+def compile_library(filepath, cache_path=None):
+    """
+    Compile a component XML file into a binary cache.  The cache holds a JSON index (source stamp, components and
+    parameter attributes with the location of their data) followed by one contiguous float64 block holding the
+    sorted freqs and values of every parameter.
+
+    Args:
+        filepath (str): Full filepath for the XML file
+        cache_path (str): Cache filepath.  Defaults to the XML filepath with a .rfcache extension
+
+    Returns:
+        cache_path (str): Cache filepath
+    """
+    with active().timer('library_cache.compile'):
+        return _compile_library(filepath, cache_path or filepath + CACHE_EXT)
+
+
+def _compile_library(filepath, cache_path):
+    stamp = source_stamp(filepath)
+
+    blocks = list()
+    offset = 0
+    components = list()
+    for comp_dict in load_components(filepath):
+        params = list()
+        for param in comp_dict['params'].values():
+            freqs = np.asarray(param['freqs'], dtype=np.float64)
+            values = np.asarray(param['values'], dtype=np.float64)
+            order = np.argsort(freqs, kind='stable')
+            blocks.extend([freqs[order], values[..., order].ravel()])
+
+            attrs = {key: val for key, val in param.items() if key not in ('freqs', 'values')}
+            for key in ('limits', 'temps'):
+                if key in attrs:
+                    attrs[key] = [float(x) for x in attrs[key]]
+            params.append({'attrs': attrs, 'offset': offset, 'count': len(freqs)})
+            offset += len(freqs) + values.size
+
+        comp = {key: val for key, val in comp_dict.items() if key != 'params'}
+        comp['params'] = params
+        components.append(comp)
+
+    index = json.dumps({'source': stamp, 'components': components}).encode('utf-8')
+    data_start = _align(HEADER.size + len(index))
+
+    # a unique temporary file per compile, so concurrent compiles of the same library don't write to one file
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(cache_path) + '.',
+                                    dir=os.path.dirname(os.path.abspath(cache_path)))
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(HEADER.pack(MAGIC, VERSION, len(index)))
+            fp.write(index)
+            fp.write(b'\0' * (data_start - HEADER.size - len(index)))
+            for block in blocks:
+                fp.write(block.tobytes())
+        os.replace(tmp_path, cache_path)    # readers never see a partially written cache
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    return cache_path
+
+
+def open_library(filepath, cache_path=None):
+    """
+    Open the compiled cache of a component XML file, compiling it first if it is missing or stale
+
+    Args:
+        filepath (str): Full filepath for the XML file
+        cache_path (str): Cache filepath.  Defaults to the XML filepath with a .rfcache extension
+
+    Returns:
+        (CompiledLibrary)
+    """
+    cache_path = cache_path or filepath + CACHE_EXT
+    if os.path.exists(cache_path):
+        lib = CompiledLibrary(cache_path)
+        if lib.is_current(filepath):
+            return lib
+        lib.close()
+
+    compile_library(filepath, cache_path)
+    return CompiledLibrary(cache_path)
+
+
+def _align(offset, size=8):
+    return (offset + size - 1) // size * size
+
+
+class CompiledLibrary:
+
+    def __init__(self, cache_path):
+        """
+        Component library backed by a memory mapped binary cache.  Opening only reads the index; parameter arrays
+        are read-only views into the mapping, so no data is parsed or copied and every process that opens the
+        same cache shares the same pages.  Pickling only sends the cache path, so worker processes reopen the
+        mapping instead of receiving copies of the data.
+
+        Call close() or use the library as a context manager to release the mapping.
+
+        Args:
+            cache_path (str): Cache filepath as written by compile_library
+        """
+        self.cache_path = cache_path
+        self._open()
+
+    def _open(self):
+        with active().timer('library_cache.open'), open(self.cache_path, 'rb') as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_len = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("File ({}) is not a version {} component library cache".format(self.cache_path, VERSION))
+
+        index = json.loads(self._map[HEADER.size:HEADER.size + index_len].decode('utf-8'))
+        self.source = index['source']
+        self.index = {str(comp['uid']): comp for comp in index['components']}
+        self.data = np.frombuffer(self._map, dtype=np.float64, offset=_align(HEADER.size + index_len))
+        self._cache = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        """
+        Release the memory mapping.  Components already built from the library keep views into it, so the pages
+        are unmapped once the last of them is released
+        """
+        if self._map is None:
+            return
+        self.data = None
+        self._cache = dict()
+        try:
+            self._map.close()
+        except BufferError:
+            pass    # still exported to live parameter arrays; unmapped when they are garbage collected
+        self._map = None
+
+    def __getstate__(self):
+        return {'cache_path': self.cache_path}
+
+    def __setstate__(self, state):
+        self.cache_path = state['cache_path']
+        self._open()
+
+    def __contains__(self, uid):
+        return str(uid) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, uid):
+        return self.get_component(uid)
+
+    def is_current(self, filepath):
+        """
+        Check whether the cache still matches its source XML file.  The cache is stale if the file size changed,
+        or if the mtime changed and the contents hash differs
+
+        Args:
+            filepath (str): Full filepath for the XML file
+
+        Returns:
+            (bool)
+        """
+        stamp = source_stamp(filepath, with_hash=False)
+        if stamp['size'] != self.source['size']:
+            return False
+        if stamp['mtime_ns'] == self.source['mtime_ns']:
+            return True
+        return source_stamp(filepath)['sha256'] == self.source['sha256']
+
+    def uids(self):
+        """
+        Get the uid of every component in the library
+
+        Returns:
+            (list): component uids in file order
+        """
+        return list(self.index.keys())
+
+    def get_dict(self, uid):
+        """
+        Get a component dictionary, in the same format as load_components.  The freqs and values are read-only
+        views into the cache
+
+        Args:
+            uid (str): Component uid
+
+        Returns:
+            comp_dict (dict): Component dictionary
+        """
+        uid = str(uid)
+        if uid not in self.index:
+            raise ValueError("Component library ({}) has no component uid ({})".format(self.cache_path, uid))
+        if self._map is None:
+            raise ValueError("Component library ({}) is closed".format(self.cache_path))
+
+        entry = self.index[uid]
+        comp_dict = {key: val for key, val in entry.items() if key != 'params'}
+        params = dict()
+        for param in entry['params']:
+            start = param['offset']
+            count = param['count']
+            pdict = dict(param['attrs'])
+            rows = len(pdict.get('temps', [None]))
+            pdict['freqs'] = self.data[start:start + count]
+            pdict['values'] = self.data[start + count:start + (1 + rows) * count]
+            if 'temps' in pdict:
+                pdict['values'] = pdict['values'].reshape(rows, count)
+            params[pdict['name']] = pdict
+        comp_dict['params'] = params
+
+        return comp_dict
+
+    def get_component(self, uid):
+        """
+        Get a component object, building it on first use
+
+        Args:
+            uid (str): Component uid
+
+        Returns:
+            comp (Component): Component object of the correct type
+        """
+        uid = str(uid)
+        if uid not in self._cache:
+            with active().timer('library_cache.build'):
+                self._cache[uid] = component_builder(self.get_dict(uid))
+        return self._cache[uid]
+
+    def build_chain(self, uids):
+        """
+        Build the component list for a chain
+
+        Args:
+            uids (list): Component uids in chain order
+
+        Returns:
+            (list): Component objects in chain order
+        """
+        return [self.get_component(uid) for uid in uids]
+
+    def build_netlist(self, graph):
+        """
+        Build only the components used by a compiled netlist
+
+        Args:
+            graph (NetlistGraph): compiled netlist
+
+        Returns:
+            (dict): Component objects keyed by uid
+        """
+        return {uid: self.get_component(uid) for uid in set(graph.uids.values())}
@@ -0,0 +1,327 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ..components.passive_components import PassiveComponent
+from .cascade import cascade_gain_nf
+from .errors import validate_arg
+from .sim_engine import CascadeEngine
+from .streaming_stats import StreamingStats, YieldCounter
+
+SPEC_METRICS = ['gain', 'NF']
+EXPORT_COLUMNS = ['trial', 'freq', 'gain', 'NF', 'passed']
+
+
+class MonteCarloResult:
+
+    def __init__(self, freqs, trials, yield_by_freq, yield_total, percentiles, levels, stats=None,
+                 yield_interval=None):
+        """
+        Container for the results of a Monte Carlo run.  All values refer to the system output (last stage).
+
+        Args:
+            freqs (ndarray): Simulation frequencies in MHz
+            trials (int): Number of trials run
+            yield_by_freq (ndarray): Fraction of trials meeting every spec at each frequency
+            yield_total (float): Fraction of trials meeting every spec at every frequency
+            percentiles (dict): {metric: ndarray with shape (levels, freqs)}
+            levels (list): Percentile levels in percent
+            stats (dict): {metric: StreamingStats} over every stage and frequency, from run_streaming
+            yield_interval (tuple): (lower, upper) confidence interval of yield_total, from run_streaming
+        """
+        self.freqs = freqs
+        self.trials = trials
+        self.yield_by_freq = yield_by_freq
+        self.yield_total = yield_total
+        self.percentiles = percentiles
+        self.levels = list(levels)
+        self.stats = stats
+        self.yield_interval = yield_interval
+
+    def get_percentile(self, name, level):
+        """
+        Get a percentile of a cascaded metric for every frequency
+
+        Args:
+            name (str): metric name
+            level (float): percentile level in percent, must be one of self.levels
+
+        Returns:
+            (ndarray): metric value at each frequency
+        """
+        if level not in self.levels:
+            raise ValueError("Percentile ({}) was not computed. Valid levels: {}".format(level, self.levels))
+        return self.percentiles[name][self.levels.index(level)]
+
+
+class MonteCarloEngine:
+
+    def __init__(self, comp_list, **kwargs):
+        """
+        Monte Carlo yield engine.  Every parameter with a Tolerance is drawn once per trial and the cascade is
+        computed for all trials of a chunk at once as a (trials x stages x freqs) array.
+
+        Tolerance limits are interpreted as deviations from the nominal parameter data.  A 'dB' tolerance is added
+        to the nominal value in dB and a 'per' tolerance scales the nominal linear value by the given percentage.
+        Normal distributions are centered on zero deviation.  The deviation of a trial is applied at every
+        frequency.  The NF of a passive component tracks the deviation of its gain.
+
+        Args:
+            comp_list (list): Component objects in chain order
+            **kwargs:
+        """
+        self.comp_list = comp_list
+        self.result = None
+
+    def get_tolerances(self):
+        """
+        Collect every toleranced parameter in the chain
+
+        Returns:
+            (list): (stage index, parameter name, Tolerance, linked) tuples.  linked is True when the stage NF
+                must track a gain deviation (passive components)
+        """
+        tols = list()
+        for idx, comp in enumerate(self.comp_list):
+            passive = isinstance(comp.definition, PassiveComponent)
+            for name in ('gain', 'NF'):
+                tol = comp.get_parameter(name).tolerance
+                if tol is not None:
+                    tols.append((idx, name, tol, passive and name == 'gain'))
+
+        return tols
+
+    def run(self, freqs, trials, specs=None, levels=(1, 50, 99), seed=None, chunk_size=4096, workers=None,
+            writer=None):
+        """
+        Run the Monte Carlo simulation
+
+        Trials are split into chunks of chunk_size.  Each chunk gets its own random stream spawned from seed, so
+        results are reproducible and do not depend on the number of workers.
+
+        Args:
+            freqs (ndarray): Simulation frequencies in MHz
+            trials (int): Number of trials
+            specs (dict): System specs, {metric: [lower, upper]}.  Use None for an open limit
+            levels (list): Percentile levels in percent
+            seed (int): Seed for the random streams
+            chunk_size (int): Number of trials evaluated per array computation
+            workers (int): Number of worker processes.  Defaults to the CPU count, 1 runs in this process
+            writer (ResultWriter): Optional writer with EXPORT_COLUMNS.  The output of every trial at every
+                frequency is written as each chunk completes.  The trials are still kept for the exact percentiles;
+                use run_streaming to export with bounded memory
+
+        Returns:
+            (MonteCarloResult)
+        """
+        if trials < 1:
+            raise ValueError("The number of trials must be at least 1, got ({})".format(trials))
+        specs = dict() if specs is None else specs
+        for name in specs.keys():
+            validate_arg(name, SPEC_METRICS)
+
+        freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        gain, nf = CascadeEngine(self.comp_list).resample(freqs)
+        tols = self.get_tolerances()
+
+        sizes = [chunk_size] * (trials // chunk_size)
+        if trials % chunk_size:
+            sizes.append(trials % chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        jobs = [(gain, nf, tols, size, seq, specs) for size, seq in zip(sizes, seeds)]
+
+        workers = os.cpu_count() if workers is None else workers
+        if workers <= 1 or len(jobs) <= 1:
+            chunks = self._collect((_run_chunk(*job) for job in jobs), freqs, writer)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunks = self._collect(pool.map(_run_chunk, *zip(*jobs)), freqs, writer)
+
+        out_gain = np.concatenate([x[0] for x in chunks])
+        out_nf = np.concatenate([x[1] for x in chunks])
+        passed = np.concatenate([x[2] for x in chunks])
+
+        percentiles = {'gain': np.percentile(out_gain, levels, axis=0),
+                       'NF': np.percentile(out_nf, levels, axis=0)}
+        self.result = MonteCarloResult(freqs, trials, passed.mean(axis=0), passed.all(axis=1).mean(),
+                                       percentiles, levels)
+        return self.result
+
+    def run_streaming(self, freqs, max_trials, specs=None, levels=(1, 50, 99), seed=None, chunk_size=4096,
+                      workers=None, ci_width=None, confidence=0.95, bins=64, writer=None):
+        """
+        Run the Monte Carlo simulation with bounded memory.  Each chunk of trials is folded into running statistics
+        (StreamingStats for the cascaded gain and NF of every stage and frequency, and yield counts) and then
+        dropped, so memory doesn't grow with the number of trials.  Percentiles are approximated from the
+        histograms.
+
+        With ci_width, the run stops after the first chunk at which the confidence interval of the total yield is
+        narrower than ci_width.  Chunks are seeded and folded in order, so the result for a given seed doesn't
+        depend on the number of workers.
+
+        Args:
+            freqs (ndarray): Simulation frequencies in MHz
+            max_trials (int): Maximum number of trials
+            specs (dict): System specs, {metric: [lower, upper]}.  Use None for an open limit
+            levels (list): Percentile levels in percent
+            seed (int): Seed for the random streams
+            chunk_size (int): Number of trials evaluated per array computation
+            workers (int): Number of worker processes.  Defaults to the CPU count, 1 runs in this process
+            ci_width (float): stop once the yield confidence interval is narrower than this
+            confidence (float): two sided confidence level of the yield interval
+            bins (int): histogram bins per stage and frequency
+            writer (ResultWriter): Optional writer with EXPORT_COLUMNS.  The system output of every trial at every
+                frequency is written as each chunk is folded in, so the export doesn't hold the trials in memory
+
+        Returns:
+            (MonteCarloResult): with stats and yield_interval set
+        """
+        if max_trials < 1:
+            raise ValueError("The number of trials must be at least 1, got ({})".format(max_trials))
+        specs = dict() if specs is None else specs
+        for name in specs.keys():
+            validate_arg(name, SPEC_METRICS)
+
+        freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        gain, nf = CascadeEngine(self.comp_list).resample(freqs)
+        tols = self.get_tolerances()
+        stats = {name: StreamingStats(gain.shape, bins) for name in SPEC_METRICS}
+        counter = YieldCounter(len(freqs))
+        root = np.random.SeedSequence(seed)
+
+        workers = os.cpu_count() if workers is None else workers
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            done = False
+            while not done and counter.trials < max_trials:
+                # one wave of up to one chunk per worker
+                sizes = list()
+                remaining = max_trials - counter.trials
+                while remaining > 0 and len(sizes) < max(workers, 1):
+                    sizes.append(min(chunk_size, remaining))
+                    remaining -= sizes[-1]
+                jobs = [(gain, nf, tols, size, seq, specs, True) for size, seq in zip(sizes, root.spawn(len(sizes)))]
+                outputs = map(_run_chunk, *zip(*jobs)) if pool is None else pool.map(_run_chunk, *zip(*jobs))
+
+                for chunk_gain, chunk_nf, passed in outputs:
+                    if writer is not None:
+                        _write_chunk(writer, counter.trials, freqs, chunk_gain[:, -1, :], chunk_nf[:, -1, :], passed)
+                    stats['gain'].update(chunk_gain)
+                    stats['NF'].update(chunk_nf)
+                    counter.update(passed)
+                    if ci_width is not None:
+                        lower, upper = counter.interval(confidence)
+                        if upper - lower < ci_width:
+                            done = True
+                            break
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        percentiles = {name: stats[name].percentile(levels)[:, -1, :] for name in SPEC_METRICS}
+        self.result = MonteCarloResult(freqs, counter.trials, counter.yield_by_freq, counter.yield_total,
+                                       percentiles, levels, stats=stats, yield_interval=counter.interval(confidence))
+        return self.result
+
+    @staticmethod
+    def _collect(outputs, freqs, writer):
+        """
+        Gather chunk outputs in trial order, writing each one out as it arrives
+
+        Args:
+            outputs (iterable): _run_chunk outputs
+            freqs (ndarray): Simulation frequencies in MHz
+            writer (ResultWriter): Optional writer with EXPORT_COLUMNS
+
+        Returns:
+            chunks (list): _run_chunk outputs
+        """
+        chunks = list()
+        first = 0
+        for chunk in outputs:
+            if writer is not None:
+                _write_chunk(writer, first, freqs, *chunk)
+                first += len(chunk[0])
+            chunks.append(chunk)
+
+        return chunks
+
+
+def _write_chunk(writer, first, freqs, gain, nf, passed):
+    """
+    Write the system output of one chunk of trials, one row per trial and frequency
+
+    Args:
+        writer (ResultWriter): writer with EXPORT_COLUMNS
+        first (int): number of the chunk's first trial
+        freqs (ndarray): Simulation frequencies in MHz
+        gain (ndarray): system gain in dB, shape (trials, freqs)
+        nf (ndarray): system NF in dB, shape (trials, freqs)
+        passed (ndarray): pass flags, shape (trials, freqs)
+    """
+    n = len(gain)
+    writer.write({'trial': np.repeat(np.arange(first, first + n), len(freqs)),
+                  'freq': np.tile(freqs, n),
+                  'gain': gain,
+                  'NF': nf,
+                  'passed': passed})
+
+
+def deviation_db(tol, delta):
+    """
+    Convert tolerance deviations to dB.  A 'dB' deviation is used as is and a 'per' deviation scales the nominal
+    linear value by the given percentage
+
+    Args:
+        tol (Tolerance): parameter tolerance
+        delta (float or ndarray): deviations within tol.limits
+
+    Returns:
+        (ndarray): deviations in dB
+    """
+    delta = np.asarray(delta, dtype=np.float64)
+    if tol.tol == 'PER':
+        return 10 * np.log10(1 + delta / 100.0)
+    return delta
+
+
+def _run_chunk(gain, nf, tols, n, seed_seq, specs, all_stages=False):
+    """
+    Run one chunk of trials.  This is a module level function so it can be sent to worker processes
+
+    Args:
+        gain (ndarray): nominal stage gain in dB, shape (stages, freqs)
+        nf (ndarray): nominal stage NF in dB, shape (stages, freqs)
+        tols (list): toleranced parameters as returned by MonteCarloEngine.get_tolerances
+        n (int): number of trials
+        seed_seq (SeedSequence): seed for this chunk's random stream
+        specs (dict): System specs, {metric: [lower, upper]}
+        all_stages (bool): return the cascaded gain and NF of every stage instead of the system output
+
+    Returns:
+        (tuple): (system gain, system NF, pass flags), each with shape (trials, freqs).  With all_stages the gain
+            and NF have shape (trials, stages, freqs)
+    """
+    rng = np.random.default_rng(seed_seq)
+    trial_gain = np.repeat(gain[np.newaxis], n, axis=0)
+    trial_nf = np.repeat(nf[np.newaxis], n, axis=0)
+    params = {'gain': trial_gain, 'NF': trial_nf}
+
+    for idx, name, tol, linked in tols:
+        delta = deviation_db(tol, tol.sample(n, mean=0.0, rng=rng))
+        params[name][:, idx, :] += delta[:, np.newaxis]
+        if linked:
+            trial_nf[:, idx, :] -= delta[:, np.newaxis]
+
+    casc_gain, casc_nf = cascade_gain_nf(trial_gain, trial_nf)
+    out = {'gain': casc_gain[:, -1, :], 'NF': casc_nf[:, -1, :]}
+
+    passed = np.ones(out['gain'].shape, dtype=bool)
+    for name, (lower, upper) in specs.items():
+        if lower is not None:
+            passed &= out[name] >= lower
+        if upper is not None:
+            passed &= out[name] <= upper
+
+    if all_stages:
+        return casc_gain, casc_nf, passed
+    return out['gain'], out['NF'], passed
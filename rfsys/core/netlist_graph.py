@@ -0,0 +1,281 @@
+import numpy as np
+from .cascade import cascade_gain_nf
+from ..components.base_component import FrequencyConverter
+from ..components.instance import ComponentInstance
+from .netlist_parser import Part, Source, Sink
+from .sim_result import SimulationResult
+
+
+def node_key(node):
+    """
+    Get the graph key of a netlist node.  Parts are keyed by refdes, sources and sinks by SOURCE.<id>/SINK.<id>
+
+    Args:
+        node (Part, Source or Sink): netlist node
+
+    Returns:
+        (str): node key
+    """
+    if isinstance(node, Part):
+        return node.refdes
+    elif isinstance(node, Source):
+        return "SOURCE.{}".format(node.id)
+    elif isinstance(node, Sink):
+        return "SINK.{}".format(node.id)
+
+    raise TypeError("Invalid netlist node ({})".format(node))
+
+
+class NetlistGraph:
+
+    def __init__(self, net_list):
+        """
+        Directed acyclic graph compiled from parsed netlist nets.  Nodes are keyed by refdes (or SOURCE.<id> and
+        SINK.<id> for the built-in ports) and edges run from each net input to its outputs.
+
+        Args:
+            net_list (list): List of Net objects as returned by netlist_parser.load_netlist
+        """
+        self.uids = dict()          # refdes -> uid for every part
+        self.edges = dict()         # node key -> list of downstream node keys
+        self.sources = list()
+        self.sinks = list()
+
+        for net in net_list:
+            src = self._add_node(net.input)
+            for output in net.output:
+                dst = self._add_node(output)
+                if dst not in self.edges[src]:
+                    self.edges[src].append(dst)
+
+        self.order = self.topological_sort()
+
+    def _add_node(self, node):
+        """
+        Add a node to the graph if it doesn't already exist
+
+        Args:
+            node (Part, Source or Sink): netlist node
+
+        Returns:
+            (str): node key
+        """
+        key = node_key(node)
+        if key not in self.edges:
+            self.edges[key] = list()
+            if isinstance(node, Source):
+                self.sources.append(key)
+            elif isinstance(node, Sink):
+                self.sinks.append(key)
+            else:
+                self.uids[key] = node.uid
+        elif isinstance(node, Part) and self.uids[key] != node.uid:
+            raise ValueError("RefDes ({}) is used with multiple UIDs ({}, {})".format(key, self.uids[key], node.uid))
+
+        return key
+
+    def topological_sort(self):
+        """
+        Sort the graph nodes so every node comes after all of its inputs.  Raises an exception if the netlist
+        contains a loop
+
+        Returns:
+            order (list): node keys in topological order
+        """
+        in_degree = {key: 0 for key in self.edges}
+        for outputs in self.edges.values():
+            for dst in outputs:
+                in_degree[dst] += 1
+
+        ready = [key for key, count in in_degree.items() if count == 0]
+        order = list()
+        while ready:
+            key = ready.pop()
+            order.append(key)
+            for dst in self.edges[key]:
+                in_degree[dst] -= 1
+                if in_degree[dst] == 0:
+                    ready.append(dst)
+
+        if len(order) != len(self.edges):
+            raise ValueError("Netlist contains a loop between nodes: {}"
+                             .format([key for key, count in in_degree.items() if count > 0]))
+
+        return order
+
+    def paths(self):
+        """
+        Enumerate every source to sink path
+
+        Returns:
+            paths (list): (source key, list of part refdes, sink key) tuples
+        """
+        paths = list()
+
+        def walk(key, source, prefix):
+            if key in self.uids:
+                prefix = prefix + [key]
+            if key in self.sinks:
+                paths.append((source, prefix, key))
+            for dst in self.edges[key]:
+                walk(dst, source, prefix)
+
+        for source in self.sources:
+            walk(source, source, list())
+
+        return paths
+
+
+class NetlistEngine:
+
+    def __init__(self, graph, components, **kwargs):
+        """
+        Cascade engine for a compiled netlist graph.  The cascade is computed for every source to sink path, but
+        paths are merged into a prefix tree first so stages shared by several branches are only computed once.
+
+        Every refdes gets a ComponentInstance that shares its uid's Component definition, so a netlist with many
+        copies of the same part holds one set of parameter arrays.  Per-refdes changes go through instance().
+
+        The Component objects passed in are frozen as a side effect: their parameter arrays become read-only and
+        Parameter.update_value raises for them.  Pass copies (copy.deepcopy) to keep editable components.
+
+        Args:
+            graph (NetlistGraph): compiled netlist
+            components (list or dict): Component objects, or a dict of Component objects keyed by uid
+            **kwargs:
+        """
+        if not isinstance(components, dict):
+            components = {comp.uid: comp for comp in components}
+
+        self.graph = graph
+        self.components = components
+        self.paths = graph.paths()
+        self.results = None
+
+        for refdes, uid in graph.uids.items():
+            if uid not in components:
+                raise ValueError("RefDes ({}) uses an unknown component UID ({})".format(refdes, uid))
+        self.instances = {refdes: ComponentInstance(refdes, components[uid]) for refdes, uid in graph.uids.items()}
+
+        self.segments = self._build_segments()
+
+    def _build_segments(self):
+        """
+        Split the prefix tree of all paths into linear segments.  A segment is a run of stages with no branch
+        point inside it, so it can be cascaded with a single array computation.
+
+        Returns:
+            segments (list): (parent segment index or None, list of refdes) tuples.  Parents come before children
+        """
+        # prefix tree: prefix tuple -> list of child prefixes
+        children = {(): list()}
+        for source, refdes, sink in self.paths:
+            prefix = (source,)
+            if prefix not in children[()]:
+                children[()].append(prefix)
+                children[prefix] = list()
+            for ref in refdes:
+                child = prefix + (ref,)
+                if child not in children:
+                    children[prefix].append(child)
+                    children[child] = list()
+                prefix = child
+
+        segments = list()
+        self._segment_of = dict()   # prefix -> (segment index, position in segment)
+        pending = [(None, prefix) for prefix in children[()]]
+        while pending:
+            parent, prefix = pending.pop()
+            stages = list()
+            if len(prefix) > 1:
+                stages.append(prefix)
+            # extend through nodes with a single child
+            while len(children[prefix]) == 1:
+                prefix = children[prefix][0]
+                stages.append(prefix)
+
+            seg_idx = parent
+            if stages:
+                seg_idx = len(segments)
+                segments.append((parent, [x[-1] for x in stages]))
+                for pos, stage in enumerate(stages):
+                    self._segment_of[stage] = (seg_idx, pos)
+            for child in children[prefix]:
+                pending.append((seg_idx, child))
+
+        return segments
+
+    def instance(self, refdes):
+        """
+        Get the component instance placed at a refdes
+
+        Args:
+            refdes (str): reference designator
+
+        Returns:
+            (ComponentInstance)
+        """
+        try:
+            return self.instances[refdes]
+        except KeyError:
+            raise ValueError("Netlist has no refdes ({})".format(refdes))
+
+    def run_sweep(self, freqs):
+        """
+        Run the cascade over every frequency in a sweep for every source to sink path.  Stages after a mixer are
+        resampled at the frequencies it translates to, the same as CascadeEngine
+
+        Args:
+            freqs (ndarray): Simulation frequencies in MHz
+
+        Returns:
+            results (list): SimulationResult for each path, in the same order as self.paths
+        """
+        freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+
+        # resample each component definition once, no matter how many refdes use it.  Only instances with
+        # overrides, and stages after a mixer (which see translated frequencies), are resampled on their own
+        resampled = dict()
+
+        def stage_values(ref, stage_freqs, translated):
+            inst = self.instances[ref]
+            if translated:
+                return inst.get_values('gain', stage_freqs), inst.get_values('NF', stage_freqs)
+            key = inst.uid if inst.is_default() else ref
+            if key not in resampled:
+                resampled[key] = (inst.get_values('gain', freqs), inst.get_values('NF', freqs))
+            return resampled[key]
+
+        # frequencies at the output of each segment, and whether a mixer ahead of it translated them
+        casc = list()
+        outputs = list()
+        for parent, refdes in self.segments:
+            stage_freqs, translated = (freqs, False) if parent is None else outputs[parent]
+            gain = np.empty((len(refdes), len(freqs)))
+            nf = np.empty((len(refdes), len(freqs)))
+            for idx, ref in enumerate(refdes):
+                gain[idx], nf[idx] = stage_values(ref, stage_freqs, translated)
+                definition = self.instances[ref].definition
+                if isinstance(definition, FrequencyConverter) and definition.has_lo_plan():
+                    stage_freqs = definition.translate(stage_freqs)
+                    translated = True
+            outputs.append((stage_freqs, translated))
+
+            if parent is None:
+                casc.append(cascade_gain_nf(gain, nf))
+            else:
+                prev_gain, prev_nf = casc[parent]
+                casc.append(cascade_gain_nf(gain, nf, prev_gain[-1], prev_nf[-1]))
+
+        self.results = list()
+        for source, refdes, sink in self.paths:
+            result = SimulationResult(freqs, [self.graph.uids[ref] for ref in refdes], refdes=refdes)
+            prefix = (source,)
+            for idx, ref in enumerate(refdes):
+                prefix = prefix + (ref,)
+                seg_idx, pos = self._segment_of[prefix]
+                result.data[idx, :, result.metric_index('gain')] = casc[seg_idx][0][pos]
+                result.data[idx, :, result.metric_index('NF')] = casc[seg_idx][1][pos]
+            self.results.append(result)
+
+        return self.results
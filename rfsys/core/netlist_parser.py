@@ -86,20 +86,29 @@ def parse_part(part_str):
     raise Exception("Netlist parse error - part string is invalid ({})".format(part_str))
 
 
-if __name__=="__main__":
-    filepath = 'netlist_test.txt'
+def load_netlist(filepath):
+    """
+    Load a netlist file into a list of Net objects.  Blank lines and lines starting with a # are ignored
+
+    Args:
+        filepath (str): Full filepath for the netlist file
+
+    Returns:
+        net_list (list): List of Net objects
+    """
     with open(filepath) as fp:
         lines = fp.readlines()
 
     net_list = list()
     for line in lines:
         l = line.strip()
-        if len(l) > 0:
-            if l[0] == "#":
-                # print("Comment: {}".format(l))
-                pass
-            else:
-                print("Valid Line: {}".format(l))
-                net_list.append(parse_net(l))
-
-    # parse overall netlist into linear paths
+        if len(l) > 0 and l[0] != "#":
+            net_list.append(parse_net(l))
+
+    return net_list
+
+
+if __name__=="__main__":
+    filepath = 'netlist_test.txt'
+    net_list = load_netlist(filepath)
+    print("Loaded {} nets".format(len(net_list)))
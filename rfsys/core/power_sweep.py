@@ -0,0 +1,201 @@
+import numpy as np
+from .cascade import cascade_metrics, KT0_DBM_HZ
+
+DEFAULT_SMOOTHNESS = 2.0    # Rapp knee smoothness used when only one of P1dB and Psat is known
+
+
+def rapp_backoff(smoothness):
+    """
+    Distance between the saturated output power and the output 1 dB compression point of a Rapp model
+
+    Args:
+        smoothness (float or ndarray): Rapp smoothness p (> 0)
+
+    Returns:
+        (ndarray): Psat - OP1dB in dB
+    """
+    p = np.asarray(smoothness, dtype=np.float64)
+    # 1 - (10 / p) * log10(10^(p / 10) - 1), written so it doesn't overflow for a sharp knee
+    return -(10.0 / p) * np.log10(-np.expm1(-p * np.log(10.0) / 10.0))
+
+
+def rapp_smoothness(op1db, psat, iterations=60):
+    """
+    Rapp smoothness that puts the 1 dB compression point of a stage with saturated output power psat at op1db.
+    Solved by a bisection on log(p) that runs on every element at once
+
+    Args:
+        op1db (ndarray): output P1dB in dBm
+        psat (ndarray): saturated output power in dBm, greater than op1db
+        iterations (int): bisection steps
+
+    Returns:
+        (ndarray): smoothness p, same shape as op1db
+    """
+    backoff = np.asarray(psat, dtype=np.float64) - np.asarray(op1db, dtype=np.float64)
+    if np.any(backoff <= 0):
+        raise ValueError("Psat must be greater than P1dB")
+
+    # the backoff falls monotonically with p
+    low = np.full(backoff.shape, np.log(1e-2))
+    high = np.full(backoff.shape, np.log(1e3))
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        above = rapp_backoff(np.exp(mid)) > backoff
+        low = np.where(above, mid, low)
+        high = np.where(above, high, mid)
+    return np.exp((low + high) / 2)
+
+
+def compression_model(op1db, psat=None):
+    """
+    Rapp model parameters of every stage.  A stage with only a P1dB or only a Psat uses DEFAULT_SMOOTHNESS for
+    the other one; a stage with neither (both None or inf) stays linear
+
+    Args:
+        op1db (ndarray): output P1dB in dBm, shape (stages, freqs)
+        psat (ndarray): saturated output power in dBm, same shape as op1db
+
+    Returns:
+        (tuple): (psat, smoothness) arrays with the shape of op1db.  psat is inf for linear stages
+    """
+    op1db = np.asarray(op1db, dtype=np.float64)
+    psat = np.full(op1db.shape, np.inf) if psat is None else np.broadcast_to(psat, op1db.shape).astype(np.float64)
+
+    smoothness = np.full(op1db.shape, DEFAULT_SMOOTHNESS)
+    both = np.isfinite(op1db) & np.isfinite(psat)
+    if np.any(both):
+        smoothness[both] = rapp_smoothness(op1db[both], psat[both])
+    only_p1db = np.isfinite(op1db) & ~np.isfinite(psat)
+    psat = np.where(only_p1db, op1db + rapp_backoff(DEFAULT_SMOOTHNESS), psat)
+    return psat, smoothness
+
+
+def rapp_output(pin, gain, psat, smoothness):
+    """
+    Output power of a Rapp (AM/AM) stage, in power units:
+    Pout = G * Pin / (1 + (G * Pin / Psat)^p)^(1/p)
+
+    Args:
+        pin (ndarray): input power in dBm
+        gain (ndarray): small signal gain in dB
+        psat (ndarray): saturated output power in dBm, inf for a linear stage
+        smoothness (ndarray): Rapp smoothness p
+
+    Returns:
+        (ndarray): output power in dBm, broadcast shape of the arguments
+    """
+    linear = pin + gain
+    # log10(1 + 10^(p x / 10)) through logaddexp, so deep saturation doesn't overflow
+    drive = smoothness * (linear - psat) * np.log(10.0) / 10.0
+    return linear - (10.0 / smoothness) * np.logaddexp(0.0, drive) / np.log(10.0)
+
+
+class PowerSweepResult:
+
+    def __init__(self, pins, freqs, uids, pout, small_signal_gain, nf, bandwidth=None):
+        """
+        Results of an input power sweep.  Power arrays have shape (pins, stages, freqs)
+
+        Args:
+            pins (ndarray): chain input power levels in dBm, ascending
+            freqs (ndarray): Simulation frequencies in MHz
+            uids (list): component uid of each stage
+            pout (ndarray): output power of every stage in dBm
+            small_signal_gain (ndarray): small signal cascaded gain in dB, shape (stages, freqs)
+            nf (ndarray): cascaded NF in dB, shape (stages, freqs)
+            bandwidth (float): noise bandwidth in Hz.  Without it the SNR is NaN
+        """
+        self.pins = pins
+        self.freqs = freqs
+        self.uids = uids
+        self.pout = pout
+        self.small_signal_gain = small_signal_gain
+        self.nf = nf
+        self.bandwidth = bandwidth
+
+    @property
+    def gain(self):
+        """
+        Large signal cascaded gain in dB
+        """
+        return self.pout - self.pins[:, np.newaxis, np.newaxis]
+
+    @property
+    def compression(self):
+        """
+        Gain compression of the cascade up to each stage in dB (0 for a linear cascade)
+        """
+        return self.small_signal_gain - self.gain
+
+    @property
+    def snr(self):
+        """
+        SNR at the output of each stage in dB.  The noise is the input noise floor raised by the cascaded NF and
+        carried by the small signal gain, so gain compression shows up as SNR lost to the signal
+        """
+        if self.bandwidth is None:
+            return np.full(self.pout.shape, np.nan)
+        noise = KT0_DBM_HZ + 10 * np.log10(self.bandwidth) + self.nf + self.small_signal_gain
+        return self.pout - noise
+
+    def compression_point(self, level=1.0, stage=-1):
+        """
+        Input power where the cascade up to a stage reaches a level of gain compression, linearly interpolated
+        between the swept power levels
+
+        Args:
+            level (float): gain compression in dB
+            stage (int): stage index, the whole chain by default
+
+        Returns:
+            (ndarray): input power in dBm for each frequency.  NaN where the sweep doesn't cross level, i.e. it
+                never compresses that far or is already past it at the lowest power
+        """
+        comp = self.compression[:, stage, :]
+        reached = comp >= level
+        idx = np.argmax(reached, axis=0)
+        valid = reached.any(axis=0) & (idx > 0)
+        idx = np.maximum(idx, 1)
+
+        cols = np.arange(comp.shape[1])
+        c0 = comp[idx - 1, cols]
+        c1 = comp[idx, cols]
+        p0 = self.pins[idx - 1]
+        p1 = self.pins[idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            point = p0 + (level - c0) * (p1 - p0) / (c1 - c0)
+        return np.where(valid, point, np.nan)
+
+
+def power_sweep(pins, gain, nf, op1db=None, psat=None):
+    """
+    Propagate every input power level through a cascade of Rapp compression stages.  Stages are applied in order,
+    each on the whole (pins x freqs) plane at once
+
+    Args:
+        pins (ndarray): chain input power levels in dBm
+        gain (ndarray): stage small signal gain in dB, shape (stages, freqs)
+        nf (ndarray): stage NF in dB, same shape as gain
+        op1db (ndarray): stage output P1dB in dBm, same shape as gain.  inf for a linear stage
+        psat (ndarray): stage saturated output power in dBm, same shape as gain.  inf when unknown
+
+    Returns:
+        (tuple): (pout with shape (pins, stages, freqs), small signal cascaded gain, cascaded NF)
+    """
+    gain = np.asarray(gain, dtype=np.float64)
+    pins = np.asarray(pins, dtype=np.float64)
+    op1db = np.full(gain.shape, np.inf) if op1db is None else op1db
+    psat, smoothness = compression_model(op1db, psat)
+
+    pout = np.empty((len(pins),) + gain.shape)
+    level = np.broadcast_to(pins[:, np.newaxis], (len(pins), gain.shape[-1]))
+    for idx in range(gain.shape[0]):
+        if np.all(np.isinf(psat[idx])):
+            level = level + gain[idx]
+        else:
+            level = rapp_output(level, gain[idx], psat[idx], smoothness[idx])
+        pout[:, idx, :] = level
+
+    casc = cascade_metrics(gain, nf)
+    return pout, casc['gain'], casc['NF']
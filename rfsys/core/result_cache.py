@@ -0,0 +1,204 @@
+import hashlib
+import os
+from collections import OrderedDict
+import numpy as np
+from ..components.base_component import FrequencyConverter
+from .cascade import CASCADE_METRICS
+from .instrumentation import active
+from .sim_result import SimulationResult
+
+CACHE_VERSION = 2
+CACHE_EXT = '.npz'
+
+
+def stage_fingerprints(comp_list):
+    """
+    Content hash of every stage.  Each hash covers the data of every parameter of the stage (freqs, values and
+    interpolation mode), any instance offset and a mixer LO plan, so comparing two lists finds the first edited
+    stage, including in-place update_value edits
+
+    Args:
+        comp_list (list): Component objects in chain order
+
+    Returns:
+        (list): sha256 hex digest of each stage
+    """
+    keys = list()
+    for comp in comp_list:
+        sha = hashlib.sha256()
+        names = sorted(comp.parameter_names())
+        definition = comp.definition
+        lo_plan = None
+        if isinstance(definition, FrequencyConverter):
+            lo_plan = (definition.lo_freq, definition.if_freq, definition.side)
+        sha.update(repr((comp.uid, type(definition).__name__, names, lo_plan)).encode('utf-8'))
+        for name in names:
+            param = comp.get_parameter(name)
+            sha.update(repr((name, param.interp, len(param.freqs), comp.get_offset(name))).encode('utf-8'))
+            sha.update(param.freqs.tobytes())
+            sha.update(param.values.tobytes())
+        keys.append(sha.hexdigest())
+
+    return keys
+
+
+def chain_fingerprint(comp_list, freqs, pin=None, bandwidth=None, stages=None):
+    """
+    Content hash of a cascade run.  The hash covers the stage_fingerprints in chain order, the frequency grid, pin,
+    bandwidth and the list of cascaded metrics.  Any edit to a component, including an in-place update_value,
+    changes the hash, so a cache lookup by this key never returns a stale result and needs no explicit
+    invalidation.
+
+    Args:
+        comp_list (list): Component objects in chain order
+        freqs (ndarray): Simulation frequencies in MHz
+        pin (float): input signal power in dBm
+        bandwidth (float): noise bandwidth in Hz
+        stages (list): stage_fingerprints of comp_list, if already computed
+
+    Returns:
+        (str): sha256 hex digest
+    """
+    stages = stage_fingerprints(comp_list) if stages is None else stages
+    sha = hashlib.sha256()
+    sha.update(repr((CACHE_VERSION, CASCADE_METRICS, pin, bandwidth, len(comp_list))).encode('utf-8'))
+    sha.update(np.ascontiguousarray(freqs, dtype=np.float64).tobytes())
+    for key in stages:
+        sha.update(key.encode('utf-8'))
+
+    return sha.hexdigest()
+
+
+class ResultCache:
+
+    def __init__(self, max_entries=128, cache_dir=None, max_bytes=256 * 2 ** 20):
+        """
+        Two tier cache of SimulationResults keyed by chain_fingerprint.  The memory tier keeps the max_entries most
+        recently used results.  The optional disk tier keeps one .npz file per result in cache_dir and evicts the
+        least recently used files once their total size exceeds max_bytes, so results survive across processes
+        and sessions.  A disk hit is promoted to the memory tier.
+
+        Cached results are shared, so treat them as read-only.
+
+        Args:
+            max_entries (int): memory tier size
+            cache_dir (str): disk tier directory, None for a memory only cache
+            max_bytes (int): disk tier size limit in bytes
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._memory)
+
+    def __contains__(self, key):
+        return key in self._memory or (self.cache_dir is not None and os.path.exists(self._path(key)))
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_EXT)
+
+    def get(self, key):
+        """
+        Look up a result
+
+        Args:
+            key (str): chain fingerprint
+
+        Returns:
+            (SimulationResult or None): cached result, None on a miss
+        """
+        instr = active()
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            instr.count('result_cache.memory_hits')
+            return self._memory[key]
+
+        if self.cache_dir is not None:
+            result = self._read(key)
+            if result is not None:
+                instr.count('result_cache.disk_hits')
+                self._remember(key, result)
+                return result
+
+        instr.count('result_cache.misses')
+        return None
+
+    def put(self, key, result):
+        """
+        Store a result in every tier
+
+        Args:
+            key (str): chain fingerprint
+            result (SimulationResult): result to cache
+        """
+        self._remember(key, result)
+        if self.cache_dir is not None:
+            self._write(key, result)
+            self._evict()
+
+    def clear(self):
+        """
+        Remove every cached result from both tiers
+        """
+        self._memory.clear()
+        if self.cache_dir is not None:
+            for filename in os.listdir(self.cache_dir):
+                if filename.endswith(CACHE_EXT):
+                    os.remove(os.path.join(self.cache_dir, filename))
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                refdes = list(npz['refdes']) if 'refdes' in npz.files else None
+                result = SimulationResult(npz['freqs'], list(npz['uids']), refdes=refdes,
+                                          metrics=list(npz['metrics']))
+                result.data[:] = npz['data']
+        except (OSError, ValueError, KeyError):
+            # missing, evicted by another process or partially written
+            return None
+
+        os.utime(path)     # mark as recently used
+        return result
+
+    def _write(self, key, result):
+        arrays = {'freqs': result.freqs, 'uids': np.array(result.uids), 'metrics': np.array(result.metrics),
+                  'data': result.data}
+        if result.refdes is not None:
+            arrays['refdes'] = np.array(result.refdes)
+        tmp_path = self._path(key) + '.tmp'
+        with open(tmp_path, 'wb') as fp:
+            np.savez(fp, **arrays)
+        os.replace(tmp_path, self._path(key))  # readers never see a partially written file
+
+    def _evict(self):
+        entries = list()
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(CACHE_EXT):
+                path = os.path.join(self.cache_dir, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(x[1] for x in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+            active().count('result_cache.evictions')
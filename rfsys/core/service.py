@@ -0,0 +1,330 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from ..components.base_component import FrequencyConverter
+from .cascade import cascade_metrics, CASCADE_METRICS
+from .netlist_graph import NetlistGraph, NetlistEngine
+from .sim_engine import CascadeEngine
+from .sim_result import SimulationResult
+
+JOB_STATES = ['queued', 'running', 'done', 'cancelled', 'failed']
+
+
+def run_batch(library, jobs):
+    """
+    Evaluate a batch of jobs that use the same component library.  This is a module level function so it can be
+    sent to worker processes.
+
+    Every component used by a chain job without a mixer ahead of a stage is resampled once onto the union of those
+    job frequency grids.  Chains with a mixer ahead of a stage see translated frequencies after it, so they are
+    resampled once per stage order instead.  Chain jobs that share a table and have the same number of stages and
+    frequencies are then stacked into one (jobs x stages x freqs) array and cascaded by a single cascade_metrics
+    call.  Netlist jobs are run by a NetlistEngine each.
+
+    Args:
+        library (ComponentLibrary or CompiledLibrary): component library
+        jobs (list): (chain uids or NetlistGraph, freqs, pin, bandwidth) tuples
+
+    Returns:
+        results (list): SimulationResult for each chain job, list of SimulationResult for each netlist job, or the
+            exception raised while building the components of a job
+    """
+    results = [None] * len(jobs)
+    grids = [np.atleast_1d(np.asarray(freqs, dtype=np.float64)) for target, freqs, pin, bandwidth in jobs]
+
+    # components are resolved per job, so a bad uid only fails its own job
+    comps = dict()
+    chains = list()
+    for idx, job in enumerate(jobs):
+        if isinstance(job[0], NetlistGraph):
+            continue
+        try:
+            for uid in job[0]:
+                if str(uid) not in comps:
+                    comps[str(uid)] = library.get_component(uid)
+        except Exception as exc:
+            results[idx] = exc
+        else:
+            chains.append(idx)
+
+    # None -> chains without translation, stage order -> chains with a mixer ahead of a stage
+    tables = dict()
+    for idx in chains:
+        order = tuple(str(uid) for uid in jobs[idx][0])
+        tables.setdefault(order if _translates([comps[uid] for uid in order]) else None, list()).append(idx)
+
+    for order, members in tables.items():
+        offsets = np.cumsum([0] + [len(grids[idx]) for idx in members])
+        all_freqs = np.concatenate([grids[idx] for idx in members])
+        if order is None:
+            # one row per component, resampled on its own so nothing is translated
+            used = list(dict.fromkeys(str(uid) for idx in members for uid in jobs[idx][0]))
+            rows = [CascadeEngine([comps[uid]]).resample(all_freqs, names=CascadeEngine.STAGE_PARAMS) for uid in used]
+            table = [np.concatenate(x) for x in zip(*rows)]
+            row = {uid: num for num, uid in enumerate(used)}
+            job_rows = [[row[str(uid)] for uid in jobs[idx][0]] for idx in members]
+        else:
+            table = CascadeEngine([comps[uid] for uid in order]).resample(all_freqs, names=CascadeEngine.STAGE_PARAMS)
+            job_rows = [list(range(len(order)))] * len(members)
+
+        groups = dict()
+        for pos, idx in enumerate(members):
+            groups.setdefault((len(jobs[idx][0]), len(grids[idx])), list()).append(pos)
+
+        for positions in groups.values():
+            # (jobs, stages) table rows and (jobs, freqs) table columns, gathered with one fancy index per param
+            rows = np.array([job_rows[pos] for pos in positions])
+            cols = np.array([np.arange(offsets[pos], offsets[pos + 1]) for pos in positions])
+            stage_params = [array[rows[:, :, np.newaxis], cols[:, np.newaxis, :]] for array in table]
+            pin = _job_column([jobs[members[pos]][2] for pos in positions])
+            bandwidth = _job_column([jobs[members[pos]][3] for pos in positions])
+            casc = cascade_metrics(*stage_params, pin=pin, bandwidth=bandwidth)
+
+            data = np.stack([casc[name] for name in CASCADE_METRICS], axis=-1)
+            for num, pos in enumerate(positions):
+                idx = members[pos]
+                result = SimulationResult(grids[idx], jobs[idx][0], metrics=CASCADE_METRICS)
+                result.data[:] = data[num]
+                results[idx] = result
+
+    for idx, (target, freqs, pin, bandwidth) in enumerate(jobs):
+        if isinstance(target, NetlistGraph):
+            try:
+                results[idx] = NetlistEngine(target, library.build_netlist(target)).run_sweep(grids[idx])
+            except Exception as exc:
+                results[idx] = exc
+
+    return results
+
+
+def _translates(comp_list):
+    """
+    Check whether any stage of a chain sees frequencies translated by a mixer ahead of it
+
+    Args:
+        comp_list (list): Component objects in chain order
+
+    Returns:
+        (bool)
+    """
+    return any(isinstance(comp.definition, FrequencyConverter) and comp.definition.has_lo_plan()
+               for comp in comp_list[:-1])
+
+
+def _job_column(values):
+    """
+    Stack an optional per-job scalar so it broadcasts against (jobs, stages, freqs).  Missing values are NaN
+
+    Args:
+        values (list): one value or None per job
+
+    Returns:
+        (ndarray or None): shape (jobs, 1, 1), or None when no job has a value
+    """
+    if all(x is None for x in values):
+        return None
+    return np.array([np.nan if x is None else x for x in values], dtype=np.float64)[:, np.newaxis, np.newaxis]
+
+
+class SimulationJob:
+
+    def __init__(self, library, target, freqs, pin=None, bandwidth=None):
+        """
+        One job submitted to a SimulationService.  Await the job (or result()) for its result, iterate events()
+        for progress, and call cancel() to drop it.  Must be created inside a running event loop.
+
+        Args:
+            library (ComponentLibrary or CompiledLibrary): component library
+            target (list or NetlistGraph): chain of component uids, or a compiled netlist
+            freqs (ndarray): Simulation frequencies in MHz
+            pin (float): input signal power in dBm, used for the cascaded SNR of a chain
+            bandwidth (float): noise bandwidth in Hz, used for the cascaded SNR of a chain
+        """
+        self.library = library
+        self.target = target
+        self.freqs = freqs
+        self.pin = pin
+        self.bandwidth = bandwidth
+        self.state = None
+        self._future = asyncio.get_running_loop().create_future()
+        self._events = asyncio.Queue()
+        self._set_state('queued')
+
+    def __await__(self):
+        return self._future.__await__()
+
+    def _set_state(self, state, **info):
+        self.state = state
+        info['state'] = state
+        self._events.put_nowait(info)
+
+    def _set_result(self, result):
+        if not self._future.done():
+            self._future.set_result(result)
+            self._set_state('done')
+
+    def _set_exception(self, exc):
+        if not self._future.done():
+            self._future.set_exception(exc)
+            self._set_state('failed', error=exc)
+
+    def args(self):
+        """
+        Job arguments as passed to run_batch
+
+        Returns:
+            (tuple): (target, freqs, pin, bandwidth)
+        """
+        return self.target, self.freqs, self.pin, self.bandwidth
+
+    def done(self):
+        """
+        Check whether the job has finished, failed or been cancelled
+
+        Returns:
+            (bool)
+        """
+        return self._future.done()
+
+    def cancel(self):
+        """
+        Cancel the job.  A queued job is left out of its batch; a running job's result is discarded
+
+        Returns:
+            (bool): False if the job had already finished
+        """
+        if self._future.done():
+            return False
+        self._future.cancel()
+        self._set_state('cancelled')
+        return True
+
+    async def result(self):
+        """
+        Wait for the job result
+
+        Returns:
+            (SimulationResult or list): SimulationResult for a chain, one per path for a netlist
+        """
+        return await self._future
+
+    async def events(self):
+        """
+        Asynchronous iterator over progress events.  Each event is a dict with 'state' (one of JOB_STATES) and
+        state details, e.g. 'batch' (number of jobs evaluated together) when running.  Iteration stops after
+        the job is done, failed or cancelled
+        """
+        while True:
+            event = await self._events.get()
+            yield event
+            if event['state'] in ('done', 'cancelled', 'failed'):
+                return
+
+
+class SimulationService:
+
+    def __init__(self, executor=None, batch_window=0.002, max_batch=256):
+        """
+        Asyncio front end for running many small cascade jobs.  Jobs that use the same library and arrive within
+        batch_window seconds of each other are coalesced and evaluated by one run_batch call in an executor, so the
+        event loop is never blocked and the cost grows with the batch rather than the number of jobs.
+
+        Args:
+            executor (Executor): executor for the CPU work.  Defaults to a single worker thread owned by the service,
+                so batches never run concurrently on the shared library components and the active instrumentation.
+                Only pass a multi-threaded executor with a library that isn't used anywhere else.  With a
+                ProcessPoolExecutor the library must be picklable, e.g. a CompiledLibrary
+            batch_window (float): seconds to wait for more jobs before running a batch
+            max_batch (int): maximum number of jobs per run_batch call
+        """
+        self.executor = executor
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batches = 0
+        self._own_executor = None
+        self._pending = dict()  # id(library) -> list of queued jobs
+        self._tasks = set()
+
+    def submit(self, library, target, freqs, pin=None, bandwidth=None):
+        """
+        Queue a job.  Must be called from a running event loop
+
+        Args:
+            library (ComponentLibrary or CompiledLibrary): component library
+            target (list or NetlistGraph): chain of component uids, or a compiled netlist
+            freqs (ndarray): Simulation frequencies in MHz
+            pin (float): input signal power in dBm, used for the cascaded SNR of a chain
+            bandwidth (float): noise bandwidth in Hz, used for the cascaded SNR of a chain
+
+        Returns:
+            (SimulationJob)
+        """
+        job = SimulationJob(library, target, freqs, pin, bandwidth)
+        key = id(library)
+        if key not in self._pending:
+            self._pending[key] = list()
+            task = asyncio.get_running_loop().create_task(self._drain(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        self._pending[key].append(job)
+        return job
+
+    async def simulate(self, library, target, freqs, pin=None, bandwidth=None):
+        """
+        Submit a job and wait for its result.  Cancelling the awaiting task cancels the job
+
+        Args:
+            see submit
+
+        Returns:
+            (SimulationResult or list): SimulationResult for a chain, one per path for a netlist
+        """
+        job = self.submit(library, target, freqs, pin, bandwidth)
+        try:
+            return await job
+        except asyncio.CancelledError:
+            job.cancel()
+            raise
+
+    async def _drain(self, key):
+        await asyncio.sleep(self.batch_window)
+        jobs = [job for job in self._pending.pop(key) if not job.done()]
+        batches = [jobs[x:x + self.max_batch] for x in range(0, len(jobs), self.max_batch)]
+        await asyncio.gather(*[self._run(batch) for batch in batches])
+
+    def _executor(self):
+        if self.executor is not None:
+            return self.executor
+        if self._own_executor is None:
+            self._own_executor = ThreadPoolExecutor(max_workers=1)
+        return self._own_executor
+
+    async def _run(self, jobs):
+        for job in jobs:
+            job._set_state('running', batch=len(jobs))
+        self.batches += 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor(), run_batch, jobs[0].library,
+                                                 [job.args() for job in jobs])
+        except Exception as exc:
+            for job in jobs:
+                job._set_exception(exc)
+            return
+
+        for job, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                job._set_exception(result)
+            else:
+                job._set_result(result)
+
+    async def close(self):
+        """
+        Wait for every queued and running batch to finish, then release the service's own worker thread
+        """
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+        if self._own_executor is not None:
+            self._own_executor.shutdown()
+            self._own_executor = None
@@ -1,17 +1,47 @@
 import math
+import numpy as np
 from ..components.base_component import ComponentData
+from .cascade import cascade_metrics, cascade_nf_sensitivity, CASCADE_METRICS, SENSITIVITY_METRICS
+from .instrumentation import active
+from .power_sweep import power_sweep, PowerSweepResult
+from .result_cache import chain_fingerprint, stage_fingerprints
+from .sim_result import SimulationResult
 
 
 class CascadeEngine:
+    # stage parameters used by run_sweep.  OIP3 and P1dB (output referred, dBm) are optional
+    STAGE_PARAMS = ['gain', 'NF', 'OIP3', 'P1dB']
 
     def __init__(self, comp_list, **kwargs):
         """
         Cascaded simulation engine for cascading various RF parameters
         Args:
             **kwargs:
+
+        Keyword Args:
+            pin (float): input signal power in dBm, used for the cascaded SNR
+            bandwidth (float): noise bandwidth in Hz, used for the cascaded SNR
+            instrumentation (Instrumentation): activated for the duration of every run and sweep.  Without it
+                the engine reports to whichever instrumentation is already active
+            cache (ResultCache): sweep results are looked up by chain fingerprint before they are computed and
+                stored after.  Cache hits return the shared cached result.  With a cache, the stages to recompute
+                are found by comparing stage fingerprints, so in-place edits don't need mark_dirty
         """
         self.comp_list = comp_list
+        self.pin = kwargs.get('pin')
+        self.bandwidth = kwargs.get('bandwidth')
+        self.instrumentation = kwargs.get('instrumentation')
+        self.cache = kwargs.get('cache')
         self.comp_data = list()
+        self._comp_data_index = dict()
+        self.result = None
+
+        # number of leading stages whose cached results are still valid, per run() frequency and for the sweep
+        self._valid_stages = dict()
+        self._sweep_valid = 0
+        # fingerprints of the last sweep, used with a cache
+        self._sweep_key = None
+        self._stage_keys = list()
 
     def add_component_data(self, uid, name):
         """
@@ -23,24 +53,352 @@ class CascadeEngine:
         Returns:
             (ComponentData)
         """
-        for comp in self.comp_data:
-            if comp.uid == uid:
-                return comp
+        if uid in self._comp_data_index:
+            return self._comp_data_index[uid]
 
         # if we didn't find the uid, add a new ComponentData object to the list
         comp_data = ComponentData(uid, name)
         self.comp_data.append(comp_data)
+        self._comp_data_index[uid] = comp_data
         return comp_data
 
     def run(self, freq):
+        """
+        Run the cascade for a single frequency.  Stages that are still valid from a previous run at the same
+        frequency are skipped
+
+        Legacy interface: results are accumulated in self.comp_data one frequency at a time, and every new frequency
+        is inserted into sorted parameter arrays, so N calls cost O(N^2).  Use run_sweep, which fills a
+        preallocated SimulationResult, for more than a handful of frequencies.
+
+        Args:
+            freq (float): Simulation frequency in MHz
+
+        Returns:
+            None
+        """
+        return self._instrumented(self._run, freq)
+
+    def _run(self, freq):
+        instr = active()
+        start = self._valid_stages.get(freq, 0)
+        with instr.timer('engine.run'):
+            # frequency seen by each stage, after the translation of any mixers ahead of it
+            stage_freq = freq
+            for comp in self.comp_list[:start]:
+                stage_freq = float(comp.translate(stage_freq))
+            for idx in range(start, len(self.comp_list)):
+                comp = self.comp_list[idx]
+                comp_data = self.add_component_data(comp.uid, comp.name)
+
+                self.cascade_gain(comp, comp_data, idx, freq, stage_freq)
+                self.cascade_nf(comp, comp_data, idx, freq, stage_freq)
+                stage_freq = float(comp.translate(stage_freq))
+
+        if instr.enabled:
+            instr.count('engine.stages_computed', len(self.comp_list) - start)
+        self._valid_stages[freq] = len(self.comp_list)
+
+    def _instrumented(self, func, *args):
+        """
+        Call func with the engine's instrumentation active, if it has one
+        """
+        if self.instrumentation is not None:
+            with self.instrumentation.activate():
+                return func(*args)
+        return func(*args)
+
+    def mark_dirty(self, idx):
+        """
+        Invalidate the cached results of a stage and every stage after it.  Call this after editing a component
+        in place; set_component and set_parameter call it automatically
+
+        Args:
+            idx (int): index of the first changed stage
+
+        Returns:
+            None
+        """
+        for freq, valid in self._valid_stages.items():
+            self._valid_stages[freq] = min(valid, idx)
+        self._sweep_valid = min(self._sweep_valid, idx)
+
+    def set_component(self, idx, comp):
+        """
+        Replace the component at a stage.  Only that stage and the stages after it are recomputed on the next
+        run or sweep
+
+        Args:
+            idx (int): stage index
+            comp (Component): new component object
+
+        Returns:
+            None
+        """
+        self.comp_list[idx] = comp
+        # stage data objects after the edit are rebuilt in chain order on the next run
+        for comp_data in self.comp_data[idx:]:
+            self._comp_data_index.pop(comp_data.uid, None)
+        del self.comp_data[idx:]
+        self.mark_dirty(idx)
+
+    def set_parameter(self, idx, name, freqs, values, **kwargs):
+        """
+        Replace a parameter of the component at a stage.  The component object is edited in place, so every stage
+        that uses the same object is invalidated
+
+        Args:
+            idx (int): stage index
+            name (str): parameter name
+            freqs (list or ndarray): frequency values in MHz
+            values (list or ndarray): parameter values for each freq
+            **kwargs: Arguments for Tolerance class
+
+        Returns:
+            None
+        """
+        comp = self.comp_list[idx]
+        comp.replace_parameter(name, freqs, values, **kwargs)
+        first = min(x for x, c in enumerate(self.comp_list) if c is comp)
+        self.mark_dirty(first)
+
+    def run_sweep(self, freqs):
+        """
+        Run the cascade for every frequency in a sweep at once.  Every stage is resampled onto the frequency grid
+        a single time and the cascade is computed with array operations.  Results are kept at full precision; round
+        them when presenting.
+
+        Every metric in CASCADE_METRICS is computed by one fused kernel.  When the grid matches the previous sweep,
+        only the stages changed since then are resampled and they are cascaded from the cached results of the
+        stage before them.  A new result object is returned so earlier results are left untouched.
+
+        Args:
+            freqs (ndarray): Simulation frequencies in MHz
+
+        Returns:
+            (SimulationResult): cascaded results for every stage and frequency
+        """
+        return self._instrumented(self._run_sweep, freqs)
+
+    def _run_sweep(self, freqs):
+        instr = active()
+        freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        if not self.comp_list:
+            raise ValueError("Can't run a sweep on an empty chain")
+
+        # the last result can only be reused if it has the same grid and stages, e.g. not after comp_list edits
+        # that bypass set_component
+        reusable = self.result is not None and len(self.result) == len(self.comp_list) and \
+            np.array_equal(self.result.freqs, freqs)
+        start = self._sweep_valid if reusable else 0
+
+        key = None
+        if self.cache is not None:
+            # with a cache, stale stages are found from their fingerprints rather than trusting mark_dirty
+            with instr.timer('engine.fingerprint'):
+                stage_keys = stage_fingerprints(self.comp_list)
+                key = chain_fingerprint(self.comp_list, freqs, self.pin, self.bandwidth, stage_keys)
+            if key == self._sweep_key and reusable:
+                start = len(self.comp_list)
+            else:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.result = cached
+                    self._sweep_valid = len(self.comp_list)
+                    self._sweep_key = key
+                    self._stage_keys = stage_keys
+                    return cached
+                same = 0
+                while same < min(len(stage_keys), len(self._stage_keys)) and \
+                        stage_keys[same] == self._stage_keys[same]:
+                    same += 1
+                # unchanged stages with a different key mean pin or bandwidth changed, which affects every stage
+                start = min(start, same) if same < len(stage_keys) else 0
+                self._stage_keys = stage_keys
+
+        if start >= len(self.comp_list):
+            instr.count('engine.cache_hits')
+            return self.result
+
+        if instr.has_hooks('run_start'):
+            instr.emit('run_start', engine=self, freqs=freqs, start=start)
+
+        with instr.timer('engine.allocate'):
+            result = SimulationResult(freqs, [comp.uid for comp in self.comp_list], metrics=CASCADE_METRICS)
+            prev = None
+            if start > 0:
+                result.data[:start] = self.result.data[:start]
+                prev = {name: result.metric(name)[start - 1] for name in ('gain', 'NF', 'IIP3', 'IP1dB')}
+
+        with instr.timer('engine.resample'):
+            gain, nf, oip3, op1db = self.resample(freqs, start, CascadeEngine.STAGE_PARAMS)
+        with instr.timer('engine.cascade'):
+            casc = cascade_metrics(gain, nf, oip3, op1db, pin=self.pin, bandwidth=self.bandwidth, prev=prev)
+        with instr.timer('engine.store'):
+            metric_hook = instr.has_hooks('metric')
+            for name, values in casc.items():
+                result.metric(name)[start:] = values
+                if metric_hook:
+                    instr.emit('metric', name=name, values=result.metric(name))
+
+        if instr.enabled:
+            instr.count('engine.sweeps')
+            instr.count('engine.stages_computed', len(self.comp_list) - start)
+            if instr.has_hooks('run_end'):
+                instr.emit('run_end', engine=self, result=result)
 
-        for idx, comp in enumerate(self.comp_list):
-            comp_data = self.add_component_data(comp.uid, comp.name)
+        self.result = result
+        self._sweep_valid = len(self.comp_list)
+        if key is not None:
+            self._sweep_key = key
+            self.cache.put(key, result)
+        return result
 
-            self.cascade_gain(comp, comp_data, idx, freq)
-            self.cascade_nf(comp, comp_data, idx, freq)
+    def run_corners(self, freqs, temps):
+        """
+        Run the cascade at every temperature corner and frequency at once.  Each stage is resampled onto the
+        (temps x freqs) grid and all corners are cascaded by a single batched cascade_metrics call.  The incremental
+        sweep cache isn't used
+
+        Args:
+            freqs (ndarray): Simulation frequencies in MHz
+            temps (list or ndarray): corner temperatures in degC
+
+        Returns:
+            (list): SimulationResult for each corner, in the same order as temps
+        """
+        return self._instrumented(self._run_corners, freqs, temps)
+
+    def _run_corners(self, freqs, temps):
+        freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        temps = np.atleast_1d(np.asarray(temps, dtype=np.float64))
+        instr = active()
+        uids = [comp.uid for comp in self.comp_list]
+
+        with instr.timer('engine.resample'):
+            # (stages, corners, freqs) -> (corners, stages, freqs)
+            params = [np.swapaxes(x, 0, 1) for x in self.resample(freqs, 0, CascadeEngine.STAGE_PARAMS, temps)]
+        with instr.timer('engine.cascade'):
+            casc = cascade_metrics(*params, pin=self.pin, bandwidth=self.bandwidth)
+        with instr.timer('engine.store'):
+            data = np.stack([casc[name] for name in CASCADE_METRICS], axis=-1)
+            results = list()
+            for idx in range(len(temps)):
+                result = SimulationResult(freqs, uids, metrics=CASCADE_METRICS)
+                result.data[:] = data[idx]
+                results.append(result)
+
+        if instr.enabled:
+            instr.count('engine.corner_runs')
+            instr.count('engine.corners', len(temps))
+        return results
+
+    def sensitivity(self, freqs):
+        """
+        Sensitivity of the total cascaded NF to the gain and NF of every stage, from the closed form derivative of
+        the Friis equation (see cascade_nf_sensitivity).  One vectorized pass replaces perturbing each parameter
+        and re-running the cascade
+
+        Args:
+            freqs (ndarray): Simulation frequencies in MHz
+
+        Returns:
+            (SimulationResult): 'dNF_dgain' and 'dNF_dNF' (dB/dB) for every stage and frequency
+        """
+        return self._instrumented(self._sensitivity, freqs)
+
+    def _sensitivity(self, freqs):
+        freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        instr = active()
+        with instr.timer('engine.sensitivity'):
+            gain, nf = self.resample(freqs)
+            result = SimulationResult(freqs, [comp.uid for comp in self.comp_list], metrics=SENSITIVITY_METRICS)
+            for name, values in cascade_nf_sensitivity(gain, nf).items():
+                result.set_metric(name, values)
+
+        return result
+
+    def run_power_sweep(self, freqs, pins):
+        """
+        Sweep the chain input power at every frequency at once.  Each stage follows a Rapp compression curve set by
+        its output P1dB and an optional 'Psat' parameter (see power_sweep.compression_model); stages without
+        either are linear.  Stages are resampled once and every power level and frequency is propagated together
+
+        Args:
+            freqs (ndarray): Simulation frequencies in MHz
+            pins (ndarray): input power levels in dBm
+
+        Returns:
+            (PowerSweepResult): output power, gain compression and SNR (with the engine bandwidth) versus input
+                power.  compression_point() gives the input level where the system compresses
+        """
+        return self._instrumented(self._run_power_sweep, freqs, pins)
+
+    def _run_power_sweep(self, freqs, pins):
+        freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        pins = np.sort(np.atleast_1d(np.asarray(pins, dtype=np.float64)))
+        instr = active()
+
+        with instr.timer('engine.resample'):
+            gain, nf, op1db, psat = self.resample(freqs, 0, ('gain', 'NF', 'P1dB', 'Psat'))
+        with instr.timer('engine.power_sweep'):
+            pout, small_signal_gain, casc_nf = power_sweep(pins, gain, nf, op1db, psat)
+
+        if instr.enabled:
+            instr.count('engine.power_sweeps')
+        return PowerSweepResult(pins, freqs, [comp.uid for comp in self.comp_list], pout, small_signal_gain,
+                                casc_nf, self.bandwidth)
 
-    def cascade_gain(self, comp, comp_data, idx, freq):
+    def stage_freqs(self, freqs, idx):
+        """
+        Frequencies at the input of a stage.  Every mixer ahead of the stage maps its input frequencies to its IF
+
+        Args:
+            freqs (ndarray): Simulation (chain input) frequencies in MHz
+            idx (int): stage index
+
+        Returns:
+            (ndarray): stage input frequencies in MHz, same shape as freqs
+        """
+        for comp in self.comp_list[:idx]:
+            freqs = comp.translate(freqs)
+        return freqs
+
+    def resample(self, freqs, start=0, names=('gain', 'NF'), temps=None):
+        """
+        Resample stage parameters onto a frequency grid.  gain and NF are required; any other parameter a
+        component doesn't have is filled with inf (no contribution).  Stages after a mixer are resampled at the
+        translated frequencies
+
+        Args:
+            freqs (ndarray): Frequencies in MHz
+            start (int): index of the first stage to resample
+            names (list): parameter names
+            temps (ndarray): Optional corner temperatures in degC
+
+        Returns:
+            (tuple): one array per name with shape (stages - start, freqs), or (stages - start, temps, freqs)
+                with temps
+        """
+        stages = self.comp_list[start:]
+        shape = (len(freqs),) if temps is None else (len(temps), len(freqs))
+        arrays = [np.empty((len(stages),) + shape) for name in names]
+        instr = active()
+        stage_hook = instr.has_hooks('stage')
+        stage_freqs = self.stage_freqs(freqs, start)
+        for idx, comp in enumerate(stages):
+            if stage_hook:
+                instr.emit('stage', index=start + idx, component=comp)
+            for name, array in zip(names, arrays):
+                if name in ('gain', 'NF') or comp.has_parameter(name):
+                    array[idx] = self._resample_parameter(comp, name, stage_freqs, temps)
+                else:
+                    array[idx] = np.inf
+            stage_freqs = comp.translate(stage_freqs)
+
+        return tuple(arrays)
+
+    def cascade_gain(self, comp, comp_data, idx, freq, stage_freq=None):
         """
         calculate the cascaded gain for the current stage
 
@@ -49,6 +407,7 @@ class CascadeEngine:
             comp_data (ComponentData): Corresponding component data object
             idx (int): Current index in the component list
             freq (float): Current simulation frequency in MHz
+            stage_freq (float): Frequency at the input of this stage, if a mixer ahead of it translated freq
 
         Returns:
             None
@@ -59,10 +418,10 @@ class CascadeEngine:
             prev_comp = self.comp_data[idx-1]
             prev_gain = prev_comp.get_value('gain', freq)
 
-        gain = prev_gain + comp.get_value('gain', freq)
+        gain = prev_gain + comp.get_value('gain', freq if stage_freq is None else stage_freq)
         comp_data.update_parameter('gain', freq, gain)
 
-    def cascade_nf(self, comp, comp_data, idx, freq):
+    def cascade_nf(self, comp, comp_data, idx, freq, stage_freq=None):
         """
         calculate the cascaded NF for the current stage
 
@@ -71,6 +430,7 @@ class CascadeEngine:
             comp_data (ComponentData): Corresponding component data object
             idx (int): Current index in the component list
             freq (float): Current simulation frequency in MHz
+            stage_freq (float): Frequency at the input of this stage, if a mixer ahead of it translated freq
 
         Returns:
             None
@@ -83,7 +443,7 @@ class CascadeEngine:
             prev_gain = prev_comp.get_value('gain', freq)
             prev_nf = prev_comp.get_value('NF', freq)
 
-        current_nf = comp.get_value('NF', freq)
+        current_nf = comp.get_value('NF', freq if stage_freq is None else stage_freq)
 
         prev_nf_linear = self._get_linear_value(prev_nf)
         gain = self._get_linear_value(prev_gain)
@@ -92,6 +452,23 @@ class CascadeEngine:
         casc_nf = round(self._get_db_value(nf_linear), 2)
         comp_data.update_parameter('NF', freq, casc_nf)
 
+    @staticmethod
+    def _resample_parameter(comp, name, freqs, temps=None):
+        """
+        Interpolate a component parameter onto a frequency grid.  Values outside the parameter's frequency range
+        are clamped to the end points, the same as Parameter.get_value
+
+        Args:
+            comp (Component): Component object
+            name (str): Parameter name
+            freqs (ndarray): Frequencies in MHz
+            temps (ndarray): Optional corner temperatures in degC
+
+        Returns:
+            (ndarray): parameter values at each frequency, with a leading temps axis when temps is given
+        """
+        return comp.get_values(name, freqs, temps)
+
     @staticmethod
     def _get_linear_value(value):
         """
@@ -117,8 +494,3 @@ class CascadeEngine:
             (float): value in dB units
         """
         return 10 * math.log10(value)
-
-
-
-
-
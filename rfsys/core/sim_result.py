@@ -0,0 +1,153 @@
+import numpy as np
+from .instrumentation import active
+
+
+class SimulationResult:
+    METRICS = ['gain', 'NF']
+
+    def __init__(self, freqs, uids, refdes=None, metrics=None):
+        """
+        Columnar container for the results of one simulation run.  All values live in a single preallocated
+        (stage x frequency x metric) array.  Stage, metric and frequency lookups are dictionary based and the
+        slicing methods return views into the array rather than copies.
+
+        Args:
+            freqs (ndarray): Simulation frequencies in MHz
+            uids (list): Component uid of each stage, in chain order
+            refdes (list): Optional reference designator of each stage, in chain order
+            metrics (list): Names of the metrics stored for each stage.  Defaults to METRICS
+        """
+        self.freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        self.uids = [str(x) for x in uids]
+        self.refdes = list(refdes) if refdes is not None else None
+        self.metrics = list(metrics) if metrics is not None else list(SimulationResult.METRICS)
+
+        if self.refdes is not None and len(self.refdes) != len(self.uids):
+            raise ValueError("Length of refdes ({}) does not equal length of uids ({})"
+                             .format(len(self.refdes), len(self.uids)))
+
+        self.data = np.zeros((len(self.uids), len(self.freqs), len(self.metrics)))
+        instr = active()
+        if instr.enabled:
+            instr.count('result.allocations')
+            instr.count('result.bytes', self.data.nbytes)
+
+        # lookup tables.  A uid that is used by several stages maps to its first stage
+        self._stage_index = dict()
+        for idx, uid in enumerate(self.uids):
+            self._stage_index.setdefault(uid, idx)
+        if self.refdes is not None:
+            for idx, ref in enumerate(self.refdes):
+                self._stage_index[ref] = idx
+        self._metric_index = {name: idx for idx, name in enumerate(self.metrics)}
+        self._freq_index = {freq: idx for idx, freq in enumerate(self.freqs.tolist())}
+
+    def __len__(self):
+        return len(self.uids)
+
+    def stage_index(self, key):
+        """
+        Get the index of a stage
+
+        Args:
+            key (int or str): stage index, refdes or uid
+
+        Returns:
+            (int): stage index
+        """
+        if isinstance(key, (int, np.integer)):
+            return int(key)
+        try:
+            return self._stage_index[str(key)]
+        except KeyError:
+            raise ValueError("Simulation result has no stage ({})".format(key))
+
+    def metric_index(self, name):
+        """
+        Get the index of a metric
+
+        Args:
+            name (str): metric name
+
+        Returns:
+            (int): metric index
+        """
+        try:
+            return self._metric_index[name]
+        except KeyError:
+            raise ValueError("Simulation result has no metric ({}). Valid metrics: {}".format(name, self.metrics))
+
+    def freq_index(self, freq):
+        """
+        Get the index of a simulation frequency
+
+        Args:
+            freq (float): Frequency in MHz
+
+        Returns:
+            (int): frequency index
+        """
+        try:
+            return self._freq_index[float(freq)]
+        except KeyError:
+            raise ValueError("Frequency ({}) was not simulated".format(freq))
+
+    def stage(self, key):
+        """
+        View of all results for one stage
+
+        Args:
+            key (int or str): stage index, refdes or uid
+
+        Returns:
+            (ndarray): view with shape (freqs, metrics)
+        """
+        return self.data[self.stage_index(key)]
+
+    def metric(self, name):
+        """
+        View of one metric for all stages
+
+        Args:
+            name (str): metric name
+
+        Returns:
+            (ndarray): view with shape (stages, freqs)
+        """
+        return self.data[:, :, self.metric_index(name)]
+
+    def at_freq(self, freq):
+        """
+        View of all results at one frequency
+
+        Args:
+            freq (float): Frequency in MHz
+
+        Returns:
+            (ndarray): view with shape (stages, metrics)
+        """
+        return self.data[:, self.freq_index(freq), :]
+
+    def get_value(self, key, name, freq):
+        """
+        Get a single cascaded value
+
+        Args:
+            key (int or str): stage index, refdes or uid
+            name (str): metric name
+            freq (float): Frequency in MHz
+
+        Returns:
+            (float): cascaded value
+        """
+        return self.data[self.stage_index(key), self.freq_index(freq), self.metric_index(name)]
+
+    def set_metric(self, name, values):
+        """
+        Write the values of one metric for all stages
+
+        Args:
+            name (str): metric name
+            values (ndarray): values with shape (stages, freqs)
+        """
+        self.data[:, :, self.metric_index(name)] = values
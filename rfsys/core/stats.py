@@ -0,0 +1,142 @@
+import math
+import numpy as np
+
+# Coefficients of Wichura's AS241 (PPND16) rational approximations to the inverse normal CDF, ascending powers
+_PPF_CENTRAL = (
+    [3.3871328727963666080e0, 1.3314166789178437745e+2, 1.9715909503065514427e+3, 1.3731693765509461125e+4,
+     4.5921953931549871457e+4, 6.7265770927008700853e+4, 3.3430575583588128105e+4, 2.5090809287301226727e+3],
+    [1.0, 4.2313330701600911252e+1, 6.8718700749205790830e+2, 5.3941960214247511077e+3,
+     2.1213794301586595867e+4, 3.9307895800092710610e+4, 2.8729085735721942674e+4, 5.2264952788528545610e+3],
+)
+_PPF_INTERMEDIATE = (
+    [1.42343711074968357734e0, 4.63033784615654529590e0, 5.76949722146069140550e0, 3.64784832476320460504e0,
+     1.27045825245236838258e0, 2.41780725177450611770e-1, 2.27238449892691845833e-2, 7.74545014278341407640e-4],
+    [1.0, 2.05319162663775882187e0, 1.67638483018380384940e0, 6.89767334985100004550e-1,
+     1.48103976427480074590e-1, 1.51986665636164571966e-2, 5.47593808499534494600e-4, 1.05075007164441684324e-9],
+)
+_PPF_TAIL = (
+    [6.65790464350110377720e0, 5.46378491116411436990e0, 1.78482653991729133580e0, 2.96560571828504891230e-1,
+     2.65321895265761230930e-2, 1.24266094738807843860e-3, 2.71155556874348757815e-5, 2.01033439929228813265e-7],
+    [1.0, 5.99832206555887937690e-1, 1.36929880922735805310e-1, 1.48753612908506148525e-2,
+     7.86869131145613259100e-4, 1.84631831751005468180e-5, 1.42151175831644588870e-7, 2.04426310338993978564e-15],
+)
+
+
+def norm_cdf(x):
+    """
+    Standard normal cumulative distribution function
+
+    Args:
+        x (float): value
+
+    Returns:
+        (float): probability that a standard normal variable is <= x
+    """
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+
+def norm_ppf(p):
+    """
+    Inverse of the standard normal cumulative distribution function (percent point function).  Uses Wichura's
+    AS241 algorithm, which is accurate to about 1e-16 over the full range.
+
+    Args:
+        p (ndarray): probabilities in [0, 1]
+
+    Returns:
+        (ndarray): standard normal values, same shape as p
+    """
+    p = np.asarray(p, dtype=np.float64)
+    q = p - 0.5
+    x = np.empty_like(p)
+
+    central = np.abs(q) <= 0.425
+    r = 0.180625 - q[central] ** 2
+    x[central] = q[central] * _rational(_PPF_CENTRAL, r)
+
+    tail = ~central
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.sqrt(-np.log(np.minimum(p[tail], 1 - p[tail])))
+        values = np.where(r <= 5, _rational(_PPF_INTERMEDIATE, r - 1.6), _rational(_PPF_TAIL, r - 5))
+    x[tail] = np.where(q[tail] < 0, -values, values)
+    x[p == 0] = -np.inf
+    x[p == 1] = np.inf
+
+    return x
+
+
+def _rational(coeffs, r):
+    """
+    Evaluate a ratio of two polynomials with ascending coefficients
+
+    Args:
+        coeffs (tuple): (numerator, denominator) coefficient lists
+        r (ndarray): polynomial argument
+
+    Returns:
+        (ndarray)
+    """
+    num, den = coeffs
+    return np.polyval(num[::-1], r) / np.polyval(den[::-1], r)
+
+
+def truncated_normal_ppf(u, mean, sigma, lower, upper):
+    """
+    Map uniform values onto a normal distribution truncated to [lower, upper] by inverting its CDF.  There is no
+    rejection step, so every uniform value produces exactly one sample.
+
+    Args:
+        u (ndarray): uniform values in [0, 1)
+        mean (float): mean of the untruncated distribution
+        sigma (float): standard deviation of the untruncated distribution
+        lower (float): lower limit
+        upper (float): upper limit
+
+    Returns:
+        (ndarray): samples, same shape as u
+    """
+    a = (lower - mean) / sigma
+    b = (upper - mean) / sigma
+    # the CDF loses precision in the upper tail, so work in the lower tail and mirror the result
+    flip = a > 0
+    if flip:
+        a, b = -b, -a
+        u = 1 - u
+
+    cdf_a = norm_cdf(a)
+    cdf_b = norm_cdf(b)
+    if cdf_b - cdf_a > 0:
+        x = norm_ppf(cdf_a + u * (cdf_b - cdf_a))
+    else:
+        # both limits are so far out that the CDF underflows.  The density there is close to an exponential with
+        # rate -b falling away from the nearer limit b, truncated at a
+        rate = -b
+        x = b + np.log1p((1 - np.asarray(u, dtype=np.float64)) * np.expm1(-rate * (b - a))) / rate
+    if flip:
+        x = -x
+
+    return np.clip(mean + sigma * x, lower, upper)
+
+
+def wilson_interval(successes, trials, confidence=0.95):
+    """
+    Wilson score confidence interval of a binomial proportion.  Unlike the normal approximation it stays inside
+    [0, 1] and behaves well for yields close to 0 or 1
+
+    Args:
+        successes (int or ndarray): number of successes
+        trials (int): number of trials
+        confidence (float): two sided confidence level
+
+    Returns:
+        (tuple): (lower, upper) bounds
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    if trials <= 0:
+        return np.zeros_like(successes), np.ones_like(successes)
+    z = float(norm_ppf((1 + confidence) / 2))
+    p = successes / trials
+    denom = 1 + z ** 2 / trials
+    center = (p + z ** 2 / (2 * trials)) / denom
+    half = z * np.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denom
+    return center - half, center + half
@@ -0,0 +1,162 @@
+import numpy as np
+from .stats import wilson_interval
+
+
+class StreamingStats:
+
+    def __init__(self, shape, bins=64, spread=0.5):
+        """
+        Running statistics of a quantity with a fixed shape (e.g. stages x freqs), updated one chunk of samples at a
+        time.  Memory depends on shape and bins only, never on the number of samples.
+
+        Mean and variance use Welford's algorithm, with chunks merged by the parallel (Chan) update.  Every cell also
+        has a fixed-bin histogram used for approximate percentiles.  The bin range of each cell is set from the
+        first chunk, widened by spread times its span on both sides; values outside it land in under/overflow bins
+        and are accounted for by the tracked min and max.
+
+        Args:
+            shape (tuple): shape of one sample
+            bins (int): histogram bins per cell
+            spread (float): fraction of the first chunk's span added to each end of the histogram range
+        """
+        self.shape = tuple(shape)
+        self.bins = bins
+        self.spread = spread
+        self.count = 0
+        self.mean = np.zeros(self.shape)
+        self._m2 = np.zeros(self.shape)
+        self.min = np.full(self.shape, np.inf)
+        self.max = np.full(self.shape, -np.inf)
+        self.hist = np.zeros(self.shape + (bins + 2,), dtype=np.int64)    # [underflow, bins..., overflow]
+        self.lower = None
+        self.width = None
+
+    def update(self, samples):
+        """
+        Fold a chunk of samples into the statistics
+
+        Args:
+            samples (ndarray): samples with shape (n,) + shape
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        n = len(samples)
+        if n == 0:
+            return
+
+        chunk_mean = samples.mean(axis=0)
+        chunk_m2 = ((samples - chunk_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        np.minimum(self.min, samples.min(axis=0), out=self.min)
+        np.maximum(self.max, samples.max(axis=0), out=self.max)
+
+        if self.lower is None:
+            lo = samples.min(axis=0)
+            span = samples.max(axis=0) - lo
+            span = np.where(span > 0, span, np.maximum(np.abs(lo), 1.0) * 1e-3)
+            self.lower = lo - self.spread * span
+            self.width = span * (1 + 2 * self.spread) / self.bins
+
+        idx = np.floor((samples - self.lower) / self.width)
+        idx = np.clip(idx, -1, self.bins).astype(np.int64) + 1
+        cells = np.arange(int(np.prod(self.shape))).reshape(self.shape)
+        flat = (cells * (self.bins + 2) + idx).ravel()
+        self.hist += np.bincount(flat, minlength=self.hist.size).reshape(self.hist.shape)
+
+    @property
+    def variance(self):
+        """
+        Sample variance (n - 1 denominator)
+        """
+        if self.count < 2:
+            return np.full(self.shape, np.nan)
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        """
+        Sample standard deviation
+        """
+        return np.sqrt(self.variance)
+
+    def percentile(self, levels):
+        """
+        Approximate percentiles from the histograms, interpolated linearly inside a bin.  The error is at most one
+        bin width for values inside the histogram range; the under/overflow bins are interpolated towards the
+        observed min/max
+
+        Args:
+            levels (list): percentile levels in percent
+
+        Returns:
+            (ndarray): values with shape (levels,) + shape
+        """
+        levels = np.atleast_1d(np.asarray(levels, dtype=np.float64))
+        cum = np.cumsum(self.hist, axis=-1)
+        # bin edges including the under/overflow bins, which reach to the observed min/max
+        inner = self.lower[..., np.newaxis] + self.width[..., np.newaxis] * np.arange(self.bins + 1)
+        low_edge = np.minimum(self.min, inner[..., 0])[..., np.newaxis]
+        high_edge = np.maximum(self.max, inner[..., -1])[..., np.newaxis]
+        edges = np.concatenate([low_edge, inner, high_edge], axis=-1)
+
+        out = np.empty((len(levels),) + self.shape)
+        for num, level in enumerate(levels):
+            target = min(max(level / 100.0 * self.count, 0), self.count)
+            idx = np.minimum((cum < target).sum(axis=-1), self.bins + 1)[..., np.newaxis]
+            in_bin = np.take_along_axis(self.hist, idx, -1)[..., 0]
+            before = np.take_along_axis(cum, idx, -1)[..., 0] - in_bin
+            frac = np.divide(target - before, in_bin, out=np.zeros(self.shape), where=in_bin > 0)
+            left = np.take_along_axis(edges, idx, -1)[..., 0]
+            right = np.take_along_axis(edges, idx + 1, -1)[..., 0]
+            out[num] = np.clip(left + frac * (right - left), self.min, self.max)
+
+        return out
+
+
+class YieldCounter:
+
+    def __init__(self, num_freqs):
+        """
+        Running pass counts of a yield analysis
+
+        Args:
+            num_freqs (int): number of simulation frequencies
+        """
+        self.trials = 0
+        self.passed_by_freq = np.zeros(num_freqs, dtype=np.int64)
+        self.passed_total = 0
+
+    def update(self, passed):
+        """
+        Count a chunk of trials
+
+        Args:
+            passed (ndarray): pass flags with shape (trials, freqs)
+        """
+        self.trials += len(passed)
+        self.passed_by_freq += passed.sum(axis=0)
+        self.passed_total += int(passed.all(axis=1).sum())
+
+    @property
+    def yield_by_freq(self):
+        return self.passed_by_freq / max(self.trials, 1)
+
+    @property
+    def yield_total(self):
+        return self.passed_total / max(self.trials, 1)
+
+    def interval(self, confidence=0.95):
+        """
+        Wilson confidence interval of the total yield
+
+        Args:
+            confidence (float): two sided confidence level
+
+        Returns:
+            (tuple): (lower, upper) bounds
+        """
+        lower, upper = wilson_interval(self.passed_total, self.trials, confidence)
+        return float(lower), float(upper)
@@ -0,0 +1,131 @@
+import re
+import numpy as np
+from .errors import validate_arg
+
+FREQ_UNITS = {'HZ': 1e-6, 'KHZ': 1e-3, 'MHZ': 1.0, 'GHZ': 1e3}    # multiplier to MHz
+FORMATS = ['RI', 'MA', 'DB']
+NETWORK_COLUMNS = 9     # freq + 4 complex S parameters (S11, S21, S12, S22)
+NOISE_COLUMNS = 5       # freq, NFmin, |Gamma opt|, angle Gamma opt, Rn
+
+_COMMENT = re.compile(r'!.*')
+_OPTION = re.compile(r'^[ \t]*#(.*)$', re.MULTILINE)
+
+
+def parse_options(line):
+    """
+    Parse a Touchstone option line (without the leading #).  Missing fields use the Touchstone defaults
+    (GHz, S, MA, R 50)
+
+    Args:
+        line (str): option line
+
+    Returns:
+        options (dict): {'unit', 'param', 'format', 'z0'}
+    """
+    options = {'unit': 'GHZ', 'param': 'S', 'format': 'MA', 'z0': 50.0}
+    tokens = line.upper().split()
+    idx = 0
+    while idx < len(tokens):
+        token = tokens[idx]
+        if token in FREQ_UNITS:
+            options['unit'] = token
+        elif token in FORMATS:
+            options['format'] = token
+        elif token == 'R':
+            idx += 1
+            options['z0'] = float(tokens[idx])
+        else:
+            options['param'] = token
+        idx += 1
+
+    validate_arg(options['param'], ['S'])
+    return options
+
+
+def read_touchstone(filepath):
+    """
+    Read a 2-port Touchstone (version 1 .s2p) file.  The numeric block is converted to an array in a single
+    call, so there is no per-line Python work.  Noise parameter data following the network data is returned too.
+
+    Args:
+        filepath (str): Full filepath for the Touchstone file
+
+    Returns:
+        data (dict): {'freqs': frequencies in MHz,
+                      's': complex S parameters with shape (freqs, 2, 2),
+                      'z0': reference impedance,
+                      'noise': None or {'freqs': MHz, 'nf_min': dB, 'gamma_opt': complex, 'rn': normalized ohms}}
+    """
+    with open(filepath) as fp:
+        text = fp.read()
+
+    text = _COMMENT.sub('', text)
+    option_lines = _OPTION.findall(text)
+    options = parse_options(option_lines[0] if option_lines else '')
+    numbers = np.array(_OPTION.sub('', text).split(), dtype=np.float64)
+
+    # network frequencies are strictly increasing.  Noise data starts at the first row whose frequency doesn't
+    # increase, which is where the column count changes
+    candidates = numbers[:len(numbers) - len(numbers) % NETWORK_COLUMNS:NETWORK_COLUMNS]
+    breaks = np.flatnonzero(np.diff(candidates) <= 0)
+    rows = breaks[0] + 1 if len(breaks) else len(candidates)
+    network = numbers[:rows * NETWORK_COLUMNS].reshape(rows, NETWORK_COLUMNS)
+    noise_data = numbers[rows * NETWORK_COLUMNS:]
+    if len(noise_data) % NOISE_COLUMNS:
+        raise ValueError("Touchstone file ({}) has an incomplete data row".format(filepath))
+
+    scale = FREQ_UNITS[options['unit']]
+    s = _to_complex(network[:, 1::2], network[:, 2::2], options['format'])
+    data = {'freqs': network[:, 0] * scale,
+            's': s[:, [0, 2, 1, 3]].reshape(rows, 2, 2),     # file order is S11, S21, S12, S22
+            'z0': options['z0'],
+            'noise': None}
+
+    if len(noise_data):
+        noise = noise_data.reshape(-1, NOISE_COLUMNS)
+        data['noise'] = {'freqs': noise[:, 0] * scale,
+                         'nf_min': noise[:, 1],
+                         'gamma_opt': noise[:, 2] * np.exp(1j * np.deg2rad(noise[:, 3])),
+                         'rn': noise[:, 4]}
+
+    return data
+
+
+def _to_complex(a, b, fmt):
+    """
+    Convert Touchstone number pairs to complex values
+
+    Args:
+        a (ndarray): first value of each pair (real part, magnitude or dB magnitude)
+        b (ndarray): second value of each pair (imaginary part or angle in degrees)
+        fmt (str): data format (RI, MA or DB)
+
+    Returns:
+        (ndarray): complex values
+    """
+    if fmt == 'RI':
+        return a + 1j * b
+    mag = a if fmt == 'MA' else np.power(10.0, a / 20.0)
+    return mag * np.exp(1j * np.deg2rad(b))
+
+
+def touchstone_params(filepath):
+    """
+    Derive component parameters from a 2-port Touchstone file.  gain is |S21| in dB.  If the file has noise
+    parameter data, NF is the minimum noise figure.
+
+    Args:
+        filepath (str): Full filepath for the Touchstone file
+
+    Returns:
+        params (dict): parameter dictionaries keyed by name, in the same format as xml_parser.parse_parameter
+    """
+    data = read_touchstone(filepath)
+    with np.errstate(divide='ignore'):
+        gain = 20 * np.log10(np.abs(data['s'][:, 1, 0]))
+    params = {'gain': {'name': 'gain', 'freqs': data['freqs'], 'values': gain}}
+
+    if data['noise'] is not None:
+        params['NF'] = {'name': 'NF', 'freqs': data['noise']['freqs'], 'values': data['noise']['nf_min']}
+
+    return params
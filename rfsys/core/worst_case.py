@@ -0,0 +1,126 @@
+import numpy as np
+from .cascade import cascade_gain_nf, cascade_nf_sensitivity
+from .errors import validate_arg
+from .monte_carlo import MonteCarloEngine, SPEC_METRICS, deviation_db
+from .sim_engine import CascadeEngine
+
+BOUNDS = ['min', 'max']
+
+
+class WorstCaseResult:
+
+    def __init__(self, freqs, params, limits, nominal, bounds, corners):
+        """
+        Results of a worst case analysis.  All values refer to the system output (last stage)
+
+        Args:
+            freqs (ndarray): Simulation frequencies in MHz
+            params (list): (stage index, parameter name) of every toleranced parameter
+            limits (ndarray): [lower, upper] tolerance limits of every parameter, shape (params, 2)
+            nominal (dict): {metric: ndarray with shape (freqs,)} without any deviation
+            bounds (dict): {metric: ndarray with shape (2, freqs)}, the [min, max] over every limit corner
+            corners (dict): {metric: bool ndarray with shape (2, params, freqs)}, True where a parameter is at its
+                upper limit in the corner that produces the [min, max] bound
+        """
+        self.freqs = freqs
+        self.params = params
+        self.limits = limits
+        self.nominal = nominal
+        self.bounds = bounds
+        self.corners = corners
+        self._freq_index = {float(freq): idx for idx, freq in enumerate(freqs)}
+
+    def get_bound(self, name, bound):
+        """
+        Get a worst case bound for every frequency
+
+        Args:
+            name (str): metric name, one of SPEC_METRICS
+            bound (str): 'min' or 'max'
+
+        Returns:
+            (ndarray): bound at each frequency
+        """
+        validate_arg(name, SPEC_METRICS)
+        validate_arg(bound, BOUNDS)
+        return self.bounds[name][BOUNDS.index(bound)]
+
+    def get_corner(self, name, bound, freq):
+        """
+        Get the limit corner that produces a bound at one frequency
+
+        Args:
+            name (str): metric name, one of SPEC_METRICS
+            bound (str): 'min' or 'max'
+            freq (float): Frequency in MHz
+
+        Returns:
+            (list): (stage index, parameter name, tolerance limit) for every toleranced parameter
+        """
+        validate_arg(name, SPEC_METRICS)
+        validate_arg(bound, BOUNDS)
+        try:
+            col = self._freq_index[float(freq)]
+        except KeyError:
+            raise ValueError("Frequency ({}) was not simulated".format(freq))
+
+        upper = self.corners[name][BOUNDS.index(bound), :, col]
+        return [(idx, param, self.limits[num, int(upper[num])]) for num, (idx, param) in enumerate(self.params)]
+
+
+def worst_case(comp_list, freqs):
+    """
+    Exact worst case bounds of the cascaded gain and NF over every combination of tolerance limits, without
+    enumerating the 2^N corners.
+
+    The cascaded gain is the sum of the stage gains, so it is lowest with every gain at its lower limit and highest
+    with every gain at its upper limit.  The Friis noise factor is increasing in every stage noise factor and, as
+    long as no stage noise factor drops below 1 (NF < 0 dB), decreasing in every stage gain, including a passive
+    stage whose NF tracks its loss.  Each parameter therefore reaches the NF bounds at one of its limits, picked by
+    the sign of its analytic sensitivity (cascade_nf_sensitivity) at each frequency.  The four bounding corners
+    are then cascaded as one (corners x stages x freqs) array, so the cost is linear in the number of stages and
+    toleranced parameters.
+
+    Tolerances are applied the same way as MonteCarloEngine: deviations from the nominal data, constant over
+    frequency.
+
+    Args:
+        comp_list (list): Component objects in chain order
+        freqs (ndarray): Simulation frequencies in MHz
+
+    Returns:
+        (WorstCaseResult)
+    """
+    freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+    gain, nf = CascadeEngine(comp_list).resample(freqs)
+    tols = MonteCarloEngine(comp_list).get_tolerances()
+
+    stages = np.array([x[0] for x in tols], dtype=np.int64)
+    is_gain = np.array([x[1] == 'gain' for x in tols], dtype=bool)
+    linked = np.array([x[3] for x in tols], dtype=bool)
+    limits = np.array([x[2].limits for x in tols], dtype=np.float64).reshape(-1, 2)
+    limits_db = np.array([deviation_db(x[2], x[2].limits) for x in tols]).reshape(-1, 2)
+
+    # change of the system NF per dB of deviation of every parameter, shape (params, freqs)
+    sens = cascade_nf_sensitivity(gain, nf)
+    slope_nf = np.where(is_gain[:, np.newaxis], sens['dNF_dgain'][stages], sens['dNF_dNF'][stages])
+    slope_nf -= np.where(linked[:, np.newaxis], sens['dNF_dNF'][stages], 0.0)
+    slope_gain = np.broadcast_to(is_gain[:, np.newaxis], slope_nf.shape).astype(np.float64)
+
+    # (metric bound corners, params, freqs): gain min, gain max, NF min, NF max
+    upper = np.stack([slope_gain < 0, slope_gain >= 0, slope_nf < 0, slope_nf >= 0])
+    delta = np.where(upper, limits_db[:, 1, np.newaxis], limits_db[:, 0, np.newaxis])
+
+    corner_gain = np.repeat(gain[np.newaxis], len(upper), axis=0)
+    corner_nf = np.repeat(nf[np.newaxis], len(upper), axis=0)
+    corner_gain[:, stages[is_gain], :] += delta[:, is_gain, :]
+    corner_nf[:, stages[~is_gain], :] += delta[:, ~is_gain, :]
+    corner_nf[:, stages[linked], :] -= delta[:, linked, :]
+
+    casc_gain, casc_nf = cascade_gain_nf(corner_gain, corner_nf)
+    nom_gain, nom_nf = cascade_gain_nf(gain, nf)
+
+    nominal = {'gain': nom_gain[-1], 'NF': nom_nf[-1]}
+    bounds = {'gain': casc_gain[:2, -1, :], 'NF': casc_nf[2:, -1, :]}
+    corners = {'gain': upper[:2], 'NF': upper[2:]}
+    return WorstCaseResult(freqs, [(x[0], x[1]) for x in tols], limits, nominal, bounds, corners)
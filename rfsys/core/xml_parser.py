@@ -1,4 +1,8 @@
 import xml.etree.ElementTree as ET
+from xml.parsers import expat
+import numpy as np
+from ..components import component_builder
+from .instrumentation import active
 
 
 def load_components(filepath):
@@ -27,12 +31,24 @@ def load_components(filepath):
     Returns:
         comp_list (list): List of dictionaries.
     """
-    root = load_xml(filepath)
     comp_list = list()
-    for comp in root:
-        if comp.tag == "component":
-            comp_dict = parse_component(comp)
-            comp_list.append(comp_dict)
+    depth = 0
+    root = None
+    with active().timer('xml.load_components'):
+        for event, element in ET.iterparse(filepath, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth == 1:
+                if element.tag == "component":
+                    comp_list.append(parse_component(element))
+                # free the parsed element and detach it from the root so memory doesn't grow with the file
+                element.clear()
+                root.remove(element)
 
     return comp_list
 
@@ -79,28 +95,167 @@ def parse_parameter(element):
         element: parameter element object
 
     Returns:
-        param_dict (dict): Parameter dictionary.  Keys are name, freqs, values.
+        param_dict (dict): Parameter dictionary.  Keys are name, freqs, values and any tolerance attributes
+            (tol, limits, dist, num_std_dev), the interpolation mode (interp) and the temperatures (temps) of a
+            temperature dependent parameter, whose values are then a (temps x freqs) array.
     """
     param_dict = element.attrib     # this will return a dictionary
     freqs = string_to_list(element.find("freqs").text)
-    values = string_to_list(element.find("values").text)
+    values_text = element.find("values").text
+    if 'temps' in param_dict:
+        # temperature dependent: one ';' separated row of values per temperature
+        param_dict['temps'] = string_to_list(param_dict['temps'])
+        values = np.array([string_to_list(row) for row in values_text.split(';')])
+    else:
+        values = string_to_list(values_text)
     param_dict.update({'freqs': freqs, 'values': values})
 
+    # optional tolerance attributes
+    if 'limits' in param_dict:
+        param_dict['limits'] = string_to_list(param_dict['limits'])
+    if 'num_std_dev' in param_dict:
+        param_dict['num_std_dev'] = float(param_dict['num_std_dev'])
+
     return param_dict
 
 
 def string_to_list(string, sep=','):
     """
-    Convert a comma separated string to a list of numbers
+    Convert a comma separated string to an array of numbers
 
     Args:
         string (str): String to convert
         sep (str): Seperator token
 
     Returns:
-        num_list (list):
+        num_list (ndarray): float64 array
     """
-    str_list = string.split(',')
-    num_list = [float(x) for x in str_list]   # convert list items to float type
-    return num_list
+    return np.array(string.split(sep), dtype=np.float64)
+
+
+class ComponentLibrary:
+
+    def __init__(self, filepath):
+        """
+        Lazily loaded component library.  A single streaming pass over the XML file builds an index of the byte
+        range of every component keyed by uid.  Nothing else is kept in memory; a component is only parsed and
+        built when it is requested, and is then cached.
+
+        ElementTree's iterparse does not report byte offsets, so the index pass drives the expat parser that
+        iterparse is built on directly.
+
+        Args:
+            filepath (str): Full filepath for the XML file
+        """
+        self.filepath = filepath
+        self.index = dict()     # uid -> (start byte, end byte, name, type)
+        self._cache = dict()
+        self._build_index()
+
+    def _build_index(self):
+        """
+        Scan the XML file once and record the byte range of each top level component element
+        """
+        parser = expat.ParserCreate()
+        state = {'depth': 0, 'start': None, 'attrib': None}
+
+        def start_element(tag, attrib):
+            state['depth'] += 1
+            if state['depth'] == 2 and tag == "component":
+                state['start'] = parser.CurrentByteIndex
+                state['attrib'] = attrib
+
+        def end_element(tag):
+            if state['depth'] == 2 and tag == "component":
+                attrib = state['attrib']
+                uid = str(attrib['uid'])
+                if uid in self.index:
+                    raise ValueError("Component uid ({}) is defined more than once in {}".format(uid, self.filepath))
+                # CurrentByteIndex points at the start of the end tag.  The tag end is found when materializing
+                self.index[uid] = (state['start'], parser.CurrentByteIndex, attrib.get('name'), attrib.get('type'))
+            state['depth'] -= 1
+
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        with active().timer('library.index'), open(self.filepath, 'rb') as fp:
+            parser.ParseFile(fp)
+
+    def __contains__(self, uid):
+        return str(uid) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, uid):
+        return self.get_component(uid)
+
+    def uids(self):
+        """
+        Get the uid of every component in the library without materializing any of them
+
+        Returns:
+            (list): component uids in file order
+        """
+        return list(self.index.keys())
+
+    def get_dict(self, uid):
+        """
+        Parse a single component into a dictionary, in the same format as load_components
+
+        Args:
+            uid (str): Component uid
+
+        Returns:
+            comp_dict (dict): Component dictionary
+        """
+        uid = str(uid)
+        if uid not in self.index:
+            raise ValueError("Component library ({}) has no component uid ({})".format(self.filepath, uid))
+
+        start, end_tag, name, comp_type = self.index[uid]
+        with open(self.filepath, 'rb') as fp:
+            fp.seek(start)
+            chunk = fp.read(end_tag - start)
+            tail = fp.read(64)      # the </component> end tag
+        return parse_component(ET.fromstring(chunk + tail[:tail.index(b'>') + 1]))
+
+    def get_component(self, uid):
+        """
+        Get a component object, building it on first use
+
+        Args:
+            uid (str): Component uid
+
+        Returns:
+            comp (Component): Component object of the correct type
+        """
+        uid = str(uid)
+        if uid not in self._cache:
+            with active().timer('library.build'):
+                self._cache[uid] = component_builder(self.get_dict(uid))
+        return self._cache[uid]
+
+    def build_chain(self, uids):
+        """
+        Build the component list for a chain
+
+        Args:
+            uids (list): Component uids in chain order
+
+        Returns:
+            (list): Component objects in chain order
+        """
+        return [self.get_component(uid) for uid in uids]
+
+    def build_netlist(self, graph):
+        """
+        Build only the components used by a compiled netlist
+
+        Args:
+            graph (NetlistGraph): compiled netlist
+
+        Returns:
+            (dict): Component objects keyed by uid
+        """
+        return {uid: self.get_component(uid) for uid in set(graph.uids.values())}
 
@@ -0,0 +1,25 @@
+from bench.generators import make_library, write_library_xml, make_netlist
+from bench.run_bench import compare
+from rfsys.core.xml_parser import ComponentLibrary
+from rfsys.core.netlist_parser import parse_net
+from rfsys.core.netlist_graph import NetlistGraph
+
+
+def test_generators(tmp_path):
+    library = make_library(6, 11, tolerance=True)
+    xml = str(tmp_path / 'library.xml')
+    write_library_xml(library, xml)
+    lib = ComponentLibrary(xml)
+    assert lib.uids() == [x['uid'] for x in library]
+    assert lib['C0'].get_parameter('gain').tolerance is not None
+
+    nets = [parse_net(x) for x in make_netlist(lib.uids(), 3, 4).split()]
+    graph = NetlistGraph(nets)
+    assert len(graph.paths()) == 4
+    assert all(len(refdes) == 7 for source, refdes, sink in graph.paths())
+
+
+def test_compare_flags_regressions():
+    baseline = {'results': {'a': {'seconds': 1.0}, 'b': {'seconds': 1.0}}}
+    current = {'results': {'a': {'seconds': 1.1}, 'b': {'seconds': 1.5}, 'c': {'seconds': 1.0}}}
+    assert [x[0] for x in compare(baseline, current, 0.2)] == ['b']
@@ -0,0 +1,63 @@
+import itertools
+import pytest
+import numpy as np
+from rfsys.components.active_components import Amplifier
+from rfsys.components.passive_components import Mixer
+from rfsys.core.explorer import DesignExplorer
+from rfsys.core.sim_engine import CascadeEngine
+
+
+def build_slots(seed=0):
+    rng = np.random.default_rng(seed)
+    slots = list()
+    for slot in range(3):
+        candidates = list()
+        for idx in range(5):
+            amp = Amplifier('{}-{}'.format(slot, idx), 'Part')
+            amp.add_parameter('gain', [10, 20], rng.uniform(-6, 20, 2))
+            amp.add_parameter('NF', [10, 20], rng.uniform(0.5, 8, 2))
+            candidates.append(amp)
+        slots.append(candidates)
+    return slots
+
+
+def brute_force(slots, freqs, nf_max, gain_min):
+    results = list()
+    for choice in itertools.product(*[range(len(x)) for x in slots]):
+        chain = [slot[idx] for slot, idx in zip(slots, choice)]
+        result = CascadeEngine(chain).run_sweep(freqs)
+        nf = result.metric('NF')[-1].max()
+        gain = result.metric('gain')[-1].min()
+        if nf <= nf_max and gain >= gain_min:
+            results.append((nf, -gain, choice))
+    return sorted(results)
+
+
+def test_explorer_matches_brute_force():
+    slots = build_slots()
+    freqs = [10, 15, 20]
+    explorer = DesignExplorer(slots, freqs, nf_max=6, gain_min=10)
+    results = explorer.run(top=5, workers=1)
+    expected = brute_force(slots, freqs, 6, 10)[:5]
+    assert [x['choice'] for x in results] == [x[2] for x in expected]
+    assert np.allclose([x['NF'] for x in results], [x[0] for x in expected])
+    assert explorer.stats['pruned'] > 0
+    assert explorer.combinations() == 125
+
+
+def test_explorer_pool_matches_serial():
+    slots = build_slots(1)
+    explorer = DesignExplorer(slots, [10, 20], nf_max=8)
+    serial = explorer.run(top=4, workers=1)
+    pooled = explorer.run(top=4, workers=2)
+    assert [x['choice'] for x in serial] == [x['choice'] for x in pooled]
+
+
+def test_explorer_rejects_mixer_ahead_of_slots():
+    slots = build_slots()
+    mixer = Mixer('M', 'Mixer')
+    mixer.add_parameter('gain', [10, 20], [-7, -7])
+    mixer.set_lo(lo_freq=5)
+    with pytest.raises(ValueError):
+        DesignExplorer([slots[0], [mixer], slots[1]], [10, 20])
+    assert DesignExplorer(slots[:2] + [[mixer]], [10, 20]).combinations() == 25
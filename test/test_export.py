@@ -0,0 +1,73 @@
+import tracemalloc
+import numpy as np
+import pytest
+from rfsys.core.export import ResultWriter, open_export, load_csv, result_columns
+from rfsys.core.monte_carlo import MonteCarloEngine, EXPORT_COLUMNS
+from rfsys.core.sim_engine import CascadeEngine
+from test.test_sim_engine import build_chain
+from test.test_monte_carlo import build_chain as build_mc_chain
+
+
+def test_export_sweep_csv_and_npy(tmp_path):
+    freqs = np.linspace(10, 20, 7)
+    result = CascadeEngine(build_chain()).run_sweep(freqs)
+    columns = result_columns(result)
+    for ext in ('csv', 'npy'):
+        filepath = str(tmp_path / ('sweep.' + ext))
+        with ResultWriter(filepath, columns) as writer:
+            writer.write_result(result)
+        data = open_export(filepath) if ext == 'npy' else load_csv(filepath)
+        assert len(data) == len(result) * len(freqs)
+        assert list(data.dtype.names) == columns
+        last = data[data['stage'] == len(result) - 1]
+        assert np.allclose(last['freq'], freqs)
+        assert np.allclose(last['gain'], result.metric('gain')[-1])
+
+
+def test_export_npy_append(tmp_path):
+    filepath = str(tmp_path / 'rows.npy')
+    with ResultWriter(filepath, ['a', 'b']) as writer:
+        writer.write(np.ones((3, 2)))
+    with ResultWriter(filepath, ['a', 'b'], append=True) as writer:
+        assert writer.rows == 3
+        writer.write({'a': [5, 6], 'b': [7, 8]})
+    data = open_export(filepath)
+    assert isinstance(data, np.memmap)
+    assert np.array_equal(data['a'], [1, 1, 1, 5, 6])
+    assert np.array_equal(np.load(filepath)['b'], [1, 1, 1, 7, 8])
+    pytest.raises(ValueError, ResultWriter, filepath, ['a', 'c'], append=True)
+
+
+def test_export_monte_carlo_stream(tmp_path):
+    filepath = str(tmp_path / 'mc.npy')
+    mc = MonteCarloEngine(build_mc_chain())
+    with ResultWriter(filepath, EXPORT_COLUMNS) as writer:
+        result = mc.run([10, 20], 250, specs={'gain': [19, None]}, seed=3, chunk_size=100, workers=1,
+                        writer=writer)
+    data = open_export(filepath)
+    assert len(data) == 500
+    assert np.array_equal(data['trial'][:4], [0, 0, 1, 1])
+    assert data['trial'][-1] == 249
+    gain = np.asarray(data['gain']).reshape(250, 2)
+    assert np.allclose(np.percentile(gain, 50, axis=0), result.get_percentile('gain', 50))
+    assert np.isclose(np.asarray(data['passed']).reshape(250, 2).all(axis=1).mean(), result.yield_total)
+
+
+def test_export_monte_carlo_streaming_bounded_memory(tmp_path):
+    freqs = np.linspace(10, 20, 20)
+    mc = MonteCarloEngine(build_mc_chain())
+    full = mc.run(freqs, 5000, seed=5, chunk_size=100, workers=1)
+
+    filepath = str(tmp_path / 'mc_stream.npy')
+    tracemalloc.start()
+    with ResultWriter(filepath, EXPORT_COLUMNS) as writer:
+        result = mc.run_streaming(freqs, 5000, seed=5, chunk_size=100, workers=1, writer=writer)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # the system gain of every trial alone is 5000 x 20 x 8 bytes; only one chunk at a time is held
+    assert peak < 5000 * 20 * 8
+    data = open_export(filepath)
+    assert len(data) == 5000 * 20 and result.trials == 5000
+    gain = np.asarray(data['gain']).reshape(5000, 20)
+    assert np.allclose(np.percentile(gain, 50, axis=0), full.get_percentile('gain', 50))
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from rfsys.components import component_builder
+from rfsys.components.active_components import Amplifier
+from rfsys.components.passive_components import Filter, Mixer
+from rfsys.core.freq_plan import mixer_products, spur_search
+from rfsys.core.sim_engine import CascadeEngine
+
+
+def build_receiver():
+    lna = Amplifier('1', 'LNA')
+    lna.add_parameter('gain', [1000, 1200], [20, 18])
+    lna.add_parameter('NF', [1000, 1200], [2, 2.5])
+    mixer = Mixer('2', 'Mixer')
+    mixer.add_parameter('gain', [1000, 1200], [-7, -7.5])
+    mixer.set_lo(lo_freq=1000)
+    filt = Filter('3', 'IF filter')
+    filt.add_parameter('gain', [50, 100, 150, 300, 2500], [-40, -1, -40, -60, -80])
+    return [lna, mixer, filt]
+
+
+def test_mixer_translation():
+    chain = build_receiver()
+    freqs = np.array([1050, 1100, 1150])
+    sim = CascadeEngine(chain)
+    result = sim.run_sweep(freqs)
+    assert np.allclose(sim.stage_freqs(freqs, 2), [50, 100, 150])
+    stage_gain = np.diff(result.metric('gain'), axis=0, prepend=0)
+    assert np.allclose(stage_gain[2], [-40, -1, -40])
+    for freq in freqs:
+        sim.run(freq)
+        assert np.isclose(sim.comp_data[2].get_value('gain', freq), result.get_value('3', 'gain', freq))
+
+    # a tuned LO keeps the IF fixed
+    chain[1].set_lo(if_freq=100, side='high')
+    assert np.allclose(chain[1].lo(freqs), freqs + 100)
+    assert np.allclose(CascadeEngine(chain).stage_freqs(freqs, 2), 100)
+    pytest.raises(ValueError, chain[1].set_lo, lo_freq=1000, if_freq=100)
+
+
+def test_spur_search():
+    m, n, sign = mixer_products(2)
+    assert len(m) == 5 and not np.any((m == 1) & (n == 1) & (sign < 0))
+
+    chain = build_receiver()
+    spurs = spur_search(chain, 1, [1100, 1125], max_order=4, if_bandwidth=220, spur_table={(2, 2): -50})
+    idx = [spurs.label(x) for x in range(len(spurs.m))].index('2LO-2RF')
+    assert np.allclose(spurs.spur_freqs[idx], [200, 250])
+    expected = -1 - np.interp(200, [150, 300], [-40, -60])
+    assert np.isclose(spurs.rejection[idx, 0], expected)
+    assert np.isclose(spurs.level[idx, 0], -50 - expected)
+    assert spurs.in_band[idx].tolist() == [True, False]
+
+    level, worst = spurs.worst()
+    assert level.shape == (2,) and np.all(level <= 0)
+    pytest.raises(ValueError, spur_search, chain, 0, [1100])
+
+
+def test_mixer_from_dict():
+    mixer = component_builder({'uid': '5', 'name': 'Mixer', 'type': 'ActiveMixer', 'if_freq': '70', 'side': 'low',
+                               'params': {'gain': {'name': 'gain', 'freqs': [900], 'values': [10]}}})
+    assert np.allclose(mixer.translate(np.array([900.0])), 70)
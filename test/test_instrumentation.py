@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+from rfsys.core import instrumentation
+from rfsys.core.instrumentation import Instrumentation, NullInstrumentation
+from rfsys.core.sim_engine import CascadeEngine
+from test.test_sim_engine import build_chain
+
+
+def test_engine_instrumentation():
+    instr = Instrumentation()
+    stages = list()
+    instr.add_hook('stage', lambda index, component: stages.append(index))
+    sim = CascadeEngine(build_chain(), instrumentation=instr)
+    freqs = np.linspace(10, 20, 5)
+    sim.run_sweep(freqs)
+    sim.set_parameter(1, 'NF', [10, 20], [2, 2])
+    sim.run_sweep(freqs)
+    sim.run_sweep(freqs)
+
+    report = instr.report()
+    assert stages == [0, 1, 1]
+    assert report['counters']['engine.sweeps'] == 2
+    assert report['counters']['engine.stages_computed'] == 3
+    assert report['counters']['engine.cache_hits'] == 1
+    assert report['counters']['result.allocations'] == 2
+    assert report['counters']['parameter.get_values'] > 0
+    assert report['timers']['engine.cascade']['calls'] == 2
+    # nothing leaks into the default instrumentation once the run is over
+    assert not instrumentation.active().enabled
+
+
+def test_null_instrumentation():
+    instr = NullInstrumentation()
+    with instr.timer('x'):
+        instr.count('y')
+    assert instr.report() == {'counters': {}, 'timers': {}}
+    pytest.raises(ValueError, instr.add_hook, 'stage', print)
+    pytest.raises(ValueError, Instrumentation().add_hook, 'invalid', print)
+
+
+def test_engine_instrumentation_batched_runs():
+    instr = Instrumentation()
+    sim = CascadeEngine(build_chain(), instrumentation=instr)
+    freqs = np.linspace(10, 20, 5)
+    sim.run_corners(freqs, [-40, 25, 85])
+    sim.sensitivity(freqs)
+    sim.run_power_sweep(freqs, [-60, -30])
+
+    report = instr.report()
+    assert report['counters']['engine.corner_runs'] == 1
+    assert report['counters']['engine.power_sweeps'] == 1
+    assert report['timers']['engine.sensitivity']['calls'] == 1
+    assert not instrumentation.active().enabled
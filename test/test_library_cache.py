@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pickle
+import shutil
+import numpy as np
+import pytest
+from rfsys.core.library_cache import compile_library, open_library, CompiledLibrary
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'usr', 'component_schema.xml')
+
+
+def test_compiled_library(tmp_path):
+    xml = str(tmp_path / 'lib.xml')
+    shutil.copy(SCHEMA, xml)
+    lib = open_library(xml)
+    assert os.path.exists(xml + '.rfcache')
+    assert lib.uids() == ['1', '2']
+
+    lna = lib['2']
+    nf = lna.get_parameter('NF')
+    assert list(nf.values) == [3, 3.1, 3.2]
+    assert np.shares_memory(nf.values, lib.data)    # arrays are views into the mapping
+    assert not nf.values.flags.writeable
+    assert lna.get_parameter('gain').tolerance.dist == 'NORMAL'
+    gain = lna.get_parameter('gain')
+    assert gain.grid.shape == (3, 3) and np.shares_memory(gain.grid, lib.data)
+    assert np.allclose(gain.get_values([10, 20], temps=[-40]), [[19.8, 19.5]])
+
+    clone = pickle.loads(pickle.dumps(lib))
+    assert isinstance(clone, CompiledLibrary) and clone.uids() == lib.uids()
+
+
+def test_compiled_library_invalidation(tmp_path):
+    xml = str(tmp_path / 'lib.xml')
+    shutil.copy(SCHEMA, xml)
+    open_library(xml)
+    # touching the file without changing it keeps the cache
+    os.utime(xml, ns=(1, 1))
+    assert CompiledLibrary(xml + '.rfcache').is_current(xml)
+
+    with open(xml) as fp:
+        text = fp.read()
+    with open(xml, 'w') as fp:
+        fp.write(text.replace('3, 3.1, 3.2', '4, 4.1, 4.2'))
+    assert not CompiledLibrary(xml + '.rfcache').is_current(xml)
+    assert list(open_library(xml)['2'].get_parameter('NF').values) == [4, 4.1, 4.2]
+
+
+def test_compiled_library_close_and_unique_temp_files(tmp_path):
+    xml = str(tmp_path / 'lib.xml')
+    shutil.copy(SCHEMA, xml)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        paths = list(pool.map(lambda x: compile_library(xml), range(8)))
+    assert all(path == xml + '.rfcache' for path in paths)
+    assert sorted(os.listdir(str(tmp_path))) == ['lib.xml', 'lib.xml.rfcache']
+
+    with open_library(xml) as lib:
+        nf = lib['2'].get_parameter('NF')
+    assert lib._map is None
+    assert list(nf.values) == [3, 3.1, 3.2]     # built components stay valid
+    pytest.raises(ValueError, lib.get_dict, '1')
+    lib.close()
+
+    with CompiledLibrary(xml + '.rfcache') as other:
+        other.uids()
+    assert other._map is None
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from rfsys.components.passive_components import Filter
+from rfsys.components.active_components import Amplifier
+from rfsys.core.monte_carlo import MonteCarloEngine
+from rfsys.core.streaming_stats import StreamingStats
+
+
+def build_chain():
+    filt = Filter('1', 'Preselector')
+    filt.add_parameter('gain', [10, 20], [-1, -1], tol='dB', limits=[-0.5, 0.5])
+    lna = Amplifier('2', 'LNA')
+    lna.add_parameter('gain', [10, 20], [20, 20], tol='dB', limits=[-1, 1], dist='normal')
+    lna.add_parameter('NF', [10, 20], [3, 3])
+    return [filt, lna]
+
+
+def test_monte_carlo_bounds_and_yield():
+    mc = MonteCarloEngine(build_chain())
+    specs = {'gain': [19, None]}
+    result = mc.run([10, 20], 5000, specs=specs, levels=(0, 50, 100), seed=1, chunk_size=1000, workers=1)
+    low = result.get_percentile('gain', 0)
+    high = result.get_percentile('gain', 100)
+    assert np.all(low >= 17.5) and np.all(high <= 20.5)
+    assert np.allclose(result.get_percentile('gain', 50), 19, atol=0.1)
+    assert 0.4 < result.yield_total < 0.6
+    assert result.yield_by_freq.shape == (2,)
+
+
+def test_monte_carlo_reproducible_across_workers():
+    mc = MonteCarloEngine(build_chain())
+    single = mc.run([10, 15, 20], 3000, seed=7, chunk_size=1000, workers=1)
+    pooled = mc.run([10, 15, 20], 3000, seed=7, chunk_size=1000, workers=2)
+    assert np.array_equal(single.percentiles['NF'], pooled.percentiles['NF'])
+    assert np.array_equal(single.percentiles['gain'], pooled.percentiles['gain'])
+
+
+def test_monte_carlo_streaming_matches_full_run():
+    mc = MonteCarloEngine(build_chain())
+    specs = {'gain': [19, None]}
+    full = mc.run([10, 20], 5000, specs=specs, levels=(1, 50, 99), seed=1, chunk_size=1000, workers=1)
+    stream = mc.run_streaming([10, 20], 5000, specs=specs, levels=(1, 50, 99), seed=1, chunk_size=1000, workers=1)
+    assert stream.trials == 5000
+    assert stream.yield_total == full.yield_total
+    assert np.array_equal(stream.yield_by_freq, full.yield_by_freq)
+    assert np.allclose(stream.percentiles['gain'], full.percentiles['gain'], atol=0.05)
+    assert stream.stats['gain'].mean.shape == (2, 2)
+    assert np.allclose(stream.stats['gain'].mean[-1], 19, atol=0.05)
+    assert stream.yield_interval[0] < stream.yield_total < stream.yield_interval[1]
+
+
+def test_monte_carlo_streaming_early_stop():
+    mc = MonteCarloEngine(build_chain())
+    specs = {'gain': [19, None]}
+    single = mc.run_streaming([10, 20], 10 ** 6, specs=specs, seed=5, chunk_size=500, workers=1, ci_width=0.05)
+    lower, upper = single.yield_interval
+    assert upper - lower < 0.05
+    assert single.trials < 10 ** 5 and single.trials % 500 == 0
+    pooled = mc.run_streaming([10, 20], 10 ** 6, specs=specs, seed=5, chunk_size=500, workers=2, ci_width=0.05)
+    assert pooled.trials == single.trials and pooled.yield_total == single.yield_total
+
+
+def test_monte_carlo_needs_trials():
+    mc = MonteCarloEngine(build_chain())
+    with pytest.raises(ValueError):
+        mc.run([10, 20], 0, workers=1)
+    with pytest.raises(ValueError):
+        mc.run_streaming([10, 20], 0, workers=1)
+
+
+def test_streaming_stats_welford_and_percentiles():
+    rng = np.random.default_rng(0)
+    samples = rng.normal(3, 2, (20000, 2, 3))
+    stats = StreamingStats((2, 3), bins=64)
+    for chunk in np.array_split(samples, 7):
+        stats.update(chunk)
+    assert stats.count == 20000
+    assert np.allclose(stats.mean, samples.mean(axis=0))
+    assert np.allclose(stats.variance, samples.var(axis=0, ddof=1))
+    approx = stats.percentile([0, 5, 50, 95, 100])
+    exact = np.percentile(samples, [0, 5, 50, 95, 100], axis=0)
+    assert np.allclose(approx, exact, atol=stats.width.max())
+    assert np.array_equal(approx[0], samples.min(axis=0)) and np.array_equal(approx[-1], samples.max(axis=0))
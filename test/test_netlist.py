@@ -0,0 +1,119 @@
+import os
+import pytest
+import numpy as np
+from rfsys.components.passive_components import Filter, Mixer
+from rfsys.components.active_components import Amplifier
+from rfsys.core.netlist_parser import load_netlist, parse_net
+from rfsys.core.netlist_graph import NetlistGraph, NetlistEngine
+from rfsys.core.sim_engine import CascadeEngine
+
+NETLIST = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'rfsys', 'core',
+                       'netlist_test.txt')
+
+
+def build_components():
+    lna = Amplifier('LNA1', 'LNA')
+    lna.add_parameter('gain', [10, 20], [20, 18])
+    lna.add_parameter('NF', [10, 20], [1.5, 2])
+    amp = Amplifier('P1', 'Driver')
+    amp.add_parameter('gain', [10, 20], [12, 11])
+    amp.add_parameter('NF', [10, 20], [4, 5])
+    filt = Filter('FILT1', 'Filter')
+    filt.add_parameter('gain', [10, 20], [-2, -3])
+    split = Filter('S1', 'Splitter')
+    split.add_parameter('gain', [10], [-3.5])
+    return [lna, amp, filt, split]
+
+
+def test_graph_paths():
+    graph = NetlistGraph(load_netlist(NETLIST))
+    assert graph.sources == ['SOURCE.1']
+    assert sorted(graph.sinks) == ['SINK.1', 'SINK.2']
+    paths = sorted(graph.paths(), key=lambda x: x[2])
+    assert paths[0][1] == ['U1', 'U2', 'FL1', 'U3', 'FL2', 'U4']
+    assert paths[1][1] == ['U1', 'U2', 'FL1', 'U3', 'FL3']
+    order = graph.order
+    assert order.index('U3') < order.index('FL2') and order.index('U3') < order.index('FL3')
+
+
+def test_graph_loop():
+    nets = [parse_net(x) for x in ['SOURCE.1;U1-A.1', 'U1-A.2;U2-A.1', 'U2-A.2;U1-A.1']]
+    pytest.raises(ValueError, NetlistGraph, nets)
+
+
+def test_netlist_engine_matches_flat_chain():
+    comps = build_components()
+    by_uid = {comp.uid: comp for comp in comps}
+    engine = NetlistEngine(NetlistGraph(load_netlist(NETLIST)), comps)
+    # the shared trunk is one segment and each branch is one more
+    assert len(engine.segments) == 3
+
+    freqs = np.linspace(5, 25, 11)
+    results = engine.run_sweep(freqs)
+    for (source, refdes, sink), result in zip(engine.paths, results):
+        chain = [by_uid[engine.graph.uids[ref]] for ref in refdes]
+        expected = CascadeEngine(chain).run_sweep(freqs)
+        for name in ('gain', 'NF'):
+            assert np.allclose(result.metric(name), expected.metric(name))
+        assert result.stage_index(refdes[-1]) == len(refdes) - 1
+
+
+def test_netlist_instances_share_definition():
+    comps = build_components()
+    engine = NetlistEngine(NetlistGraph(load_netlist(NETLIST)), comps)
+    fl1, fl2, fl3 = engine.instance('FL1'), engine.instance('FL2'), engine.instance('FL3')
+    assert fl1.definition is fl2.definition is fl3.definition is comps[2]
+    gain = fl1.get_parameter('gain')
+    assert gain.frozen and not gain.values.flags.writeable
+    pytest.raises(ValueError, gain.update_value, gain.freqs[0], 0.0)
+    pytest.raises(ValueError, gain.update_value, gain.freqs[-1] + 1, 0.0)
+    pytest.raises(ValueError, engine.instance, 'FL9')
+
+    freqs = np.linspace(5, 25, 11)
+    base = [result.data.copy() for result in engine.run_sweep(freqs)]
+
+    # a per-refdes offset only changes the paths through that refdes
+    fl2.set_offset('gain', -1.0)
+    assert np.allclose(fl2.get_values('NF', freqs), fl1.get_values('NF', freqs) + 1.0)
+    results = engine.run_sweep(freqs)
+    for (source, refdes, sink), result, before in zip(engine.paths, results, base):
+        if 'FL2' in refdes:
+            idx = refdes.index('FL2')
+            assert np.allclose(result.data[:idx], before[:idx])
+            assert np.allclose(result.metric('gain')[idx:], before[idx:, :, 0] - 1.0)
+        else:
+            assert np.allclose(result.data, before)
+
+    fl2.clear_overrides()
+    for result, before in zip(engine.run_sweep(freqs), base):
+        assert np.allclose(result.data, before)
+
+
+def test_netlist_mixer_translates_branches():
+    lna = Amplifier('LNA1', 'LNA')
+    lna.add_parameter('gain', [800, 1000], [20, 18])
+    lna.add_parameter('NF', [800, 1000], [1.5, 2])
+    mixer = Mixer('MIX', 'Mixer')
+    mixer.add_parameter('gain', [800, 1000], [-7, -7])
+    mixer.set_lo(lo_freq=900)
+    split = Filter('S1', 'Splitter')
+    split.add_parameter('gain', [10], [-3.5])
+    filt = Filter('IF', 'IF Filter')
+    filt.add_parameter('gain', [10, 50, 100, 800, 1000], [-8, -1, -8, -90, -90])
+    amp = Amplifier('P1', 'IF Amp')
+    amp.add_parameter('gain', [10, 100, 1000], [15, 12, 0])
+    amp.add_parameter('NF', [10, 100, 1000], [4, 5, 10])
+    comps = [lna, mixer, split, filt, amp]
+
+    nets = [parse_net(x) for x in ['SOURCE.1;U1-LNA1.1', 'U1-LNA1.2;M1-MIX.1', 'M1-MIX.2;U3-S1.1',
+                                   'U3-S1.2;FL1-IF.1', 'FL1-IF.2;U4-P1.1', 'U4-P1.2;SINK.1',
+                                   'U3-S1.3;FL2-IF.1', 'FL2-IF.2;SINK.2']]
+    engine = NetlistEngine(NetlistGraph(nets), comps)
+    freqs = np.array([850, 900, 925, 980])
+    by_uid = {comp.uid: comp for comp in comps}
+    for (source, refdes, sink), result in zip(engine.paths, engine.run_sweep(freqs)):
+        chain = [by_uid[engine.graph.uids[ref]] for ref in refdes]
+        expected = CascadeEngine(chain).run_sweep(freqs)
+        for name in ('gain', 'NF'):
+            assert np.allclose(result.metric(name), expected.metric(name))
+        assert np.all(result.metric('gain')[-1] > -30)
@@ -1,6 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 import pytest
+import numpy as np
 from rfsys.core.errors import InvalidArgumentError
-from components.base_component import Tolerance
+from rfsys.components.base_component import Tolerance, Parameter
 
 
 def test_tolerance_invalid_arg():
@@ -19,3 +21,152 @@ def test_tolerance_value_normal():
     assert 8 <= t.get_value(10) <= 12
 
 
+def test_parameter_sorted_arrays():
+    p = Parameter('gain', [20, 10, 15], [2, 1, 1.5])
+    assert p.freqs.dtype == np.float64
+    assert list(p.freqs) == [10, 15, 20]
+    assert list(p.values) == [1, 1.5, 2]
+
+
+def test_parameter_get_values_matches_get_value():
+    p = Parameter('gain', [10, 15, 20], [-0.5, -0.6, -0.7])
+    freqs = np.array([1, 10, 12.5, 15, 17, 20, 100])
+    expected = [p.get_value(f) for f in freqs]
+    assert np.allclose(p.get_values(freqs), expected)
+    # repeated grid reuses the cached bins
+    assert np.allclose(p.get_values(freqs), expected)
+    assert np.allclose(p.get_values(freqs[:3]), expected[:3])
+
+
+def test_parameter_get_values_single_point():
+    p = Parameter('gain', [10], [3])
+    assert np.allclose(p.get_values([1, 10, 100]), [3, 3, 3])
+
+
+def test_parameter_update_value():
+    p = Parameter('gain', [10, 20], [1, 2])
+    freqs = np.array([12, 15, 18])
+    p.get_values(freqs)
+    p.update_value(15, 5)
+    p.update_value(20, 3)
+    assert list(p.freqs) == [10, 15, 20]
+    assert list(p.values) == [1, 5, 3]
+    assert np.isclose(p.get_values(freqs)[1], 5)
+
+
+def test_tolerance_sample_within_limits():
+    t = Tolerance('dB', [8, 12], dist='normal')
+    values = t.sample(10000, mean=10, rng=1)
+    assert values.shape == (10000,)
+    assert values.min() >= 8 and values.max() <= 12
+    assert abs(values.mean() - 10) < 0.05
+
+    # tight limits far from the mean still give one value per draw
+    values = Tolerance('dB', [11.9, 12]).sample(100, rng=1)
+    assert values.min() >= 11.9 and values.max() <= 12
+    values = Tolerance('dB', [8, 8.1], dist='normal').sample(100, mean=10, rng=1)
+    assert values.min() >= 8 and values.max() <= 8.1
+
+    # limits so far out that the normal CDF underflows pile up next to the nearer limit
+    values = Tolerance('dB', [19, 20], dist='normal').sample(1000, mean=0, rng=1)
+    assert values.min() >= 19 and values.max() <= 20
+    assert abs(values.mean() - (19 + 1 / 171)) < 1e-3
+    values = Tolerance('dB', [0, 0.1], dist='normal').sample(1000, mean=-5, rng=1)
+    assert values.min() >= 0 and values.max() < 0.01
+
+
+def test_tolerance_sample_chunk_invariant():
+    t = Tolerance('dB', [8, 12], dist='normal')
+    block = t.sample(1000, mean=10, rng=np.random.default_rng(3))
+    rng = np.random.default_rng(3)
+    chunks = np.concatenate([t.sample(n, mean=10, rng=rng) for n in (100, 400, 500)])
+    assert np.array_equal(block, chunks)
+
+
+def test_tolerance_sample_requires_mean():
+    t = Tolerance('dB', [8, 12], dist='normal')
+    pytest.raises(ValueError, t.sample, 10)
+
+
+def test_parameter_interp_modes():
+    freqs = [10, 100, 1000]
+    values = [0, 1, 2]
+    pytest.raises(InvalidArgumentError, Parameter, 'gain', freqs, values, interp='quadratic')
+    pytest.raises(ValueError, Parameter, 'gain', [0, 10], [0, 1], interp='log')
+
+    log = Parameter('gain', freqs, values, interp='log')
+    assert np.allclose(log.get_values([10, 31.6227766, 100, 5000]), [0, 0.5, 1, 2])
+    nearest = Parameter('gain', freqs, values, interp='nearest')
+    assert np.allclose(nearest.get_values([10, 50, 60, 999]), [0, 0, 1, 2])
+
+    # both cubics pass through the knots and reproduce straight lines exactly
+    for mode in ('pchip', 'cubic'):
+        p = Parameter('gain', freqs, values, interp=mode)
+        assert np.allclose(p.get_values(freqs), values)
+        assert np.isclose(p.get_value(55), p.get_values([55])[0])
+        line = Parameter('gain', [1, 4, 5, 9], [2, 8, 10, 18], interp=mode)
+        assert np.allclose(line.get_values([2, 4.5, 7]), [4, 9, 14])
+
+
+def test_parameter_pchip_monotone_cubic_smooth():
+    freqs = np.array([10, 11, 12, 20, 30])
+    values = np.array([0, 0, 5, 5.5, 6])
+    grid = np.linspace(10, 30, 2001)
+    pchip = Parameter('gain', freqs, values, interp='pchip').get_values(grid)
+    assert np.all(np.diff(pchip) >= -1e-12)
+    assert pchip.min() >= 0 and pchip.max() <= 6
+
+    spline = Parameter('gain', freqs, values, interp='cubic')
+    t = spline._coeffs
+    h = np.diff(freqs)
+    # second derivative is continuous at the interior knots and zero at the ends
+    left = (2 * t[2] + 6 * t[3]) / h ** 2
+    right = 2 * t[2] / h ** 2
+    assert np.allclose(left[:-1], right[1:])
+    assert np.isclose(right[0], 0) and np.isclose(left[-1], 0)
+
+
+def test_parameter_interp_update_value():
+    p = Parameter('gain', [10, 20, 30], [1, 2, 1], interp='cubic')
+    before = p.get_values([15, 25])
+    p.update_value(20, 4)
+    assert not np.allclose(p.get_values([15, 25]), before)
+    assert np.isclose(p.get_value(20), 4)
+    p.update_value(40, 0)
+    assert np.isclose(p.get_value(40), 0) and np.isclose(p.get_value(30), 1)
+
+
+def test_parameter_temperature_grid():
+    grid = [[3, 4], [1, 2], [0, 0]]
+    p = Parameter('gain', [10, 20], grid, temps=[85, -40, 25])
+    assert list(p.temps) == [-40, 25, 85]
+    # nominal (25 degC) row is the plain frequency parameter
+    assert np.allclose(p.values, [0, 0])
+    values = p.get_values([10, 15, 20], temps=[-40, -7.5, 55, 200])
+    assert values.shape == (4, 3)
+    assert np.allclose(values[0], [1, 1.5, 2])
+    assert np.allclose(values[1], [0.5, 0.75, 1])
+    assert np.allclose(values[2], [1.5, 1.75, 2])
+    assert np.allclose(values[3], [3, 3.5, 4])
+
+    flat = Parameter('gain', [10, 20], [1, 2])
+    assert np.allclose(flat.get_values([10, 20], temps=[-40, 85]), [[1, 2], [1, 2]])
+    pytest.raises(ValueError, Parameter, 'gain', [10, 20], grid, temps=[-40, 25])
+    pytest.raises(ValueError, p.update_value, 10, 5.0)
+    pytest.raises(ValueError, p.update_value, 15, 5.0)
+
+
+def test_parameter_grid_cache_shared_across_threads():
+    p = Parameter('gain', np.linspace(10, 20, 50), np.linspace(0, 49, 50))
+    grids = [np.linspace(10, 20, 1000), np.linspace(12, 18, 1000)]
+    expected = [np.interp(grid, p.freqs, p.values) for grid in grids]
+
+    def work(num):
+        for idx in range(200):
+            grid = (num + idx) % 2
+            if not np.allclose(p.get_values(grids[grid]), expected[grid]):
+                return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert all(pool.map(work, range(8)))
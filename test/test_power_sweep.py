@@ -0,0 +1,55 @@
+import numpy as np
+from rfsys.core.sim_engine import CascadeEngine
+from rfsys.core.power_sweep import rapp_backoff, rapp_smoothness, power_sweep
+from rfsys.components.passive_components import Filter
+from rfsys.components.active_components import Amplifier
+
+
+def build_chain():
+    filt = Filter('1', 'Preselector')
+    filt.add_parameter('gain', [10, 20], [-1, -2])
+    lna = Amplifier('2', 'LNA')
+    lna.add_parameter('gain', [10, 20], [20, 18])
+    lna.add_parameter('NF', [10, 20], [2, 2])
+    lna.add_parameter('P1dB', [10, 20], [10, 10])
+    pa = Amplifier('3', 'Driver')
+    pa.add_parameter('gain', [10, 20], [15, 15])
+    pa.add_parameter('NF', [10, 20], [5, 5])
+    pa.add_parameter('P1dB', [10, 20], [20, 20])
+    pa.add_parameter('Psat', [10, 20], [22, 22])
+    return [filt, lna, pa]
+
+
+def test_rapp_smoothness_round_trip():
+    p = np.array([0.5, 1, 2, 3, 8])
+    assert np.allclose(rapp_smoothness(np.zeros(5), rapp_backoff(p)), p, rtol=1e-9)
+    assert np.isclose(rapp_backoff(2), 1 - 5 * np.log10(10**0.2 - 1))
+
+
+def test_single_stage_compression_point():
+    pins = np.linspace(-40, 10, 501)
+    pout, small_signal_gain, nf = power_sweep(pins, [[20.0]], [[3.0]], [[15.0]], [[17.0]])
+    # output P1dB = 15 dBm, so 1 dB compression at -4 dBm input
+    gain = pout[:, 0, 0] - pins
+    assert np.isclose(gain[0], 20, atol=1e-3)
+    assert np.isclose(np.interp(-4, pins, gain), 19, atol=1e-3)
+    assert pout.max() < 17
+
+
+def test_power_sweep_matches_small_signal_cascade():
+    freqs = np.linspace(10, 20, 7)
+    sim = CascadeEngine(build_chain(), bandwidth=1e6)
+    result = sim.run_power_sweep(freqs, np.arange(-80, 0, 0.25))
+    linear = sim.run_sweep(freqs)
+
+    assert result.pout.shape == (320, 3, 7)
+    assert np.allclose(result.gain[0], linear.metric('gain'), atol=1e-3)
+    assert np.allclose(result.compression[0], 0, atol=1e-3)
+    assert np.allclose(result.snr[0, -1], -80 - (-174 + 60) - linear.metric('NF')[-1], atol=0.05)
+
+    # the analytic input P1dB adds up every stage's 1 dB point, so it is a conservative bound on the sweep
+    ip1db = result.compression_point(1.0)
+    assert np.all(ip1db > linear.metric('IP1dB')[-1])
+    assert np.all(ip1db - linear.metric('IP1dB')[-1] < 3)
+    assert np.all(np.diff(result.compression[:, -1], axis=0) >= -1e-9)
+    assert np.all(np.isnan(result.compression_point(50.0)))
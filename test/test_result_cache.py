@@ -0,0 +1,89 @@
+import os
+import numpy as np
+from rfsys.core.instrumentation import Instrumentation
+from rfsys.core.result_cache import ResultCache, chain_fingerprint
+from rfsys.core.sim_engine import CascadeEngine
+from test.test_sim_engine import build_chain
+from test.test_freq_plan import build_receiver
+
+
+def test_fingerprint_tracks_edits():
+    chain = build_chain()
+    freqs = np.linspace(10, 20, 5)
+    key = chain_fingerprint(chain, freqs)
+    assert chain_fingerprint(build_chain(), freqs) == key
+    assert chain_fingerprint(chain[::-1], freqs) != key
+    assert chain_fingerprint(chain, freqs[:-1]) != key
+    assert chain_fingerprint(chain, freqs, pin=-50, bandwidth=1e6) != key
+
+    chain[1].get_parameter('NF').update_value(20, 6.5)
+    assert chain_fingerprint(chain, freqs) != key
+
+
+def test_engine_cache_memory_and_disk(tmp_path):
+    freqs = np.linspace(10, 20, 5)
+    cache = ResultCache(max_entries=2, cache_dir=str(tmp_path))
+    instr = Instrumentation()
+    first = CascadeEngine(build_chain(), cache=cache, instrumentation=instr).run_sweep(freqs)
+    second = CascadeEngine(build_chain(), cache=cache, instrumentation=instr).run_sweep(freqs)
+    assert second is first
+    assert instr.counters['result_cache.memory_hits'] == 1
+    assert instr.counters['engine.sweeps'] == 1
+
+    # a new session only has the disk tier
+    fresh = ResultCache(cache_dir=str(tmp_path))
+    third = CascadeEngine(build_chain(), cache=fresh, instrumentation=instr).run_sweep(freqs)
+    assert instr.counters['result_cache.disk_hits'] == 1
+    assert np.array_equal(third.data, first.data, equal_nan=True)
+    assert third.metrics == first.metrics and third.uids == first.uids
+
+    # an edit misses the cache
+    sim = CascadeEngine(build_chain(), cache=fresh, instrumentation=instr)
+    sim.set_parameter(1, 'NF', [10, 20], [4, 4])
+    edited = sim.run_sweep(freqs)
+    assert instr.counters['result_cache.misses'] == 2
+    assert not np.allclose(edited.metric('NF'), first.metric('NF'))
+
+
+def test_cache_lru_eviction(tmp_path):
+    chains = [build_chain() for x in range(4)]
+    results = [CascadeEngine(chain).run_sweep(np.linspace(10, 20, 50 + x)) for x, chain in enumerate(chains)]
+    size = None
+    cache = ResultCache(max_entries=2, cache_dir=str(tmp_path))
+    for x, result in enumerate(results):
+        cache.put(str(x), result)
+        if size is None:
+            size = os.path.getsize(os.path.join(str(tmp_path), '0.npz'))
+            cache.max_bytes = int(size * 2.5)
+        os.utime(os.path.join(str(tmp_path), '{}.npz'.format(x)), ns=(x * 10 ** 9, x * 10 ** 9))
+    assert len(cache) == 2 and '0' not in cache._memory and '3' in cache._memory
+    files = sorted(os.listdir(str(tmp_path)))
+    assert '0.npz' not in files and '3.npz' in files
+    assert cache.get('3') is results[3]
+    assert cache.get('0') is None
+
+
+def test_fingerprint_tracks_lo_plan():
+    chain = build_receiver()
+    key = chain_fingerprint(chain, [1100])
+    chain[1].set_lo(lo_freq=1010)
+    assert chain_fingerprint(chain, [1100]) != key
+
+
+def test_engine_cache_detects_in_place_edits():
+    freqs = np.linspace(10, 20, 5)
+    instr = Instrumentation()
+    chain = build_chain()
+    sim = CascadeEngine(chain, cache=ResultCache(), instrumentation=instr)
+    first = sim.run_sweep(freqs)
+    assert sim.run_sweep(freqs) is first
+
+    # no mark_dirty: only the edited last stage is recomputed
+    chain[1].get_parameter('NF').update_value(20, 6.5)
+    edited = sim.run_sweep(freqs)
+    assert edited is not first
+    expected = build_chain()
+    expected[1].get_parameter('NF').update_value(20, 6.5)
+    assert np.allclose(edited.data, CascadeEngine(expected).run_sweep(freqs).data, equal_nan=True)
+    assert not np.allclose(edited.metric('NF'), first.metric('NF'))
+    assert instr.counters['engine.stages_computed'] == 3
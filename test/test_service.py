@@ -0,0 +1,103 @@
+import asyncio
+import os
+import numpy as np
+import pytest
+from rfsys.core.netlist_parser import parse_net
+from rfsys.core.netlist_graph import NetlistGraph
+from rfsys.core.service import SimulationService, run_batch
+from rfsys.core.sim_engine import CascadeEngine
+from rfsys.core.xml_parser import ComponentLibrary
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'usr', 'component_schema.xml')
+
+
+def test_service_batches_jobs():
+    lib = ComponentLibrary(SCHEMA)
+    graph = NetlistGraph([parse_net(x) for x in ['SOURCE.1;F1-1.1', 'F1-1.2;U1-2.1', 'U1-2.2;SINK.1']])
+    grids = [np.linspace(10, 20, 5), np.linspace(12, 18, 5), np.linspace(10, 20, 9)]
+
+    async def main():
+        service = SimulationService()
+        jobs = [service.submit(lib, ['1', '2'], freqs) for freqs in grids]
+        jobs.append(service.submit(lib, ['2', '1', '2'], grids[0], pin=-60, bandwidth=1e6))
+        jobs.append(service.submit(lib, graph, grids[0]))
+        cancelled = service.submit(lib, ['1'], grids[0])
+        assert cancelled.cancel()
+        events = [event async for event in jobs[0].events()]
+        results = [await job for job in jobs]
+        await service.close()
+        return service, events, results, cancelled
+
+    service, events, results, cancelled = asyncio.run(main())
+    assert service.batches == 1
+    assert [x['state'] for x in events] == ['queued', 'running', 'done']
+    assert events[1]['batch'] == 5
+    assert cancelled.state == 'cancelled'
+
+    for freqs, result in zip(grids, results):
+        expected = CascadeEngine(lib.build_chain(['1', '2'])).run_sweep(freqs)
+        assert np.allclose(result.data, expected.data, equal_nan=True)
+    expected = CascadeEngine(lib.build_chain(['2', '1', '2']), pin=-60, bandwidth=1e6).run_sweep(grids[0])
+    assert np.allclose(results[3].data, expected.data)
+    assert np.allclose(results[4][0].metric('NF'), results[0].metric('NF'))
+
+
+def test_service_simulate_cancel():
+    lib = ComponentLibrary(SCHEMA)
+
+    async def main():
+        service = SimulationService(batch_window=0.05)
+        task = asyncio.ensure_future(service.simulate(lib, ['1', '2'], [10, 20]))
+        await asyncio.sleep(0)
+        task.cancel()
+        other = await service.simulate(lib, ['2'], [10, 20])
+        await service.close()
+        return task, other
+
+    task, other = asyncio.run(main())
+    assert task.cancelled()
+    assert np.allclose(other.metric('gain')[0], ComponentLibrary(SCHEMA)['2'].get_values('gain', [10, 20]))
+
+
+def test_run_batch_mixer_and_plain_chains(tmp_path):
+    schema = tmp_path / 'mixer_schema.xml'
+    schema.write_text("""<components>
+    <component uid="A" name="LNA" type="Amplifier">
+        <parameter name="gain"><freqs>50, 800, 1000</freqs><values>10, 8, 6</values></parameter>
+        <parameter name="NF"><freqs>50, 1000</freqs><values>2, 3</values></parameter>
+    </component>
+    <component uid="M" name="Mixer" type="Mixer" lo_freq="900">
+        <parameter name="gain"><freqs>800, 1000</freqs><values>-7, -7</values></parameter>
+    </component>
+    <component uid="F" name="IF Filter" type="Filter">
+        <parameter name="gain"><freqs>50, 100, 800, 1000</freqs><values>-1, -1, -5, -5</values></parameter>
+    </component>
+</components>""")
+    lib = ComponentLibrary(str(schema))
+    freqs = np.array([800.0, 950.0])
+    chains = [['A', 'M', 'F'], ['F', 'A']]
+
+    results = run_batch(lib, [(uids, freqs, None, None) for uids in chains])
+    for uids, result in zip(chains, results):
+        expected = CascadeEngine(lib.build_chain(uids)).run_sweep(freqs)
+        assert np.allclose(result.data, expected.data, equal_nan=True)
+    assert np.allclose(results[1].metric('gain')[-1], [3, 1.5])
+
+
+def test_service_bad_job_fails_alone():
+    lib = ComponentLibrary(SCHEMA)
+
+    async def main():
+        service = SimulationService()
+        good = service.submit(lib, ['1', '2'], [10, 20])
+        bad = service.submit(lib, ['1', '99'], [10, 20])
+        result = await good
+        with pytest.raises(ValueError):
+            await bad
+        await service.close()
+        return service, result, bad
+
+    service, result, bad = asyncio.run(main())
+    assert service.batches == 1 and bad.state == 'failed'
+    expected = CascadeEngine(lib.build_chain(['1', '2'])).run_sweep([10, 20])
+    assert np.allclose(result.data, expected.data, equal_nan=True)
@@ -1,3 +1,177 @@
 import pytest
 from rfsys.core.sim_engine import CascadeEngine
+from rfsys.core.cascade import cascade_gain_nf
 
+import numpy as np
+from rfsys.components.passive_components import Filter
+from rfsys.components.active_components import Amplifier
+
+
+def build_chain():
+    filt = Filter('1', 'Preselector')
+    filt.add_parameter('gain', [10, 20], [-0.5, -1])
+    lna = Amplifier('2', 'LNA')
+    lna.add_parameter('gain', [10, 20], [20, 20])
+    lna.add_parameter('NF', [10, 20], [3, 6])
+    return [filt, lna]
+
+
+def test_run_sweep_friis():
+    sim = CascadeEngine(build_chain())
+    result = sim.run_sweep([10])
+    assert result.metric('gain').shape == (2, 1)
+    assert np.allclose(result.metric('gain')[:, 0], [-0.5, 19.5])
+    expected_nf = 10 * np.log10(10**0.05 + (10**0.3 - 1) / 10**-0.05)
+    assert np.isclose(result.get_value('2', 'NF', 10), expected_nf)
+
+
+def test_run_sweep_matches_run():
+    freqs = [5, 10, 12.5, 15, 20, 30]
+    sim = CascadeEngine(build_chain())
+    result = sim.run_sweep(freqs)
+    for freq in freqs:
+        sim.run(freq)
+        for d in sim.comp_data:
+            assert abs(d.get_value('gain', freq) - result.get_value(d.uid, 'gain', freq)) < 1e-9
+            assert abs(d.get_value('NF', freq) - result.get_value(d.uid, 'NF', freq)) < 0.011
+
+
+def test_incremental_sweep():
+    chain = build_chain()
+    mixer = Amplifier('3', 'Mixer')
+    mixer.add_parameter('gain', [10, 20], [-7, -7])
+    mixer.add_parameter('NF', [10, 20], [7, 7])
+    chain.append(mixer)
+
+    freqs = np.linspace(5, 25, 9)
+    sim = CascadeEngine(chain)
+    first = sim.run_sweep(freqs)
+    sim.set_parameter(1, 'gain', [10, 20], [15, 16])
+
+    def fail(*args):
+        raise AssertionError("upstream stage was resampled")
+    chain[0].get_values = fail
+
+    result = sim.run_sweep(freqs)
+    del chain[0].get_values
+    assert result is not first
+    assert np.array_equal(result.stage(0), first.stage(0), equal_nan=True)
+    assert np.allclose(result.data, CascadeEngine(chain).run_sweep(freqs).data, equal_nan=True)
+
+    # nothing is dirty so the cached result is returned
+    assert sim.run_sweep(freqs) is result
+
+    filt = Filter('4', 'Postselector')
+    filt.add_parameter('gain', [10], [-2])
+    sim.set_component(2, filt)
+    assert np.allclose(sim.run_sweep(freqs).data, CascadeEngine(chain).run_sweep(freqs).data, equal_nan=True)
+
+
+def test_incremental_run():
+    chain = build_chain()
+    sim = CascadeEngine(chain)
+    sim.run(10)
+    sim.run(15)
+    sim.set_parameter(1, 'NF', [10, 20], [1, 1])
+    sim.run(10)
+    sim.run(15)
+    fresh = CascadeEngine(chain)
+    for freq in (10, 15):
+        fresh.run(freq)
+        for d, expected in zip(sim.comp_data, fresh.comp_data):
+            assert d.get_value('NF', freq) == expected.get_value('NF', freq)
+
+
+def test_run_sweep_fused_metrics():
+    chain = build_chain()
+    chain[1].add_parameter('OIP3', [10, 20], [30, 30])
+    chain[1].add_parameter('P1dB', [10, 20], [18, 18])
+    mixer = Amplifier('3', 'Mixer')
+    mixer.add_parameter('gain', [10], [-7])
+    mixer.add_parameter('NF', [10], [7])
+    mixer.add_parameter('OIP3', [10], [20])
+    chain.append(mixer)
+
+    result = CascadeEngine(chain, pin=-60, bandwidth=1e6).run_sweep([10])
+    # the passive first stage has no intercept point
+    assert np.isinf(result.get_value(0, 'OIP3', 10))
+    assert np.isclose(result.get_value(1, 'OIP3', 10), 30)
+    assert np.isclose(result.get_value(1, 'IIP3', 10), 10.5)
+    expected_oip3 = -10 * np.log10(1 / (10**3.0 * 10**-0.7) + 1 / 10**2.0)
+    assert np.isclose(result.get_value(2, 'OIP3', 10), expected_oip3)
+    assert np.isclose(result.get_value(1, 'OP1dB', 10), 18)
+
+    nf = result.get_value(2, 'NF', 10)
+    assert np.isclose(result.get_value(2, 'NT', 10), 290 * (10**(nf / 10) - 1))
+    assert np.isclose(result.get_value(2, 'SNR', 10), -60 + 174 - 60 - nf, atol=0.05)
+
+
+
+def test_nf_sensitivity_matches_finite_differences():
+    chain = build_chain()
+    mixer = Amplifier('3', 'Mixer')
+    mixer.add_parameter('gain', [10, 20], [-7, -8])
+    mixer.add_parameter('NF', [10, 20], [8, 9])
+    chain.append(mixer)
+    freqs = np.array([10, 15, 20])
+    sim = CascadeEngine(chain)
+    sens = sim.sensitivity(freqs)
+    gain, nf = sim.resample(freqs)
+
+    step = 1e-6
+    for name, array in (('dNF_dgain', gain), ('dNF_dNF', nf)):
+        for idx in range(len(chain)):
+            up = array.copy()
+            up[idx] += step
+            down = array.copy()
+            down[idx] -= step
+            args_up = (up, nf) if array is gain else (gain, up)
+            args_down = (down, nf) if array is gain else (gain, down)
+            fd = (cascade_gain_nf(*args_up)[1][-1] - cascade_gain_nf(*args_down)[1][-1]) / (2 * step)
+            assert np.allclose(sens.metric(name)[idx], fd, atol=1e-6)
+
+    # the last stage gain never affects NF and more gain ahead of a noisy stage always helps
+    assert np.all(sens.metric('dNF_dgain')[-1] == 0)
+    assert np.all(sens.metric('dNF_dgain')[:-1] < 0)
+    assert np.all(sens.metric('dNF_dNF') > 0)
+
+
+def test_run_corners_matches_per_corner_runs():
+    def chain_at(temp=None):
+        filt = Filter('1', 'Preselector')
+        lna = Amplifier('2', 'LNA')
+        lna_gain = np.array([[22, 21], [20, 20], [17, 16]])
+        lna_nf = np.array([[2, 4], [3, 6], [4.5, 7]])
+        if temp is None:
+            filt.add_parameter('gain', [10, 20], [[-0.4, -0.8], [-0.5, -1], [-0.7, -1.3]], temps=[-40, 25, 85])
+            lna.add_parameter('gain', [10, 20], lna_gain, temps=[-40, 25, 85])
+            lna.add_parameter('NF', [10, 20], lna_nf, temps=[-40, 25, 85])
+        else:
+            row = [-40, 25, 85].index(temp)
+            filt.add_parameter('gain', [10, 20], [[-0.4, -0.8], [-0.5, -1], [-0.7, -1.3]][row])
+            lna.add_parameter('gain', [10, 20], lna_gain[row])
+            lna.add_parameter('NF', [10, 20], lna_nf[row])
+        return [filt, lna]
+
+    freqs = np.linspace(10, 20, 11)
+    temps = [-40, 25, 85]
+    sim = CascadeEngine(chain_at(), pin=-80, bandwidth=1e6)
+    corners = sim.run_corners(freqs, temps)
+    for temp, result in zip(temps, corners):
+        expected = CascadeEngine(chain_at(temp), pin=-80, bandwidth=1e6).run_sweep(freqs)
+        assert np.allclose(result.data, expected.data)
+    # the nominal sweep is the 25 degC corner
+    assert np.allclose(sim.run_sweep(freqs).data, corners[1].data)
+
+
+def test_sweep_after_chain_list_edits():
+    pytest.raises(ValueError, CascadeEngine([]).run_sweep, [10])
+
+    chain = build_chain()
+    sim = CascadeEngine(chain)
+    freqs = np.linspace(10, 20, 8)
+    assert sim.run_sweep(freqs).data.shape[0] == 2
+    chain.pop()
+    result = sim.run_sweep(freqs)
+    assert result.data.shape[0] == 1
+    assert np.allclose(result.data, CascadeEngine(chain).run_sweep(freqs).data, equal_nan=True)
@@ -0,0 +1,27 @@
+import pytest
+import numpy as np
+from rfsys.core.sim_result import SimulationResult
+
+
+def test_result_lookup_and_views():
+    result = SimulationResult([10, 20, 30], ['1', '2', '2'], refdes=['FL1', 'U1', 'U2'])
+    assert result.data.shape == (3, 3, 2)
+    result.set_metric('gain', np.arange(9).reshape(3, 3))
+
+    assert result.stage_index('U2') == 2
+    assert result.stage_index('2') == 1     # shared uid resolves to the first stage
+    assert result.get_value('U2', 'gain', 30) == 8
+
+    stage = result.stage('FL1')
+    freq = result.at_freq(20)
+    gain = result.metric('gain')
+    for view in (stage, freq, gain):
+        assert np.shares_memory(view, result.data)
+    assert list(freq[:, 0]) == [1, 4, 7]
+
+
+def test_result_invalid_keys():
+    result = SimulationResult([10], ['1'])
+    pytest.raises(ValueError, result.stage_index, 'X')
+    pytest.raises(ValueError, result.metric_index, 'IP3')
+    pytest.raises(ValueError, result.freq_index, 11)
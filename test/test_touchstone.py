@@ -0,0 +1,48 @@
+import numpy as np
+from rfsys.core.touchstone import read_touchstone
+from rfsys.components.passive_components import Filter
+from rfsys.components.active_components import Amplifier
+
+S2P_DB = """! vendor amplifier
+# MHz S DB R 50
+10 -15 170 20 -30 -40 10 -12 160
+! wrapped row
+20 -14 165 19.5 -35
+   -40 12 -11 150
+! noise parameters
+10 1.2 0.3 45 0.2
+20 1.4 0.35 50 0.25
+"""
+
+S2P_RI = """# GHz S RI
+0.01 0 0 0.5 0.5 0 0 0 0
+0.02 0 0 0 -0.25 0 0 0 0
+"""
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_read_touchstone_db_with_noise(tmp_path):
+    data = read_touchstone(write(tmp_path, 'amp.s2p', S2P_DB))
+    assert list(data['freqs']) == [10, 20]
+    assert np.allclose(20 * np.log10(np.abs(data['s'][:, 1, 0])), [20, 19.5])
+    assert np.allclose(np.angle(data['s'][0, 1, 0], deg=True), -30)
+    assert np.allclose(20 * np.log10(np.abs(data['s'][:, 0, 1])), [-40, -40])
+    assert list(data['noise']['nf_min']) == [1.2, 1.4]
+
+
+def test_touchstone_component_params(tmp_path):
+    amp = Amplifier('1', 'LNA')
+    amp.add_touchstone(write(tmp_path, 'amp.s2p', S2P_DB))
+    assert np.isclose(amp.get_value('gain', 15), 19.75)
+    assert np.isclose(amp.get_value('NF', 20), 1.4)
+
+    filt = Filter('2', 'Filter')
+    filt.add_touchstone(write(tmp_path, 'filt.s2p', S2P_RI))
+    assert list(filt.get_parameter('gain').freqs) == [10, 20]
+    assert np.allclose(filt.get_parameter('gain').values, [20 * np.log10(np.sqrt(0.5)), 20 * np.log10(0.25)])
+    assert np.allclose(filt.get_parameter('NF').values, -filt.get_parameter('gain').values)
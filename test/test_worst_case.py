@@ -0,0 +1,63 @@
+import itertools
+import numpy as np
+from rfsys.components.passive_components import Filter
+from rfsys.components.active_components import Amplifier
+from rfsys.core.cascade import cascade_gain_nf
+from rfsys.core.sim_engine import CascadeEngine
+from rfsys.core.worst_case import worst_case
+
+
+def build_chain():
+    filt = Filter('1', 'Preselector')
+    filt.add_parameter('gain', [10, 20], [-1, -2], tol='dB', limits=[-0.5, 0.5])
+    lna = Amplifier('2', 'LNA')
+    lna.add_parameter('gain', [10, 20], [15, 12], tol='dB', limits=[-1, 1])
+    lna.add_parameter('NF', [10, 20], [2, 3], tol='dB', limits=[-0.3, 0.6])
+    mixer = Filter('3', 'Attenuator')
+    mixer.add_parameter('gain', [10, 20], [-6, -6], tol='per', limits=[-20, 10])
+    amp = Amplifier('4', 'IF Amp')
+    amp.add_parameter('gain', [10, 20], [20, 20], tol='dB', limits=[-2, 1])
+    amp.add_parameter('NF', [10, 20], [6, 8], tol='dB', limits=[-1, 1], dist='normal')
+    return [filt, lna, mixer, amp]
+
+
+def test_worst_case_matches_corner_enumeration():
+    chain = build_chain()
+    freqs = np.array([10, 12.5, 15, 20])
+    result = worst_case(chain, freqs)
+    assert len(result.params) == 6
+
+    # brute force every limit corner
+    gain, nf = CascadeEngine(chain).resample(freqs)
+    outputs = list()
+    for corner in itertools.product([0, 1], repeat=len(result.params)):
+        trial_gain, trial_nf = gain.copy(), nf.copy()
+        for (idx, name), limits, side in zip(result.params, result.limits, corner):
+            delta = limits[side]
+            if chain[idx].get_parameter(name).tolerance.tol == 'PER':
+                delta = 10 * np.log10(1 + delta / 100.0)
+            if name == 'gain':
+                trial_gain[idx] += delta
+                if isinstance(chain[idx], Filter):
+                    trial_nf[idx] -= delta
+            else:
+                trial_nf[idx] += delta
+        casc_gain, casc_nf = cascade_gain_nf(trial_gain, trial_nf)
+        outputs.append((casc_gain[-1], casc_nf[-1]))
+    all_gain = np.array([x[0] for x in outputs])
+    all_nf = np.array([x[1] for x in outputs])
+
+    assert np.allclose(result.get_bound('gain', 'min'), all_gain.min(axis=0))
+    assert np.allclose(result.get_bound('gain', 'max'), all_gain.max(axis=0))
+    assert np.allclose(result.get_bound('NF', 'min'), all_nf.min(axis=0))
+    assert np.allclose(result.get_bound('NF', 'max'), all_nf.max(axis=0))
+    assert np.all(result.get_bound('NF', 'min') < result.nominal['NF'])
+
+
+def test_worst_case_reports_corner():
+    result = worst_case(build_chain(), [10, 20])
+    corner = result.get_corner('NF', 'max', 10)
+    assert corner[0] == (0, 'gain', -0.5)
+    assert (1, 'NF', 0.6) in corner and (3, 'NF', 1) in corner
+    assert all(limit == limits[1] for (idx, name, limit), limits in
+               zip(result.get_corner('gain', 'max', 20), result.limits) if name == 'gain')
@@ -0,0 +1,49 @@
+import os
+import pytest
+import numpy as np
+from rfsys.core.xml_parser import load_components, string_to_list, ComponentLibrary
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'usr', 'component_schema.xml')
+
+
+def test_string_to_list():
+    values = string_to_list("10, 15,20 ")
+    assert values.dtype == np.float64
+    assert list(values) == [10, 15, 20]
+
+
+def test_load_components():
+    comps = load_components(SCHEMA)
+    assert [x['uid'] for x in comps] == ['1', '2']
+    assert list(comps[1]['params']['NF']['values']) == [3, 3.1, 3.2]
+    assert comps[1]['params']['gain']['limits'] == pytest.approx([-1, 1])
+
+
+def test_component_library_lazy():
+    lib = ComponentLibrary(SCHEMA)
+    assert lib.uids() == ['1', '2']
+    assert len(lib._cache) == 0
+
+    lna = lib['2']
+    assert lna.name == 'LNA'
+    assert lna.get_value('NF', 15) == 3.1
+    assert lib.get_component('2') is lna
+    assert list(lib._cache) == ['2']
+    assert list(lib.get_dict('1')['params']['gain']['values']) == [-0.5, -0.6, -0.7]
+    pytest.raises(ValueError, lib.get_dict, '3')
+
+
+def test_load_interp_mode():
+    lib = ComponentLibrary(SCHEMA)
+    assert lib.get_dict('2')['params']['NF']['interp'] == 'pchip'
+    assert lib['2'].get_parameter('NF').interp == 'pchip'
+    assert lib['2'].get_parameter('gain').interp == 'linear'
+
+
+def test_load_temperature_grid():
+    lib = ComponentLibrary(SCHEMA)
+    gain = lib['2'].get_parameter('gain')
+    assert list(gain.temps) == [-40, 25, 85]
+    assert lib.get_dict('2')['params']['gain']['values'].shape == (3, 3)
+    assert np.allclose(gain.get_values([10, 20], temps=[-40, 85]), [[19.8, 19.5], [18, 17.6]])
+    assert gain.get_value(15) == 19
@@ -1,6 +1,7 @@
 
 import sys
 import os
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
@@ -23,4 +24,10 @@ for freq in [10, 15, 20]:
     sim.run(freq)
     for d in sim.comp_data:
         print("uid: {} | gain: {} dB | NF: {} dB".format(d.uid, d.get_value('gain', freq), d.get_value('NF', freq)))
-    print("-----------------------------------------------")
\ No newline at end of file
+    print("-----------------------------------------------")
+# whole sweep in one pass.  Results are full precision, so round for display
+result = sim.run_sweep([10, 15, 20])
+gain = result.metric('gain')
+nf = result.metric('NF')
+for idx, uid in enumerate(result.uids):
+    print("uid: {} | gain: {} dB | NF: {} dB".format(uid, np.round(gain[idx], 2), np.round(nf[idx], 2)))